@@ -0,0 +1,124 @@
+"""Script to measure the memory and accuracy effect of compact feature dtypes."""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.data.features import build_features
+from src.eval.metrics import calculate_metrics
+
+
+def synthetic_panel(n_series: int, periods: int, freq: str) -> pd.DataFrame:
+    """Create a synthetic load-like panel with daily and weekly cycles.
+
+    Args:
+        n_series: Number of series
+        periods: Observations per series
+        freq: Pandas frequency string
+
+    Returns:
+        DataFrame in long format
+    """
+    rng = np.random.default_rng(42)
+    dates = pd.date_range("2016-01-01", periods=periods, freq=freq)
+    hours = dates.hour.to_numpy() + 24 * dates.dayofweek.to_numpy()
+
+    frames = []
+    for i in range(n_series):
+        level = rng.uniform(5_000, 60_000)
+        daily = 0.1 * np.sin(2 * np.pi * hours / 24)
+        weekly = 0.05 * np.sin(2 * np.pi * hours / 168)
+        y = level * (1 + daily + weekly)
+        y += rng.normal(scale=0.02 * level, size=periods)
+        frames.append(pd.DataFrame({"series_id": f"zone_{i}", "ds": dates, "y": y}))
+
+    df = pd.concat(frames, ignore_index=True)
+    df["series_id"] = df["series_id"].astype("category")
+    return df
+
+
+def feature_bytes(df: pd.DataFrame, input_cols: list) -> int:
+    """Get the memory used by feature columns."""
+    return int(df.drop(columns=input_cols).memory_usage(index=False).sum())
+
+
+def benchmark(config_path: str, n_series: int, periods: int, freq: str):
+    """Build features in default and compact mode and compare them.
+
+    Args:
+        config_path: Path to YAML config
+        n_series: Number of synthetic series
+        periods: Observations per series
+        freq: Pandas frequency string
+    """
+    with open(config_path, "r") as f:
+        features_config = yaml.safe_load(f)["features"]
+    features_config.pop("weather", None)
+
+    df = synthetic_panel(n_series, periods, freq)
+    input_cols = list(df.columns)
+
+    results = {}
+    for mode, compact in (("default", False), ("compact", True)):
+        config = {**features_config, "compact": compact}
+
+        start = time.perf_counter()
+        features = build_features(df, config, id_col="series_id")
+        elapsed = time.perf_counter() - start
+
+        results[mode] = {
+            "features": features,
+            "bytes": feature_bytes(features, input_cols),
+            "seconds": elapsed,
+        }
+        print(
+            f"{mode:>8}: {features.shape[1] - len(input_cols)} feature columns, "
+            f"{results[mode]['bytes'] / 1e6:,.1f} MB, built in {elapsed:.2f}s"
+        )
+
+    ratio = results["default"]["bytes"] / results["compact"]["bytes"]
+    print(f"\nCompact mode uses {ratio:.1f}x less feature memory")
+
+    try:
+        from src.models.lgbm_model import LightGBMForecaster
+    except ImportError:
+        print("lightgbm not installed, skipping accuracy comparison")
+        return
+
+    for mode, result in results.items():
+        features = result["features"].dropna()
+        cutoff = features["ds"].quantile(0.8)
+        train = features[features["ds"] <= cutoff]
+        test = features[features["ds"] > cutoff]
+        feature_cols = [c for c in features.columns if c not in ("ds", "y")]
+
+        model = LightGBMForecaster({"n_estimators": 200, "seed": 0, "deterministic": True})
+        model.fit(train[feature_cols], train["y"].to_numpy(), categorical_features=["series_id"])
+        pred = model.predict(test[feature_cols])
+
+        metrics = calculate_metrics(test["y"].to_numpy(), pred)
+        print(f"{mode:>8}: " + ", ".join(f"{k}={v:.4f}" for k, v in metrics.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact feature dtypes")
+    parser.add_argument(
+        "--config",
+        type=str,
+        default="configs/energy_opsd.yaml",
+        help="Config whose features section is benchmarked",
+    )
+    parser.add_argument("--series", type=int, default=20, help="Number of series")
+    parser.add_argument("--periods", type=int, default=24 * 365, help="Observations per series")
+    parser.add_argument("--freq", type=str, default="h", help="Frequency")
+
+    args = parser.parse_args()
+
+    benchmark(args.config, args.series, args.periods, args.freq)
+
+
+if __name__ == "__main__":
+    main()
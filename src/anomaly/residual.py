@@ -2,7 +2,33 @@
 
 import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Optional, Tuple
+
+
+def fit_residual_thresholds(
+    residuals: np.ndarray,
+    method: str = "quantile",
+    lower_quantile: float = 0.05,
+    upper_quantile: float = 0.95,
+) -> Tuple[float, float]:
+    """Estimate the thresholds of residual-based anomaly detection.
+    
+    Args:
+        residuals: Forecast residuals (actuals - predictions)
+        method: Detection method ('quantile' or 'std')
+        lower_quantile: Lower quantile threshold
+        upper_quantile: Upper quantile threshold
+    
+    Returns:
+        Tuple of (lower bound, upper bound) for 'quantile', or
+        (mean, std) of the residuals for 'std'
+    """
+    if method == "quantile":
+        return np.quantile(residuals, lower_quantile), np.quantile(residuals, upper_quantile)
+    elif method == "std":
+        return np.mean(residuals), np.std(residuals)
+    else:
+        raise ValueError(f"Unknown method: {method}")
 
 
 def detect_anomalies_residual(
@@ -11,6 +37,7 @@ def detect_anomalies_residual(
     method: str = "quantile",
     lower_quantile: float = 0.05,
     upper_quantile: float = 0.95,
+    thresholds: Optional[Tuple[np.ndarray, np.ndarray]] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Detect anomalies based on forecast residuals.
     
@@ -20,22 +47,27 @@ def detect_anomalies_residual(
         method: Detection method ('quantile' or 'std')
         lower_quantile: Lower quantile threshold
         upper_quantile: Upper quantile threshold
+        thresholds: Precomputed ``fit_residual_thresholds`` output, as
+            scalars or per-row arrays (if None, estimated from these
+            residuals). Lets data be scored in chunks against thresholds
+            fitted once.
     
     Returns:
         Tuple of (anomaly_flags, anomaly_scores)
     """
     residuals = actuals - predictions
     
+    if thresholds is None:
+        thresholds = fit_residual_thresholds(residuals, method, lower_quantile, upper_quantile)
+    
     if method == "quantile":
-        lower_bound = np.quantile(residuals, lower_quantile)
-        upper_bound = np.quantile(residuals, upper_quantile)
+        lower_bound, upper_bound = thresholds
         
         anomalies = (residuals < lower_bound) | (residuals > upper_bound)
         scores = np.abs(residuals)
     
     elif method == "std":
-        mean_resid = np.mean(residuals)
-        std_resid = np.std(residuals)
+        mean_resid, std_resid = thresholds
         z_threshold = 3
         
         z_scores = np.abs((residuals - mean_resid) / std_resid)
@@ -0,0 +1,460 @@
+"""Chunked anomaly scoring of stored forecasts in bounded memory."""
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+
+from src.anomaly.residual import detect_anomalies_residual, fit_residual_thresholds
+from src.data.dataset import LazyDataset
+from src.utils.profiling import StageProfiler
+
+# Residuals kept per series to fit thresholds; quantiles of a uniform
+# sample this size are within a fraction of a percentile of the exact ones
+SAMPLE_SIZE = 4096
+
+# Rows pooled across series to fit the Isolation Forest
+IFOREST_SAMPLE_SIZE = 100_000
+
+# Columns of scored rows after the series and timestamp columns
+SCORE_COLUMNS = ["y", "yhat", "residual", "anomaly_score", "is_anomaly"]
+
+
+def iter_forecast_batches(
+    path: str,
+    batch_size: int = 100_000,
+    model: Optional[str] = None,
+    actuals: Optional[LazyDataset] = None,
+    target_col: str = "y",
+    id_col: str = "series_id",
+    ts_col: str = "ds",
+) -> Iterator[pd.DataFrame]:
+    """Stream stored forecasts joined with their actuals.
+
+    Args:
+        path: Parquet file or directory of forecasts with ID, timestamp and
+            ``yhat`` columns (e.g. backtest predictions or forecast CLI output)
+        batch_size: Maximum rows per batch
+        model: Keep only this model's rows (needs a ``model`` column;
+            required when the forecasts hold several models)
+        actuals: Dataset to read actuals from when the forecasts have no
+            target column; only the series and time range of each batch is read
+        target_col: Name of target column in the forecasts and ``actuals``
+        id_col: Name of ID column
+        ts_col: Name of timestamp column
+
+    Yields:
+        DataFrames with ``id_col``, ``ts_col``, y and yhat columns, in file
+        order; rows missing the actual or the forecast are skipped
+
+    Raises:
+        ValueError: If a column is missing, or the forecasts hold several
+            models and ``model`` is not given
+    """
+    source = pads.dataset(path, format="parquet")
+    names = source.schema.names
+
+    if model is not None and "model" not in names:
+        raise ValueError(f"{path} has no model column to select {model!r} from")
+    if model is None and "model" in names:
+        # Residuals of different models must not share thresholds or a forest
+        models = _distinct_models(source, batch_size)
+        if len(models) > 1:
+            raise ValueError(
+                f"{path} holds forecasts of several models {models}; select one to score"
+            )
+    missing = [col for col in [id_col, ts_col, "yhat"] if col not in names]
+    if missing:
+        raise ValueError(f"{path} has no {missing} columns")
+    if target_col not in names and actuals is None:
+        raise ValueError(
+            f"{path} has no {target_col} column; pass the dataset to read actuals from"
+        )
+
+    columns = [col for col in [id_col, ts_col, target_col, "yhat"] if col in names]
+    row_filter = pads.field("model") == model if model is not None else None
+
+    scanner = source.scanner(
+        columns=columns,
+        filter=row_filter,
+        batch_size=batch_size,
+        batch_readahead=1,
+        fragment_readahead=1,
+    )
+    for batch in scanner.to_batches():
+        if batch.num_rows == 0:
+            continue
+        df = batch.to_pandas().rename(columns={target_col: "y"})
+        df[id_col] = df[id_col].astype(str)
+
+        if "y" not in df.columns:
+            df = _join_actuals(df, actuals, target_col, id_col, ts_col)
+
+        yield df[[id_col, ts_col, "y", "yhat"]].dropna(subset=["y", "yhat"])
+
+
+def _distinct_models(source: pads.Dataset, batch_size: int) -> List[str]:
+    # Stop reading as soon as a second model shows up
+    models = set()
+    for batch in source.scanner(columns=["model"], batch_size=batch_size).to_batches():
+        models.update(pc.unique(batch.column(0)).to_pylist())
+        if len(models) > 1:
+            break
+    return sorted(str(m) for m in models)
+
+
+def _join_actuals(
+    df: pd.DataFrame, actuals: LazyDataset, target_col: str, id_col: str, ts_col: str
+) -> pd.DataFrame:
+    # End bound is exclusive and may be cast to a coarser unit, so pad it; the
+    # merge drops any extra rows
+    end = df[ts_col].max() + pd.Timedelta(1, "s")
+    observed = (
+        actuals.filter(series_ids=df[id_col].unique(), start=df[ts_col].min(), end=end)
+        .select([actuals.id_col, actuals.ts_col, target_col])
+        .collect()
+    )
+    observed = observed.rename(
+        columns={actuals.id_col: id_col, actuals.ts_col: ts_col, target_col: "y"}
+    )
+    observed[id_col] = observed[id_col].astype(str)
+
+    # Forecasts without an observation yet cannot be scored
+    return df.merge(observed, on=[id_col, ts_col], how="inner")
+
+
+class SeriesSample:
+    """Bounded uniform sample of rows per series.
+
+    Every row gets a random key and each series keeps the rows with the
+    ``size`` smallest keys, which is a uniform sample of everything seen so
+    far (bottom-k sampling). Memory is bounded by ``size`` rows per series
+    plus one buffer, however many rows are streamed through.
+    """
+
+    def __init__(self, size: int = SAMPLE_SIZE, seed: int = 42, id_col: str = "series_id"):
+        """Initialize sample.
+
+        Args:
+            size: Rows kept per series
+            seed: Random seed of the sample keys
+            id_col: Name of ID column
+        """
+        self.size = size
+        self.id_col = id_col
+        self.rng = np.random.default_rng(seed)
+        self._parts: List[pd.DataFrame] = []
+        self._buffered = 0
+        self._sample: Optional[pd.DataFrame] = None
+
+    def add(self, df: pd.DataFrame) -> None:
+        """Offer a batch of rows.
+
+        Args:
+            df: Rows with an ``id_col`` column
+        """
+        df = df.assign(_key=self.rng.random(len(df)))
+        self._parts.append(df)
+        self._buffered += len(df)
+
+        kept = 0 if self._sample is None else len(self._sample)
+        if self._buffered > max(kept, 10 * self.size):
+            self._compact()
+
+    def _compact(self) -> None:
+        parts = self._parts if self._sample is None else [self._sample, *self._parts]
+        if not parts:
+            return
+        df = pd.concat(parts, ignore_index=True).sort_values([self.id_col, "_key"], kind="stable")
+        self._sample = df[df.groupby(self.id_col, sort=False).cumcount() < self.size]
+        self._parts = []
+        self._buffered = 0
+
+    def frame(self) -> pd.DataFrame:
+        """Get the sample.
+
+        Returns:
+            Sampled rows grouped by series
+        """
+        self._compact()
+        if self._sample is None:
+            raise ValueError("No rows to sample")
+        return self._sample.drop(columns="_key").reset_index(drop=True)
+
+
+class TopK:
+    """Bounded min-heap of the ``k`` highest scoring rows."""
+
+    def __init__(self, k: int):
+        """Initialize heap.
+
+        Args:
+            k: Rows to keep
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        self.k = k
+        self._heap: List[Tuple[float, int, tuple]] = []
+        self._seen = 0
+
+    def push(self, df: pd.DataFrame, scores: np.ndarray) -> None:
+        """Offer a batch of scored rows.
+
+        Args:
+            df: Rows in the order of the columns passed to ``frame``
+            scores: Score of each row
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        candidates = np.arange(len(scores))
+
+        # Only the batch's own top k can enter the heap
+        if len(candidates) > self.k:
+            candidates = np.argpartition(-scores, self.k - 1)[:self.k]
+        if len(self._heap) == self.k:
+            candidates = candidates[scores[candidates] > self._heap[0][0]]
+
+        rows = df.iloc[candidates].itertuples(index=False, name=None)
+        for idx, row in zip(candidates, rows):
+            # Earlier rows win ties
+            item = (scores[idx], -(self._seen + int(idx)), row)
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            else:
+                heapq.heappushpop(self._heap, item)
+
+        self._seen += len(scores)
+
+    def frame(self, columns: List[str]) -> pd.DataFrame:
+        """Get the kept rows.
+
+        Args:
+            columns: Column names of the pushed rows
+
+        Returns:
+            DataFrame of the top rows, highest score first
+        """
+        rows = [row for _, _, row in sorted(self._heap, reverse=True)]
+        return pd.DataFrame(rows, columns=columns)
+
+
+class ChunkedDetector:
+    """Anomaly detector fitted once on a sample and applied per chunk.
+
+    Methods:
+
+    * ``residual``: ``detect_anomalies_residual`` with per-series thresholds
+      fitted on each series' residual sample
+    * ``iforest``: Isolation Forest fitted once on a pooled sample of
+      per-series standardized (residual, actual) pairs
+
+    Example:
+        >>> detector = ChunkedDetector("residual", config["anomaly"]["residual"])
+        >>> detector.fit(iter_forecast_batches(path, id_col="series_id"))
+        >>> for batch in iter_forecast_batches(path, id_col="series_id"):
+        ...     flags, scores = detector.score(batch)
+    """
+
+    def __init__(
+        self,
+        method: str,
+        config: Dict,
+        sample_size: int = SAMPLE_SIZE,
+        seed: int = 42,
+        id_col: str = "series_id",
+    ):
+        """Initialize detector.
+
+        Args:
+            method: Detection method ('residual' or 'iforest')
+            config: Method config (``anomaly.residual`` or ``anomaly.iforest``)
+            sample_size: Rows sampled per series to fit on
+            seed: Random seed of the sample
+            id_col: Name of ID column of the batches
+        """
+        if method not in ("residual", "iforest"):
+            raise ValueError(f"Unknown method: {method}")
+        self.method = method
+        self.config = config
+        self.sample_size = sample_size
+        self.seed = seed
+        self.id_col = id_col
+
+    def fit(self, batches: Iterator[pd.DataFrame]) -> "ChunkedDetector":
+        """Fit the detector on a bounded sample of a stream.
+
+        Args:
+            batches: Batches from ``iter_forecast_batches``
+
+        Returns:
+            Fitted detector
+        """
+        sample = SeriesSample(self.sample_size, self.seed, self.id_col)
+        for batch in batches:
+            sample.add(
+                pd.DataFrame({
+                    self.id_col: batch[self.id_col].to_numpy(),
+                    "residual": (batch["y"] - batch["yhat"]).to_numpy(np.float64),
+                    "y": batch["y"].to_numpy(np.float64),
+                })
+            )
+        sample = sample.frame()
+
+        if self.method == "residual":
+            residual_config = {
+                key: self.config[key]
+                for key in ("method", "lower_quantile", "upper_quantile")
+                if key in self.config
+            }
+            self.thresholds_ = pd.DataFrame(
+                {
+                    series: fit_residual_thresholds(group.to_numpy(), **residual_config)
+                    for series, group in sample.groupby(self.id_col, sort=True)["residual"]
+                },
+                index=["lower", "upper"],
+            ).T
+        else:
+            from sklearn.ensemble import IsolationForest
+
+            grouped = sample.groupby(self.id_col, sort=True)[["residual", "y"]]
+            self.scale_ = pd.concat(
+                [grouped.mean().add_suffix("_mean"), grouped.std(ddof=0).add_suffix("_std")],
+                axis=1,
+            )
+
+            X = self._standardize(sample)
+            if len(X) > IFOREST_SAMPLE_SIZE:
+                rng = np.random.default_rng(self.seed)
+                X = X[rng.choice(len(X), IFOREST_SAMPLE_SIZE, replace=False)]
+
+            self.model_ = IsolationForest(
+                n_estimators=self.config.get("n_estimators", 100),
+                contamination=self.config.get("contamination", 0.1),
+                random_state=self.config.get("random_state", 42),
+            ).fit(X)
+
+        return self
+
+    def _standardize(self, df: pd.DataFrame) -> np.ndarray:
+        scale = self.scale_.reindex(df[self.id_col].to_numpy())
+        X = np.empty((len(df), 2))
+        for j, col in enumerate(["residual", "y"]):
+            std = scale[f"{col}_std"].to_numpy()
+            std = np.where(std > 0, std, 1.0)
+            X[:, j] = (df[col].to_numpy(np.float64) - scale[f"{col}_mean"].to_numpy()) / std
+        # Series unseen in the sample are scored on their raw scale
+        return np.nan_to_num(X)
+
+    def score(self, batch: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Score one chunk.
+
+        Args:
+            batch: Batch from ``iter_forecast_batches``
+
+        Returns:
+            Tuple of (anomaly_flags, anomaly_scores); higher scores are more
+            anomalous
+        """
+        if self.method == "residual":
+            bounds = self.thresholds_.reindex(batch[self.id_col].to_numpy())
+            return detect_anomalies_residual(
+                batch["y"].to_numpy(np.float64),
+                batch["yhat"].to_numpy(np.float64),
+                method=self.config.get("method", "quantile"),
+                thresholds=(bounds["lower"].to_numpy(), bounds["upper"].to_numpy()),
+            )
+
+        X = self._standardize(batch.assign(residual=batch["y"] - batch["yhat"]))
+        return self.model_.predict(X) == -1, -self.model_.score_samples(X)
+
+
+def score_forecasts(
+    path: str,
+    method: str,
+    config: Dict,
+    k: int = 20,
+    model: Optional[str] = None,
+    actuals: Optional[LazyDataset] = None,
+    target_col: str = "y",
+    id_col: str = "series_id",
+    ts_col: str = "ds",
+    batch_size: int = 100_000,
+    writer=None,
+    profiler: Optional[StageProfiler] = None,
+) -> Tuple[pd.DataFrame, Dict]:
+    """Score stored forecasts for anomalies in bounded memory.
+
+    Reads the forecasts twice in batches: once to fit the detector on a
+    bounded per-series sample, once to score every row against it. Only
+    the sample, one batch and the top-k heap are held in memory, so peak
+    memory does not grow with the time span scored.
+
+    Args:
+        path: Parquet file or directory of forecasts
+        method: Detection method ('residual' or 'iforest')
+        config: Method config (``anomaly.residual`` or ``anomaly.iforest``)
+        k: Rows to keep for the report
+        model: Keep only this model's rows of a backtest
+        actuals: Dataset to read actuals from when the forecasts have none
+        target_col: Name of target column in the forecasts and ``actuals``
+        id_col: Name of ID column
+        ts_col: Name of timestamp column
+        batch_size: Maximum rows per batch
+        writer: Optional ``ForecastWriter`` that receives every flagged row
+        profiler: Records the fit and score passes (if None, nothing is
+            recorded)
+
+    Returns:
+        Tuple of (top-k rows with ``id_col``, ``ts_col`` and SCORE_COLUMNS,
+        stats dict with rows, anomalies, series, and mean_score and
+        max_score over the rows with a defined score, NaN if there are none)
+    """
+    def batches():
+        return iter_forecast_batches(
+            path, batch_size, model, actuals, target_col, id_col, ts_col
+        )
+
+    columns = [id_col, ts_col, *SCORE_COLUMNS]
+
+    profiler = profiler or StageProfiler(enabled=False)
+
+    with profiler.stage("fit"):
+        detector = ChunkedDetector(method, config, id_col=id_col).fit(batches())
+
+    top = TopK(k)
+    stats = {"rows": 0, "anomalies": 0, "max_score": -np.inf}
+    scored_rows, score_sum = 0, 0.0
+    with profiler.stage("score"):
+        for batch in batches():
+            flags, scores = detector.score(batch)
+            scored = batch.assign(
+                residual=batch["y"] - batch["yhat"],
+                anomaly_score=scores,
+                is_anomaly=flags,
+            )[columns]
+
+            # Zero-variance series have undefined z-scores and cannot be ranked
+            scores = np.asarray(scores, dtype=np.float64)
+            valid = ~np.isnan(scores)
+            top.push(scored[valid], scores[valid])
+
+            stats["rows"] += len(batch)
+            stats["anomalies"] += int(flags.sum())
+            if valid.any():
+                scored_rows += int(valid.sum())
+                score_sum += scores[valid].sum()
+                stats["max_score"] = max(stats["max_score"], scores[valid].max())
+            if writer is not None and flags.any():
+                writer.write(scored[flags])
+
+    if stats["rows"] == 0:
+        raise ValueError(f"No forecasts with actuals to score in {path}")
+
+    stats["series"] = len(detector.thresholds_ if method == "residual" else detector.scale_)
+    # Rows without a defined score do not count toward the mean
+    stats["mean_score"] = score_sum / scored_rows if scored_rows else np.nan
+    if not scored_rows:
+        stats["max_score"] = np.nan
+    return top.frame(columns), stats
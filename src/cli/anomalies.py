@@ -0,0 +1,142 @@
+"""Anomaly detection CLI command."""
+
+import click
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.anomaly.streaming import score_forecasts
+from src.config import load_config
+from src.data.dataset import LazyDataset
+from src.data.loaders import load_dataset
+from src.eval.reports import generate_anomaly_report
+from src.models.inference import ForecastWriter
+from src.tracking.mlflow_utils import log_artifact, setup_mlflow, start_run
+from src.utils.profiling import StageProfiler
+from src.utils.resources import peak_rss_mb
+
+
+@click.command()
+@click.option("--config", required=True, help="Path to config YAML file")
+@click.option(
+    "--method",
+    type=click.Choice(["residual", "iforest"]),
+    default="residual",
+    show_default=True,
+    help="Detection method",
+)
+@click.option("--k", default=20, show_default=True, help="Top anomalies to report")
+@click.option(
+    "--forecasts",
+    default=None,
+    help="Stored forecasts: Parquet file or directory with series ID, timestamp and yhat "
+    "(default: artifacts/reports/<dataset>_backtest_predictions.parquet)",
+)
+@click.option(
+    "--model",
+    default=None,
+    help="Model whose predictions to score (required when the file holds several models)",
+)
+@click.option("--batch-size", default=100_000, show_default=True, help="Rows per chunk")
+@click.option("--save", default=None, help="Write every flagged row to this .csv/.parquet path")
+@click.option("--profile", is_flag=True, help="Record wall/CPU time and peak memory per stage")
+@click.option("--cprofile", is_flag=True, help="Also dump cProfile stats (implies --profile)")
+def anomalies(
+    config: str,
+    method: str,
+    k: int,
+    forecasts: str,
+    model: str,
+    batch_size: int,
+    save: str,
+    profile: bool,
+    cprofile: bool,
+):
+    """Score stored forecasts for anomalies in bounded memory."""
+    cfg = load_config(config)
+    anomaly_config = cfg.anomaly.model_dump() if cfg.anomaly else {}
+    method_config = anomaly_config.get(method) or {}
+
+    artifacts_dir = Path(os.environ.get("ARTIFACTS_DIR", "artifacts"))
+    reports_dir = artifacts_dir / "reports"
+    forecasts = forecasts or str(reports_dir / f"{cfg.dataset.name}_backtest_predictions.parquet")
+
+    profile_name = f"anomalies_{cfg.dataset.name}_{method}"
+    profiles_dir = reports_dir / "profiles"
+    profiler = StageProfiler(
+        enabled=profile or cprofile,
+        cprofile_dir=str(profiles_dir / profile_name) if cprofile else None,
+    )
+
+    if not Path(forecasts).exists():
+        raise click.ClickException(
+            f"No forecasts at {forecasts}; run the backtest or forecast CLI first"
+        )
+
+    click.echo(f"Scoring {forecasts} with {method}")
+
+    # Actuals are only read for forecasts that do not carry them
+    with profiler.stage("load"):
+        cache = load_dataset(config, cfg.dataset.model_dump(), lazy=True)
+    actuals = LazyDataset(cache.path, ts_col=cfg.dataset.ts_col, id_col=cfg.dataset.id_col)
+
+    writer = ForecastWriter(save) if save else None
+    try:
+        top, stats = score_forecasts(
+            forecasts,
+            method,
+            method_config,
+            k=k,
+            model=model,
+            actuals=actuals,
+            id_col=cfg.dataset.id_col,
+            ts_col=cfg.dataset.ts_col,
+            batch_size=batch_size,
+            writer=writer,
+            profiler=profiler,
+        )
+        if writer is not None and writer.n_parts:
+            writer.close()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    finally:
+        if writer is not None and writer.tmp_path.exists():
+            writer.abort()
+
+    report_path = reports_dir / f"{cfg.dataset.name}_anomalies_{method}.md"
+    with profiler.stage("report"):
+        generate_anomaly_report(
+            top,
+            str(report_path),
+            top_k=k,
+            stats=stats,
+            id_col=cfg.dataset.id_col,
+            ts_col=cfg.dataset.ts_col,
+        )
+        top.to_csv(report_path.with_suffix(".csv"), index=False)
+
+    click.echo("\n" + top.head(k).to_string(index=False))
+    click.echo(
+        f"\n✓ Scored {stats['rows']:,} rows of {stats['series']:,} series, "
+        f"{stats['anomalies']:,} anomalies ({stats['anomalies'] / stats['rows']:.2%})"
+    )
+    click.echo(f"Peak memory: {peak_rss_mb():,.0f} MB")
+    click.echo(f"Report: {report_path}")
+    if writer is not None and writer.n_parts:
+        click.echo(f"Flagged rows: {save}")
+
+    if profiler.enabled:
+        profile_paths = profiler.write(str(profiles_dir), profile_name)
+        setup_mlflow(cfg.logging.mlflow_experiment, tracking_uri=str(artifacts_dir / "mlruns"))
+        with start_run(run_name=profile_name):
+            for path in profile_paths:
+                log_artifact(path)
+        click.echo("\n" + profiler.summary().to_string(index=False, float_format="{:.2f}".format))
+        click.echo(f"Profile: {profile_paths[1]}")
+
+
+if __name__ == "__main__":
+    anomalies()
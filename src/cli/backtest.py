@@ -1,6 +1,7 @@
 """Backtest CLI command."""
 
 import click
+import os
 import sys
 from pathlib import Path
 
@@ -8,34 +9,123 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config import load_config
+from src.cv.backtest import run_backtest
+from src.cv.results import ResultStore
+from src.data.feature_store import FeatureStore
+from src.data.loaders import load_dataset
+from src.eval.compare import create_leaderboard
+from src.tracking.mlflow_utils import log_artifact, log_metrics, log_params, setup_mlflow, start_run
+from src.utils.profiling import StageProfiler
 
 
 @click.command()
 @click.option("--config", required=True, help="Path to config YAML file")
 @click.option("--models", required=True, help="Comma-separated list of models")
-def backtest(config: str, models: str):
+@click.option("--n-jobs", default=-1, show_default=True, help="Cores to use (-1 for all cores)")
+@click.option(
+    "--checkpoint/--no-checkpoint",
+    default=True,
+    show_default=True,
+    help="Store finished (model, fold, series) results and skip them on reruns",
+)
+@click.option(
+    "--results-dir", default=None, help="Result store directory (default: artifacts/backtests)"
+)
+@click.option("--profile", is_flag=True, help="Record wall/CPU time and peak memory per stage")
+@click.option("--cprofile", is_flag=True, help="Also dump cProfile stats (implies --profile)")
+def backtest(
+    config: str,
+    models: str,
+    n_jobs: int,
+    checkpoint: bool,
+    results_dir: str,
+    profile: bool,
+    cprofile: bool,
+):
     """Run backtest for specified models."""
     # Load configuration
     cfg = load_config(config)
     model_list = models.split(",")
-    
+
+    artifacts_dir = Path(os.environ.get("ARTIFACTS_DIR", "artifacts"))
+    profile_name = f"backtest_{cfg.dataset.name}"
+    profiles_dir = artifacts_dir / "reports" / "profiles"
+    profiler = StageProfiler(
+        enabled=profile or cprofile,
+        cprofile_dir=str(profiles_dir / profile_name) if cprofile else None,
+    )
+
     click.echo(f"Running backtest with config: {config}")
     click.echo(f"Models: {model_list}")
     click.echo(f"Dataset: {cfg.dataset.name}")
-    click.echo(f"Horizon: {cfg.dataset.horizon}")
+    click.echo(f"Horizon: {cfg.cv.horizon}")
     click.echo(f"CV splits: {cfg.cv.n_splits}")
-    
-    # Placeholder for actual backtest logic
-    # In production, this would:
-    # 1. Load data
-    # 2. Build features
-    # 3. Run CV splits
-    # 4. Train/evaluate each model
-    # 5. Log to MLflow
-    # 6. Generate reports
-    
+
+    with profiler.stage("load"):
+        cache = load_dataset(config, cfg.dataset.model_dump(), lazy=True)
+        df = cache.collect()
+
+    try:
+        predictions, metrics = run_backtest(
+            df,
+            {name: cfg.models.get(name, {}) for name in model_list},
+            cfg.features.model_dump(),
+            cfg.cv.model_dump(),
+            freq=cfg.dataset.freq,
+            ts_col=cfg.dataset.ts_col,
+            id_col=cfg.dataset.id_col,
+            n_jobs=n_jobs,
+            results=ResultStore(results_dir) if checkpoint else None,
+            profiler=profiler,
+            feature_store=FeatureStore(),
+            fingerprint=cache.fingerprint,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    with profiler.stage("leaderboard"):
+        leaderboard = create_leaderboard(metrics.to_dict("records"))
+    click.echo("\n" + leaderboard.to_string(index=False))
+
+    # Save results
+    reports_dir = artifacts_dir / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+
+    metrics_path = reports_dir / f"{cfg.dataset.name}_backtest_metrics.csv"
+    predictions_path = reports_dir / f"{cfg.dataset.name}_backtest_predictions.parquet"
+    with profiler.stage("save"):
+        metrics.to_csv(metrics_path, index=False)
+        if cfg.logging.save_predictions:
+            predictions.to_parquet(predictions_path, index=False)
+
+    # Log to MLflow
+    setup_mlflow(cfg.logging.mlflow_experiment, tracking_uri=str(artifacts_dir / "mlruns"))
+    with start_run(run_name=f"backtest_{cfg.dataset.name}"):
+        with profiler.stage("mlflow"):
+            log_params({
+                "dataset": cfg.dataset.name,
+                "models": models,
+                "n_splits": cfg.cv.n_splits,
+                "horizon": cfg.cv.horizon,
+            })
+            for row in metrics.to_dict("records"):
+                scores = {k: v for k, v in row.items() if k not in ("model", "fold")}
+                log_metrics({f"{row['model']}_{k}": v for k, v in scores.items()}, step=row["fold"])
+            log_artifact(str(metrics_path))
+            if cfg.logging.save_predictions:
+                log_artifact(str(predictions_path))
+
+        if profiler.enabled:
+            profile_paths = profiler.write(str(profiles_dir), profile_name)
+            for path in profile_paths:
+                log_artifact(path)
+
     click.echo("\n✓ Backtest completed successfully")
+    click.echo(f"Results: {metrics_path}")
     click.echo("View results: mlflow ui --backend-store-uri artifacts/mlruns")
+    if profiler.enabled:
+        click.echo("\n" + profiler.summary().to_string(index=False, float_format="{:.2f}".format))
+        click.echo(f"Profile: {profile_paths[1]}")
 
 
 if __name__ == "__main__":
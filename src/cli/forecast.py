@@ -0,0 +1,143 @@
+"""Batch forecast CLI command."""
+
+import click
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import load_config
+from src.cv.backtest import GLOBAL, MODELS
+from src.data.feature_store import FeatureStore
+from src.data.loaders import load_dataset
+from src.models.inference import ForecastWriter, batch_forecast, fit_global_model, save_model
+from src.tracking.mlflow_utils import log_artifact, setup_mlflow, start_run
+from src.utils.profiling import StageProfiler
+
+
+@click.command()
+@click.option("--config", required=True, help="Path to config YAML file")
+@click.option("--model", default="lgbm", show_default=True, help="Model to forecast with")
+@click.option("--horizon", type=int, default=None, help="Forecast horizon (default: dataset's)")
+@click.option(
+    "--save",
+    default=None,
+    help="Output .csv or .parquet file, or directory of Parquet parts "
+    "(default: artifacts/reports/<dataset>_forecast.parquet)",
+)
+@click.option(
+    "--model-path",
+    default=None,
+    help="Fitted model file (default: artifacts/models/<dataset>_<model>.joblib)",
+)
+@click.option("--refit", is_flag=True, help="Refit the model even if a fitted model exists")
+@click.option("--n-jobs", default=-1, show_default=True, help="Worker processes (-1 for all cores)")
+@click.option("--chunk-size", default=1000, show_default=True, help="Series per chunk")
+@click.option(
+    "--time-budget",
+    type=float,
+    default=None,
+    help="Abort once the projected run time exceeds this many seconds",
+)
+@click.option("--profile", is_flag=True, help="Record wall/CPU time and peak memory per stage")
+@click.option("--cprofile", is_flag=True, help="Also dump cProfile stats (implies --profile)")
+def forecast(
+    config: str,
+    model: str,
+    horizon: int,
+    save: str,
+    model_path: str,
+    refit: bool,
+    n_jobs: int,
+    chunk_size: int,
+    time_budget: float,
+    profile: bool,
+    cprofile: bool,
+):
+    """Forecast every series from its latest observation."""
+    cfg = load_config(config)
+    horizon = horizon or cfg.dataset.horizon
+
+    if model not in MODELS:
+        raise click.ClickException(f"Unknown model: {model}. Available: {list(MODELS)}")
+
+    artifacts_dir = Path(os.environ.get("ARTIFACTS_DIR", "artifacts"))
+    save = save or str(artifacts_dir / "reports" / f"{cfg.dataset.name}_forecast.parquet")
+
+    profile_name = f"forecast_{cfg.dataset.name}_{model}"
+    profiles_dir = artifacts_dir / "reports" / "profiles"
+    profiler = StageProfiler(
+        enabled=profile or cprofile,
+        cprofile_dir=str(profiles_dir / profile_name) if cprofile else None,
+    )
+
+    click.echo(f"Forecasting {cfg.dataset.name} with {model}, horizon {horizon}")
+
+    with profiler.stage("load"):
+        cache = load_dataset(config, cfg.dataset.model_dump(), lazy=True)
+        df = cache.collect()
+    features_config = cfg.features.model_dump()
+    model_config = cfg.models.get(model, {})
+
+    kind = MODELS[model][0]
+    if kind == GLOBAL:
+        default_path = artifacts_dir / "models" / f"{cfg.dataset.name}_{model}.joblib"
+        model_path = model_path or str(default_path)
+        if refit or not Path(model_path).exists():
+            click.echo(f"Fitting {model} on the full history -> {model_path}")
+            with profiler.stage("fit"):
+                fitted = fit_global_model(
+                    df,
+                    model,
+                    model_config,
+                    features_config,
+                    ts_col=cfg.dataset.ts_col,
+                    id_col=cfg.dataset.id_col,
+                    n_jobs=n_jobs,
+                    feature_store=FeatureStore(),
+                    fingerprint=cache.fingerprint,
+                )
+                save_model(fitted, model_path)
+
+    try:
+        with profiler.stage("forecast"), ForecastWriter(save) as writer:
+            stats = batch_forecast(
+                df,
+                model,
+                model_config,
+                features_config,
+                horizon,
+                cfg.dataset.freq,
+                writer,
+                model_path=model_path,
+                ts_col=cfg.dataset.ts_col,
+                id_col=cfg.dataset.id_col,
+                n_jobs=n_jobs,
+                chunk_size=chunk_size,
+                time_budget=time_budget,
+            )
+    except TimeoutError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"\n✓ Forecast {stats['rows']:,} rows for {stats['series']:,} series "
+        f"in {stats['seconds']:.1f}s"
+    )
+    click.echo(f"Throughput: {stats['rows_per_sec']:,.0f} rows/sec")
+    click.echo(f"Peak memory: {stats['peak_rss_mb']:,.0f} MB")
+    click.echo(f"Saved to: {save}")
+
+    if profiler.enabled:
+        profile_paths = profiler.write(str(profiles_dir), profile_name)
+        setup_mlflow(cfg.logging.mlflow_experiment, tracking_uri=str(artifacts_dir / "mlruns"))
+        with start_run(run_name=profile_name):
+            for path in profile_paths:
+                log_artifact(path)
+        click.echo("\n" + profiler.summary().to_string(index=False, float_format="{:.2f}".format))
+        click.echo(f"Profile: {profile_paths[1]}")
+
+
+if __name__ == "__main__":
+    forecast()
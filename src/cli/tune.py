@@ -0,0 +1,131 @@
+"""Hyperparameter tuning CLI command."""
+
+import click
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import load_config
+from src.cv.tuning import tune_model
+from src.data.feature_store import FeatureStore
+from src.data.loaders import load_dataset
+from src.tracking.mlflow_utils import log_artifact, log_metrics, log_params, setup_mlflow, start_run
+from src.utils.profiling import StageProfiler
+
+
+@click.command()
+@click.option("--config", required=True, help="Path to config YAML file")
+@click.option("--model", default="lgbm", show_default=True, help="Global model to tune")
+@click.option("--trials", default=50, show_default=True, help="Number of trials")
+@click.option("--eta", type=int, default=None, help="Successive halving factor (default: config's)")
+@click.option("--n-jobs", default=-1, show_default=True, help="Cores to use (-1 for all cores)")
+@click.option("--threads", default=1, show_default=True, help="Threads per trial fit")
+@click.option("--profile", is_flag=True, help="Record wall/CPU time and peak memory per stage")
+@click.option("--cprofile", is_flag=True, help="Also dump cProfile stats (implies --profile)")
+def tune(
+    config: str,
+    model: str,
+    trials: int,
+    eta: int,
+    n_jobs: int,
+    threads: int,
+    profile: bool,
+    cprofile: bool,
+):
+    """Tune a model with successive halving over backtest folds."""
+    cfg = load_config(config)
+    eta = eta or cfg.tuning.eta
+    metric = cfg.tuning.metric
+
+    artifacts_dir = Path(os.environ.get("ARTIFACTS_DIR", "artifacts"))
+    profile_name = f"tune_{cfg.dataset.name}_{model}"
+    profiles_dir = artifacts_dir / "reports" / "profiles"
+    profiler = StageProfiler(
+        enabled=profile or cprofile,
+        cprofile_dir=str(profiles_dir / profile_name) if cprofile else None,
+    )
+
+    click.echo(f"Tuning {model} on {cfg.dataset.name}: {trials} trials, {metric}, eta={eta}")
+
+    with profiler.stage("load"):
+        cache = load_dataset(config, cfg.dataset.model_dump(), lazy=True)
+        df = cache.collect()
+
+    try:
+        results, best = tune_model(
+            df,
+            model,
+            cfg.models.get(model, {}),
+            cfg.features.model_dump(),
+            cfg.cv.model_dump(),
+            n_trials=trials,
+            search_space=cfg.tuning.search_space.get(model),
+            metric=metric,
+            eta=eta,
+            ts_col=cfg.dataset.ts_col,
+            id_col=cfg.dataset.id_col,
+            n_jobs=n_jobs,
+            threads=threads,
+            seed=cfg.tuning.seed,
+            profiler=profiler,
+            feature_store=FeatureStore(),
+            fingerprint=cache.fingerprint,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    n_folds = int(results["n_folds"].max())
+    click.echo("\n" + results.head(10).to_string(index=False))
+    click.echo(
+        f"\nFold fits: {results['n_folds'].sum()} instead of {trials * n_folds} "
+        f"({(results['status'] == 'pruned').sum()} trials pruned)"
+    )
+
+    # Save results
+    reports_dir = artifacts_dir / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+
+    trials_path = reports_dir / f"{cfg.dataset.name}_{model}_tuning.csv"
+    best_path = reports_dir / f"{cfg.dataset.name}_{model}_best_params.json"
+    with profiler.stage("save"):
+        results.to_csv(trials_path, index=False)
+        with open(best_path, "w") as f:
+            json.dump(best, f, indent=2, default=str)
+
+    # Log to MLflow
+    setup_mlflow(cfg.logging.mlflow_experiment, tracking_uri=str(artifacts_dir / "mlruns"))
+    with start_run(run_name=f"tune_{cfg.dataset.name}_{model}"):
+        with profiler.stage("mlflow"):
+            log_params({
+                "dataset": cfg.dataset.name,
+                "model": model,
+                "trials": trials,
+                "eta": eta,
+                **{f"best_{k}": v for k, v in best.items()},
+            })
+            log_metrics({
+                f"best_{metric}": float(results[metric].iloc[0]),
+                "fold_fits": float(results["n_folds"].sum()),
+            })
+            log_artifact(str(trials_path))
+            log_artifact(str(best_path))
+
+        if profiler.enabled:
+            profile_paths = profiler.write(str(profiles_dir), profile_name)
+            for path in profile_paths:
+                log_artifact(path)
+
+    best_score, best_trial = results[metric].iloc[0], results["trial"].iloc[0]
+    click.echo(f"\n✓ Best {metric}: {best_score:.4f} (trial {best_trial})")
+    click.echo(f"Best params: {best_path}")
+    if profiler.enabled:
+        click.echo("\n" + profiler.summary().to_string(index=False, float_format="{:.2f}".format))
+        click.echo(f"Profile: {profile_paths[1]}")
+
+
+if __name__ == "__main__":
+    tune()
@@ -1,7 +1,7 @@
 """Configuration management using Pydantic."""
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import yaml
 from pydantic import BaseModel, Field
@@ -23,8 +23,9 @@ class FeaturesConfig(BaseModel):
     rolls: List[Dict[str, Any]] = Field(default_factory=list)
     fourier: Optional[Dict[str, Any]] = None
     holidays: Optional[Dict[str, Any]] = None
-    promos: Optional[List[Dict[str, str]]] = None
+    promos: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None
     weather: Optional[Dict[str, Any]] = None
+    compact: bool = False
 
 
 class CVConfig(BaseModel):
@@ -47,6 +48,13 @@ class AnomalyConfig(BaseModel):
     ocsvm: Optional[Dict[str, Any]] = None
 
 
+class TuningConfig(BaseModel):
+    metric: str = "rmse"
+    eta: int = 3
+    seed: int = 42
+    search_space: Dict[str, Dict[str, Dict[str, Any]]] = Field(default_factory=dict)
+
+
 class LoggingConfig(BaseModel):
     mlflow_experiment: str = "ts-forecasting"
     log_level: str = "INFO"
@@ -60,14 +68,25 @@ class Config(BaseModel):
     cv: CVConfig
     reconciliation: Optional[ReconciliationConfig] = None
     anomaly: Optional[AnomalyConfig] = None
+    tuning: TuningConfig = Field(default_factory=TuningConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
 
     @classmethod
     def from_yaml(cls, path: str) -> "Config":
-        """Load configuration from YAML file."""
+        """Load configuration from YAML file.
+
+        A relative ``features.weather.path`` is resolved against the config
+        file's directory, like ``dataset.path``.
+        """
         with open(path, "r") as f:
             data = yaml.safe_load(f)
-        return cls(**data)
+        config = cls(**data)
+
+        weather = config.features.weather
+        if weather and weather.get("path") and not Path(weather["path"]).is_absolute():
+            weather["path"] = str(Path(path).parent / weather["path"])
+
+        return config
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary."""
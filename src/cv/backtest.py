@@ -0,0 +1,563 @@
+"""Parallel rolling-origin backtest over a (model x fold) grid."""
+
+import hashlib
+import tempfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs, parallel_config
+
+from src.cv.features import FoldFeatures
+from src.cv.results import ResultStore
+from src.cv.splits import Fold, rolling_origin_folds
+from src.data.cache import frame_fingerprint
+from src.data.feature_store import FeatureStore
+from src.data.store import FrameStore
+from src.eval.metrics import calculate_metrics
+from src.utils.profiling import StageProfiler
+
+# Model kinds: local models are fit per series on its target history,
+# global models once per fold on the feature matrix of all series
+LOCAL = "local"
+GLOBAL = "global"
+
+# Local-model tasks per worker, so series of uneven cost still balance
+CHUNKS_PER_WORKER = 4
+
+
+def _fit_naive(config: Dict, ds: np.ndarray, y: np.ndarray, horizon: int, freq: str) -> np.ndarray:
+    from src.models.baselines import NaiveForecaster
+
+    return NaiveForecaster(config.get("seasonal_period", 1)).fit(y).predict(horizon)
+
+
+def _fit_ets(config: Dict, ds: np.ndarray, y: np.ndarray, horizon: int, freq: str) -> np.ndarray:
+    from src.models.baselines import ExponentialSmoothingForecaster
+
+    return ExponentialSmoothingForecaster(**config).fit(y).predict(horizon)
+
+
+def _fit_prophet(
+    config: Dict, ds: np.ndarray, y: np.ndarray, horizon: int, freq: str
+) -> np.ndarray:
+    from src.models.prophet_model import ProphetForecaster
+
+    model = ProphetForecaster(config).fit(pd.DataFrame({"ds": ds, "y": y}))
+    return model.predict(horizon, freq)["yhat"].to_numpy()
+
+
+def _train_lgbm(config: Dict, X_train: pd.DataFrame, y_train: np.ndarray, threads: int) -> Any:
+    from src.models.lgbm_model import LightGBMForecaster
+
+    return LightGBMForecaster({**config, "num_threads": threads}).fit(X_train, y_train)
+
+
+def _fit_lgbm(
+    config: Dict,
+    X_train: pd.DataFrame,
+    y_train: np.ndarray,
+    X_test: pd.DataFrame,
+    threads: int,
+) -> np.ndarray:
+    return _train_lgbm(config, X_train, y_train, threads).predict(X_test)
+
+
+# Model name -> (kind, fit function, threads per fit). Prophet fits are
+# single-threaded and CPU-bound, so they run one per core; LightGBM is
+# multithreaded, so its folds run one at a time on all cores (None).
+MODELS: Dict[str, Tuple[str, Callable, Optional[int]]] = {
+    "naive": (LOCAL, _fit_naive, 1),
+    "ets": (LOCAL, _fit_ets, 1),
+    "prophet": (LOCAL, _fit_prophet, 1),
+    "lgbm": (GLOBAL, _fit_lgbm, None),
+}
+
+# Global model name -> function fitting a model with ``predict(X)`` once,
+# for models that are trained ahead of batch forecasting
+TRAINERS: Dict[str, Callable] = {
+    "lgbm": _train_lgbm,
+}
+
+
+# Where a worker checkpoints its results: (store, backtest key, model key, fold)
+Sink = Optional[Tuple[ResultStore, str, str, int]]
+
+
+def _factorize_series(df: pd.DataFrame, id_col: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Get series codes per row and series IDs, as a ``FrameStore`` stores them."""
+    if id_col is None:
+        return np.zeros(len(df), dtype=np.int32), np.array([""], dtype=object)
+    codes, uniques = pd.factorize(df[id_col], sort=True)
+    return codes.astype(np.int32), np.asarray([str(u) for u in uniques], dtype=object)
+
+
+def _sort_panel(
+    df: pd.DataFrame,
+    ts_col: str,
+    id_col: Optional[str],
+    fingerprint: Optional[str],
+) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Sort a panel by series and time.
+
+    Returns:
+        Tuple of (sorted frame with a fresh index, fingerprint of the sorted
+        frame derived from the input's, or None)
+    """
+    df = df.sort_values([id_col, ts_col] if id_col else ts_col, kind="stable")
+    df = df.reset_index(drop=True)
+    if fingerprint is not None:
+        # Stored features are aligned by row, so the key follows the order
+        fingerprint = hashlib.sha256(f"{fingerprint}:{id_col}:{ts_col}".encode()).hexdigest()
+    return df, fingerprint
+
+
+def _series_codes(store: FrameStore, id_col: Optional[str]) -> np.ndarray:
+    if id_col is None:
+        return np.zeros(len(store), dtype=np.int32)
+    return store.values(id_col)
+
+
+def _checkpoint(
+    sink: Sink,
+    store: FrameStore,
+    id_col: Optional[str],
+    rows: np.ndarray,
+    predictions: np.ndarray,
+) -> None:
+    """Append a finished task's predictions to the result store."""
+    if sink is None:
+        return
+    results, backtest_key, model_key, fold = sink
+    names = np.asarray(store.categories[id_col] if id_col else [""], dtype=object)
+    series = names[_series_codes(store, id_col)[rows]]
+    results.write(backtest_key, model_key, fold, series, rows, predictions)
+
+
+def _run_local(
+    store: FrameStore,
+    fit: Callable,
+    config: Dict,
+    freq: str,
+    ts_col: str,
+    target_col: str,
+    id_col: Optional[str],
+    train_path: str,
+    test_path: str,
+    series: np.ndarray,
+    sink: Sink = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit a local model on each series of a chunk and forecast its test rows.
+
+    Each series is a contiguous block of the store, so its fold rows are
+    found by binary search in the sorted fold indices instead of scanning
+    every fold row per chunk.
+
+    Returns:
+        Tuple of (test row positions, predictions)
+    """
+    train_idx = np.load(train_path, mmap_mode="r")
+    test_idx = np.load(test_path, mmap_mode="r")
+
+    ds = store.values(ts_col)
+    y = store.values(target_col)
+
+    test_parts = []
+    prediction_parts = []
+    for code in series:
+        start, end = store.bounds(code)
+        lo, hi = np.searchsorted(train_idx, [start, end])
+        train = train_idx[lo:hi]
+        lo, hi = np.searchsorted(test_idx, [start, end])
+        rows = np.asarray(test_idx[lo:hi])
+
+        predictions = np.full(len(rows), np.nan)
+        train_y = np.asarray(y[train], dtype=np.float64)
+        valid = ~np.isnan(train_y)
+        if len(rows) and valid.any():
+            predictions[:] = fit(
+                config,
+                ds[train][valid].view("datetime64[ns]"),
+                train_y[valid],
+                len(rows),
+                freq,
+            )
+        test_parts.append(rows)
+        prediction_parts.append(predictions)
+
+    test_rows = np.concatenate(test_parts) if test_parts else np.array([], np.int64)
+    predictions = np.concatenate(prediction_parts) if prediction_parts else np.array([])
+    _checkpoint(sink, store, id_col, test_rows, predictions)
+
+    return test_rows, predictions
+
+
+def _run_global(
+    store: FrameStore,
+    test_store: FrameStore,
+    fit: Callable,
+    config: Dict,
+    threads: int,
+    feature_cols: List[str],
+    target_col: str,
+    id_col: Optional[str],
+    train_path: str,
+    test_path: str,
+    sink: Sink = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit a global model on one fold's training rows and predict its test rows.
+
+    Returns:
+        Tuple of (test row positions, predictions)
+    """
+    train_idx = np.load(train_path)
+    y_train = np.asarray(store.values(target_col)[train_idx], dtype=np.float64)
+    labeled = ~np.isnan(y_train)
+
+    X_train = store.take(train_idx[labeled], feature_cols)
+    X_test = test_store.take(columns=feature_cols)
+    predictions = fit(config, X_train, y_train[labeled], X_test, threads)
+    predictions = np.asarray(predictions, dtype=np.float64)
+
+    test_rows = np.load(test_path)
+    _checkpoint(sink, store, id_col, test_rows, predictions)
+
+    return test_rows, predictions
+
+
+class SharedFolds:
+    """Fold data shared with worker processes through a temporary directory.
+
+    Attributes:
+        store: ``FrameStore`` of the panel, or of the full-history feature
+            matrix when features were built
+        test_stores: Fold -> ``FrameStore`` of its causal test features
+            (empty without features)
+        feature_cols: Feature columns of ``store``
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        store: FrameStore,
+        test_stores: Dict[int, FrameStore],
+        feature_cols: List[str],
+    ):
+        self.root = root
+        self.store = store
+        self.test_stores = test_stores
+        self.feature_cols = feature_cols
+
+    def paths(self, fold: int) -> Tuple[str, str]:
+        """Get the paths of a fold's train and test row indices."""
+        return str(self.root / f"fold_{fold}_train.npy"), str(self.root / f"fold_{fold}_test.npy")
+
+
+@contextmanager
+def shared_folds(
+    df: pd.DataFrame,
+    folds: List[Fold],
+    features_config: Optional[Dict],
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+    work_dir: Optional[str] = None,
+    feature_store: Optional[FeatureStore] = None,
+    fingerprint: Optional[str] = None,
+) -> Iterator[SharedFolds]:
+    """Write a panel and its folds to a temporary memory-mapped store.
+
+    With a features config, the feature matrix is built once over the full
+    history with ``FoldFeatures`` and every fold's causal test features are
+    stored as well, so any number of fits can reuse them.
+
+    Args:
+        df: DataFrame with time series, sorted by series and time
+        folds: Folds of ``df``
+        features_config: Features configuration dict (if None, the panel
+            itself is stored and no features are built)
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+        work_dir: Parent directory of the temporary store (if None, the
+            system temporary directory)
+        feature_store: Store to reuse the feature matrix from (if None,
+            features are always built)
+        fingerprint: Data fingerprint of ``df`` for ``feature_store``
+
+    Yields:
+        SharedFolds, removed on exit
+    """
+    fold_features = None
+    frame = df
+    if features_config is not None:
+        fold_features = FoldFeatures(
+            df, features_config, ts_col, target_col, id_col, feature_store, fingerprint
+        )
+        frame = fold_features.features
+    feature_cols = [c for c in frame.columns if c not in (ts_col, target_col)]
+
+    with tempfile.TemporaryDirectory(prefix="backtest-", dir=work_dir) as tmp:
+        tmp_dir = Path(tmp)
+        store = FrameStore.build(frame, str(tmp_dir / "data"), id_col)
+
+        test_stores = {}
+        for k, fold in enumerate(folds):
+            np.save(tmp_dir / f"fold_{k}_train.npy", fold.train_idx)
+            np.save(tmp_dir / f"fold_{k}_test.npy", fold.test_idx)
+            if fold_features is not None:
+                test = fold_features.test_features(fold.train_idx, fold.test_idx)
+                test_stores[k] = FrameStore.build(test, str(tmp_dir / f"fold_{k}_test"))
+
+        yield SharedFolds(tmp_dir, store, test_stores, feature_cols)
+
+
+def run_backtest(
+    df: pd.DataFrame,
+    models: Dict[str, Dict[str, Any]],
+    features_config: Dict,
+    cv_config: Dict,
+    freq: str,
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+    n_jobs: int = 1,
+    registry: Optional[Dict[str, Tuple[str, Callable, Optional[int]]]] = None,
+    work_dir: Optional[str] = None,
+    results: Optional[ResultStore] = None,
+    profiler: Optional[StageProfiler] = None,
+    feature_store: Optional[FeatureStore] = None,
+    fingerprint: Optional[str] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Run a rolling-origin backtest of several models in parallel.
+
+    The panel (and, for global models, the feature matrix built once by
+    ``FoldFeatures``) is written to a memory-mapped ``FrameStore`` along
+    with each fold's row indices. Worker processes receive only store
+    paths, fold numbers and series codes, and read the rows they need
+    through the page cache. Tasks are (model, fold) for global models and
+    (model, fold, series chunk) for local models; tasks of a model run
+    ``n_jobs // threads`` at a time with each worker limited to the
+    model's thread count.
+
+    With a ``ResultStore``, each task appends its predictions as soon as
+    it finishes. A rerun of the same data and CV setup only schedules the
+    (model, fold, series) units that are not stored yet, so an
+    interrupted backtest resumes where it stopped and a model added to an
+    old backtest is the only one fitted.
+
+    Args:
+        df: DataFrame with time series
+        models: Model name -> model config, in reporting order
+        features_config: Features configuration dict (for global models)
+        cv_config: CV configuration dict (``n_splits``, ``horizon``,
+            ``min_train_points``, ``step_size``)
+        freq: Pandas frequency string of the series
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+        n_jobs: Number of cores to use (-1 for all cores)
+        registry: Model name -> (kind, fit function, threads) (if None,
+            ``MODELS``)
+        work_dir: Parent directory of the temporary store (if None, the
+            system temporary directory)
+        results: Store to checkpoint predictions to and resume from (if
+            None, nothing is persisted)
+        profiler: Records the split, resume, features, fit_predict and
+            metrics stages (if None, nothing is recorded)
+        feature_store: Store to reuse the global models' feature matrix
+            from (if None, features are always built)
+        fingerprint: Data fingerprint of ``df`` (e.g. ``LazyDataset.fingerprint``)
+            for ``feature_store``; if None, the store hashes the panel
+
+    Returns:
+        Tuple of (predictions, metrics). Predictions have one row per
+        (model, fold, test row) with the ID, timestamp, target and
+        ``yhat``; metrics have one row per (model, fold). Both are sorted
+        by model order, fold and row, independent of scheduling.
+
+    Raises:
+        ValueError: If a model is unknown or no fold has enough history
+    """
+    registry = registry or MODELS
+    profiler = profiler or StageProfiler(enabled=False)
+    unknown = [name for name in models if name not in registry]
+    if unknown:
+        raise ValueError(f"Unknown models: {unknown}. Available: {list(registry)}")
+
+    n_cores = effective_n_jobs(n_jobs)
+
+    with profiler.stage("split"):
+        df, fingerprint = _sort_panel(df, ts_col, id_col, fingerprint)
+        folds = list(rolling_origin_folds(
+            df,
+            n_splits=cv_config.get("n_splits", 4),
+            horizon=cv_config.get("horizon", 28),
+            min_train_points=cv_config.get("min_train_points", 365),
+            step_size=cv_config.get("step_size"),
+            ts_col=ts_col,
+            id_col=id_col,
+        ))
+        if not folds:
+            raise ValueError("No fold has enough training history")
+
+        codes, series_ids = _factorize_series(df, id_col)
+
+    # Finished units of each model, if results are checkpointed
+    model_keys: Dict[str, str] = {}
+    done: Dict[str, Dict[int, set]] = {name: {} for name in models}
+    if results is not None:
+        with profiler.stage("resume"):
+            id_cols = [id_col] if id_col else []
+            backtest_key = results.backtest_key(
+                frame_fingerprint(df, id_cols + [ts_col, target_col]),
+                cv_config,
+                ts_col=ts_col,
+                target_col=target_col,
+                id_col=id_col,
+            )
+            for name, config in models.items():
+                kind = registry[name][0]
+                model_keys[name] = results.model_key(
+                    name, config, freq=freq, features=features_config if kind == GLOBAL else None
+                )
+                done[name] = results.completed(backtest_key, model_keys[name])
+
+    # (threads, model, fold, series chunk) in deterministic order; global
+    # tasks have no chunk
+    plan = []
+    for name in models:
+        kind, _, threads = registry[name]
+        threads = min(threads or n_cores, n_cores)
+
+        for k, fold in enumerate(folds):
+            finished = done[name].get(k, set())
+            if kind == GLOBAL:
+                if not finished:
+                    plan.append((threads, name, k, None))
+                continue
+
+            series = np.unique(codes[fold.test_idx])
+            series = series[~np.isin(series_ids[series], list(finished))]
+            if not len(series):
+                continue
+            n_chunks = min(len(series), max(1, n_cores // threads) * CHUNKS_PER_WORKER)
+            for chunk in np.array_split(series, n_chunks):
+                plan.append((threads, name, k, chunk))
+
+    outputs: Dict[Tuple[str, int], List[Tuple[np.ndarray, np.ndarray]]] = {}
+    if plan:
+        outputs = _run_plan(
+            plan, df, folds, models, registry, features_config, freq, ts_col, target_col, id_col,
+            n_cores, work_dir, (results, backtest_key, model_keys) if results is not None else None,
+            profiler, feature_store, fingerprint,
+        )
+
+    with profiler.stage("metrics"):
+        id_cols = [id_col] if id_col else []
+        prediction_frames = []
+        metric_rows = []
+        for name in models:
+            if results is not None:
+                stored = results.read(backtest_key, model_keys[name])
+                outputs.update({
+                    (name, int(k)): [(group["row"].to_numpy(), group["yhat"].to_numpy())]
+                    for k, group in stored.groupby("fold")
+                })
+
+            for k in range(len(folds)):
+                parts = outputs.get((name, k), [])
+                rows = np.concatenate([r for r, _ in parts]) if parts else np.array([], np.int64)
+                yhat = np.concatenate([pred for _, pred in parts]) if parts else np.array([])
+                order = np.argsort(rows, kind="stable")
+                rows, yhat = rows[order], yhat[order]
+
+                part = df.iloc[rows][id_cols + [ts_col, target_col]].reset_index(drop=True)
+                part.insert(0, "fold", k)
+                part.insert(0, "model", name)
+                part["yhat"] = yhat
+                prediction_frames.append(part)
+
+                y_true = part[target_col].to_numpy(dtype=np.float64)
+                scored = ~(np.isnan(y_true) | np.isnan(yhat))
+                metric_rows.append({
+                    "model": name,
+                    "fold": k,
+                    "n_predictions": int(scored.sum()),
+                    **calculate_metrics(y_true[scored], yhat[scored]),
+                })
+
+        predictions = pd.concat(prediction_frames, ignore_index=True)
+        metrics = pd.DataFrame(metric_rows)
+
+    return predictions, metrics
+
+
+def _run_plan(
+    plan: List[Tuple[int, str, int, Optional[np.ndarray]]],
+    df: pd.DataFrame,
+    folds: List[Fold],
+    models: Dict[str, Dict[str, Any]],
+    registry: Dict[str, Tuple[str, Callable, Optional[int]]],
+    features_config: Dict,
+    freq: str,
+    ts_col: str,
+    target_col: str,
+    id_col: Optional[str],
+    n_cores: int,
+    work_dir: Optional[str],
+    checkpoint: Optional[Tuple[ResultStore, str, Dict[str, str]]],
+    profiler: StageProfiler,
+    feature_store: Optional[FeatureStore],
+    fingerprint: Optional[str],
+) -> Dict[Tuple[str, int], List[Tuple[np.ndarray, np.ndarray]]]:
+    """Share the data through a temporary store and run planned tasks.
+
+    Returns:
+        (model, fold) -> list of (test row positions, predictions)
+    """
+    # Features are only built when a global model still has folds to fit
+    with_features = any(registry[name][0] == GLOBAL for _, name, _, _ in plan)
+
+    with ExitStack() as stack:
+        with profiler.stage("features"):
+            shared = stack.enter_context(shared_folds(
+                df, folds, features_config if with_features else None, ts_col, target_col, id_col,
+                work_dir, feature_store, fingerprint,
+            ))
+
+        calls = []
+        for threads, name, k, chunk in plan:
+            kind, fit, _ = registry[name]
+            paths = shared.paths(k)
+            sink = None
+            if checkpoint is not None:
+                results, backtest_key, model_keys = checkpoint
+                sink = (results, backtest_key, model_keys[name], k)
+
+            if kind == GLOBAL:
+                calls.append(delayed(_run_global)(
+                    shared.store, shared.test_stores[k], fit, models[name], threads,
+                    shared.feature_cols, target_col, id_col, *paths, sink,
+                ))
+            else:
+                calls.append(delayed(_run_local)(
+                    shared.store, fit, models[name], freq, ts_col, target_col, id_col, *paths,
+                    chunk, sink,
+                ))
+
+        outputs: Dict[Tuple[str, int], List[Tuple[np.ndarray, np.ndarray]]] = {}
+        with profiler.stage("fit_predict"):
+            for threads in sorted({task[0] for task in plan}):
+                group = [i for i, task in enumerate(plan) if task[0] == threads]
+                with parallel_config(backend="loky", inner_max_num_threads=threads):
+                    group_outputs = Parallel(n_jobs=max(1, n_cores // threads))(
+                        calls[i] for i in group
+                    )
+                for i, output in zip(group, group_outputs):
+                    _, name, k, _ = plan[i]
+                    outputs.setdefault((name, k), []).append(output)
+
+    return outputs
@@ -0,0 +1,157 @@
+"""Fold-aware features: build once over the full history, slice per fold."""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import FeatureStore
+from src.data.features import _group_layout, _rolling_names, build_features
+
+
+class FoldFeatures:
+    """Feature matrix built once and handed out causally per CV fold.
+
+    Lag and rolling features of a row only look backwards within its
+    series, so one ``build_features`` call over the full history gives
+    every training row of every fold the same values a per-fold build
+    would. Test rows are then made causal with respect to the fold
+    cutoff (the series' last training row):
+
+    * ``lag_k`` is NaN when the lagged row is at or after the cutoff
+    * rolling statistics are frozen at their value on the last training row
+
+    Calendar, Fourier, holiday, promo and weather features are known in
+    advance and are used as is (Fourier terms use a fixed epoch, so they
+    do not depend on the fold window).
+
+    Example:
+        >>> folds = FoldFeatures(df, config["features"], id_col="series_id")
+        >>> for fold in rolling_origin_folds(df, 5, 28, 365, id_col="series_id"):
+        ...     train, test = folds.fold(fold.train_idx, fold.test_idx)
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Dict,
+        ts_col: str = "ds",
+        target_col: str = "y",
+        id_col: Optional[str] = None,
+        feature_store: Optional[FeatureStore] = None,
+        fingerprint: Optional[str] = None,
+        **build_kwargs,
+    ):
+        """Build the full-history feature matrix.
+
+        Args:
+            df: DataFrame with time series, in time order within each series
+            config: Features configuration dict
+            ts_col: Name of timestamp column
+            target_col: Name of target column
+            id_col: Name of ID column for panel data
+            feature_store: Store to reuse the feature matrix from (if None,
+                features are always built)
+            fingerprint: Data fingerprint of ``df`` for ``feature_store``
+                (if None, hashed from the input columns)
+            **build_kwargs: Passed to ``build_features`` (e.g. ``n_jobs``)
+        """
+        self.config = config
+        self.id_col = id_col
+        if feature_store is not None:
+            self.features = feature_store.build_features(
+                df, config, ts_col, target_col, id_col, fingerprint=fingerprint
+            )
+        else:
+            self.features = build_features(df, config, ts_col, target_col, id_col, **build_kwargs)
+
+        order, codes, pos, _ = _group_layout(df, id_col)
+        n = len(df)
+
+        # Series code and position within series, in original row order
+        self.codes = np.empty(n, dtype=np.int64)
+        self.codes[order] = codes
+        self.pos = np.empty(n, dtype=np.int64)
+        self.pos[order] = pos
+
+        self._order = order
+        self._starts = np.flatnonzero(pos == 0)
+        self._n_series = len(self._starts)
+
+        self.lag_cols = {f"lag_{lag}": lag for lag in config.get("lags") or []}
+        self.roll_cols = _rolling_names(config.get("rolls") or [])
+        self._roll_positions = [self.features.columns.get_loc(col) for col in self.roll_cols]
+
+    def cutoffs(self, train_idx: np.ndarray) -> np.ndarray:
+        """Get the per-series cutoff position of a fold.
+
+        Args:
+            train_idx: Positional indices of training rows
+
+        Returns:
+            Array indexed by series code with the position just after each
+            series' last training row (0 for series without training rows)
+        """
+        cutoff = np.zeros(self._n_series, dtype=np.int64)
+        codes = self.codes[train_idx]
+        valid = codes >= 0
+        np.maximum.at(cutoff, codes[valid], self.pos[train_idx][valid] + 1)
+        return cutoff
+
+    def fold(
+        self,
+        train_idx: np.ndarray,
+        test_idx: np.ndarray,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Slice one fold out of the full-history features.
+
+        Args:
+            train_idx: Positional indices of training rows
+            test_idx: Positional indices of test rows
+
+        Returns:
+            Tuple of (train features, causal test features)
+        """
+        train = self.features.iloc[np.asarray(train_idx)]
+        return train, self.test_features(train_idx, test_idx)
+
+    def test_features(self, train_idx: np.ndarray, test_idx: np.ndarray) -> pd.DataFrame:
+        """Get the causal test features of one fold.
+
+        Args:
+            train_idx: Positional indices of training rows
+            test_idx: Positional indices of test rows
+
+        Returns:
+            Test rows with lags masked and rolling stats frozen at the cutoff
+        """
+        train_idx = np.asarray(train_idx)
+        test_idx = np.asarray(test_idx)
+
+        test = self.features.iloc[test_idx].copy()
+
+        cutoff = self.cutoffs(train_idx)
+        codes = self.codes[test_idx]
+        pos = self.pos[test_idx]
+        row_cutoff = np.where(codes >= 0, cutoff[np.maximum(codes, 0)], 0)
+
+        for col, lag in self.lag_cols.items():
+            if col in test.columns:
+                leaked = pos - lag >= row_cutoff
+                test.loc[test.index[leaked], col] = np.nan
+
+        if self.roll_cols:
+            # Row holding each test row's last training observation
+            has_train = (codes >= 0) & (row_cutoff > 0)
+            last = self._order[self._starts[np.maximum(codes, 0)] + np.maximum(row_cutoff - 1, 0)]
+
+            frozen = self.features.iloc[last, self._roll_positions].to_numpy(dtype=np.float64)
+            frozen[~has_train] = np.nan
+
+            # Test rows before the cutoff (overlapping folds) keep their values
+            after = pos >= row_cutoff
+            values = test[self.roll_cols].to_numpy(dtype=np.float64, copy=True)
+            values[after] = frozen[after]
+            test[self.roll_cols] = values.astype(test[self.roll_cols].dtypes.iloc[0], copy=False)
+
+        return test
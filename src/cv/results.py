@@ -0,0 +1,171 @@
+"""Append-only store of backtest results for checkpoint and resume."""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bump when the stored layout changes so old results are not mixed in
+RESULTS_VERSION = "1"
+
+RESULT_SCHEMA = pa.schema([
+    ("fold", pa.int32()),
+    ("series", pa.string()),
+    ("row", pa.int64()),
+    ("yhat", pa.float64()),
+])
+
+
+def _hash(payload: Any) -> str:
+    payload = {"version": RESULTS_VERSION, **payload}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+class ResultStore:
+    """Append-only Parquet store of backtest predictions per unit of work.
+
+    A unit is one (model, fold, series). Results are grouped by a
+    backtest key (data fingerprint and CV setup, which fix the folds and
+    row positions) and a model key (model name and config). Every
+    finished task appends one immutable part file, so a crash or
+    pre-emption loses at most the tasks that were running. A rerun reads
+    the finished units and only schedules the missing ones, and adding a
+    model to an old backtest only fits the new model.
+
+    Layout::
+
+        root/<backtest key>/<model key>/part-<fold>-<time>-<token>.parquet
+
+    Example:
+        >>> results = ResultStore()
+        >>> predictions, metrics = run_backtest(df, models, ..., results=results)
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """Initialize result store.
+
+        Args:
+            root: Store directory (if None, ``$ARTIFACTS_DIR/backtests``)
+        """
+        if root is None:
+            root = Path(os.environ.get("ARTIFACTS_DIR", "artifacts")) / "backtests"
+        self.root = Path(root)
+
+    @staticmethod
+    def backtest_key(fingerprint: str, cv_config: Dict, **columns: Optional[str]) -> str:
+        """Get the key of a backtest setup.
+
+        Args:
+            fingerprint: Fingerprint of the (sorted) panel
+            cv_config: CV configuration dict
+            **columns: Timestamp, target and ID column names
+
+        Returns:
+            Hex key of the data and fold definition
+        """
+        return _hash({"data": fingerprint, "cv": cv_config, "columns": columns})
+
+    @staticmethod
+    def model_key(name: str, config: Dict, **context: Any) -> str:
+        """Get the key of a model configuration.
+
+        Args:
+            name: Model name
+            config: Model config
+            **context: Other settings the predictions depend on (e.g. the
+                features config of a global model, the data frequency)
+
+        Returns:
+            Hex key of the model configuration
+        """
+        return _hash({"name": name, "config": config, "context": context})
+
+    def _dir(self, backtest_key: str, model_key: str) -> Path:
+        return self.root / backtest_key / model_key
+
+    def _read(
+        self, backtest_key: str, model_key: str, columns: Optional[list] = None
+    ) -> pd.DataFrame:
+        parts = sorted(self._dir(backtest_key, model_key).glob("part-*.parquet"))
+        if not parts:
+            return RESULT_SCHEMA.empty_table().select(columns or RESULT_SCHEMA.names).to_pandas()
+        tables = [pq.read_table(part, columns=columns) for part in parts]
+        return pa.concat_tables(tables).to_pandas()
+
+    def completed(self, backtest_key: str, model_key: str) -> Dict[int, Set[str]]:
+        """Get the finished units of a model.
+
+        Args:
+            backtest_key: Backtest key
+            model_key: Model key
+
+        Returns:
+            Fold -> set of series with stored predictions
+        """
+        done = self._read(backtest_key, model_key, columns=["fold", "series"]).drop_duplicates()
+        return {int(fold): set(group["series"]) for fold, group in done.groupby("fold")}
+
+    def write(
+        self,
+        backtest_key: str,
+        model_key: str,
+        fold: int,
+        series: np.ndarray,
+        rows: np.ndarray,
+        yhat: np.ndarray,
+    ) -> Path:
+        """Append the predictions of finished units.
+
+        The part is written under a temporary name and renamed, so readers
+        never see partial files.
+
+        Args:
+            backtest_key: Backtest key
+            model_key: Model key
+            fold: Fold number
+            series: Series ID of each prediction
+            rows: Row position of each prediction in the sorted panel
+            yhat: Predictions
+
+        Returns:
+            Path of the written part
+        """
+        out = self._dir(backtest_key, model_key)
+        out.mkdir(parents=True, exist_ok=True)
+
+        table = pa.Table.from_pydict({
+            "fold": np.full(len(rows), fold, dtype=np.int32),
+            "series": pa.array(np.asarray(series, dtype=object), type=pa.string()),
+            "row": np.asarray(rows, dtype=np.int64),
+            "yhat": np.asarray(yhat, dtype=np.float64),
+        }, schema=RESULT_SCHEMA)
+
+        path = out / f"part-{fold:04d}-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(table, tmp_path)
+        tmp_path.replace(path)
+
+        return path
+
+    def read(self, backtest_key: str, model_key: str) -> pd.DataFrame:
+        """Read all stored predictions of a model.
+
+        Args:
+            backtest_key: Backtest key
+            model_key: Model key
+
+        Returns:
+            DataFrame with fold, series, row and yhat columns, one row per
+            (fold, row); if a unit was stored twice the latest part wins
+        """
+        results = self._read(backtest_key, model_key)
+        return results.drop_duplicates(["fold", "row"], keep="last").reset_index(drop=True)
@@ -5,6 +5,127 @@ import pandas as pd
 import numpy as np
 
 
+class Fold:
+    """One rolling-origin fold as positional indices into a frame.
+    
+    Index arrays are computed eagerly; masks and frames are only built
+    when accessed, so callers that slice their own arrays (e.g.
+    ``FoldFeatures.fold``) never copy the full data.
+    
+    Attributes:
+        train_idx: Positional indices of training rows, in series/time order
+        test_idx: Positional indices of test rows, in series/time order
+    """
+    
+    def __init__(self, df: pd.DataFrame, train_idx: np.ndarray, test_idx: np.ndarray):
+        self._df = df
+        self.train_idx = train_idx
+        self.test_idx = test_idx
+    
+    def _mask(self, idx: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(self._df), dtype=bool)
+        mask[idx] = True
+        return mask
+    
+    @property
+    def train_mask(self) -> np.ndarray:
+        """Boolean mask of training rows over the frame's rows."""
+        return self._mask(self.train_idx)
+    
+    @property
+    def test_mask(self) -> np.ndarray:
+        """Boolean mask of test rows over the frame's rows."""
+        return self._mask(self.test_idx)
+    
+    @property
+    def train(self) -> pd.DataFrame:
+        """Training rows of the frame."""
+        return self._df.iloc[self.train_idx]
+    
+    @property
+    def test(self) -> pd.DataFrame:
+        """Test rows of the frame."""
+        return self._df.iloc[self.test_idx]
+
+
+def _series_layout(
+    df: pd.DataFrame,
+    ts_col: str,
+    id_col: Optional[str],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sort a panel by series and time and locate each row in its series.
+    
+    Returns:
+        Tuple of (order, sorted series codes, position within series,
+        series sizes), the first three aligned with ``order``. Rows with
+        a missing ID are dropped, as ``groupby`` does.
+    """
+    ts = df[ts_col].to_numpy()
+    
+    if id_col is None:
+        order = np.argsort(ts, kind="stable")
+        codes = np.zeros(len(df), dtype=np.int64)
+    else:
+        codes, _ = pd.factorize(df[id_col], sort=True)
+        order = np.lexsort((ts, codes))
+        order = order[codes[order] >= 0]
+    
+    codes_sorted = codes[order]
+    sizes = np.bincount(codes_sorted) if len(order) else np.zeros(0, dtype=np.int64)
+    starts = np.cumsum(sizes) - sizes
+    pos = np.arange(len(order)) - starts[codes_sorted]
+    
+    return order, codes_sorted, pos, sizes
+
+
+def rolling_origin_folds(
+    df: pd.DataFrame,
+    n_splits: int,
+    horizon: int,
+    min_train_points: int,
+    step_size: Optional[int] = None,
+    ts_col: str = "ds",
+    id_col: Optional[str] = None,
+) -> Iterator[Fold]:
+    """Generate rolling origin cross-validation folds as positional indices.
+    
+    Per-series boundaries are computed once for all folds, so each fold
+    costs a few vectorized comparisons over the rows instead of a groupby
+    and a concat of per-series slices.
+    
+    Args:
+        df: DataFrame with time series
+        n_splits: Number of splits
+        horizon: Forecast horizon
+        min_train_points: Minimum training observations
+        step_size: Step size between splits (if None, uses horizon)
+        ts_col: Timestamp column name
+        id_col: ID column for panel data
+    
+    Yields:
+        Fold objects indexing into ``df``. Series with fewer than
+        ``min_train_points`` training rows are left out of a fold; folds
+        without any series are skipped.
+    """
+    step_size = step_size or horizon
+    order, codes, pos, sizes = _series_layout(df, ts_col, id_col)
+    
+    for split_idx in range(n_splits):
+        test_end = sizes - (n_splits - split_idx - 1) * step_size
+        test_start = test_end - horizon
+        keep = test_start >= min_train_points
+        
+        if not keep.any():
+            continue
+        
+        row_start = test_start[codes]
+        row_keep = keep[codes]
+        train_rows = row_keep & (pos < row_start)
+        test_rows = row_keep & (pos >= row_start) & (pos < test_end[codes])
+        
+        yield Fold(df, order[train_rows], order[test_rows])
+
+
 def rolling_origin_split(
     df: pd.DataFrame,
     n_splits: int,
@@ -28,42 +149,7 @@ def rolling_origin_split(
     Yields:
         Tuples of (train_df, test_df)
     """
-    step_size = step_size or horizon
-    df = df.sort_values([id_col, ts_col] if id_col else ts_col)
-    
-    if id_col:
-        # Panel data - split each series
-        for split_idx in range(n_splits):
-            train_parts = []
-            test_parts = []
-            
-            for series_id, group in df.groupby(id_col):
-                n_total = len(group)
-                test_end_idx = n_total - (n_splits - split_idx - 1) * step_size
-                test_start_idx = test_end_idx - horizon
-                train_end_idx = test_start_idx
-                
-                if train_end_idx < min_train_points:
-                    continue
-                
-                train_parts.append(group.iloc[:train_end_idx])
-                test_parts.append(group.iloc[test_start_idx:test_end_idx])
-            
-            if train_parts and test_parts:
-                yield pd.concat(train_parts), pd.concat(test_parts)
-    else:
-        # Single series
-        n_total = len(df)
-        
-        for split_idx in range(n_splits):
-            test_end_idx = n_total - (n_splits - split_idx - 1) * step_size
-            test_start_idx = test_end_idx - horizon
-            train_end_idx = test_start_idx
-            
-            if train_end_idx < min_train_points:
-                continue
-            
-            train = df.iloc[:train_end_idx]
-            test = df.iloc[test_start_idx:test_end_idx]
-            
-            yield train, test
+    for fold in rolling_origin_folds(
+        df, n_splits, horizon, min_train_points, step_size, ts_col, id_col
+    ):
+        yield fold.train, fold.test
@@ -0,0 +1,354 @@
+"""Columnar on-disk cache for preprocessed long-format datasets."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bump when the cached layout or dtypes change so stale caches are rebuilt
+CACHE_VERSION = "1"
+
+FINGERPRINT_KEY = b"ts_lab_fingerprint"
+
+CATEGORICAL_COLS = ["series_id", "state", "store", "dept", "item"]
+
+ROW_GROUP_SIZE = 1_000_000
+
+
+def compute_fingerprint(paths: Iterable[Path]) -> str:
+    """Compute a fingerprint of raw source files.
+
+    Uses file name, size and modification time rather than file contents,
+    so fingerprinting multi-GB raw files stays instantaneous.
+
+    Args:
+        paths: Raw files the cache is derived from
+
+    Returns:
+        Hex digest identifying the current state of the sources
+    """
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+
+    for path in sorted(Path(p) for p in paths):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame, columns: Optional[List[str]] = None) -> str:
+    """Compute a fingerprint of an in-memory frame's contents and row order.
+
+    Args:
+        df: DataFrame to fingerprint
+        columns: Columns to include (if None, all columns)
+
+    Returns:
+        Hex digest identifying the frame
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+
+    for col in columns:
+        digest.update(f"{col}:{df[col].dtype}".encode())
+        digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    categorical_cols: Optional[List[str]] = None,
+    target_col: str = "y",
+    ts_col: str = "ds",
+) -> pd.DataFrame:
+    """Downcast a long-format frame to compact dtypes in place.
+
+    Args:
+        df: DataFrame in long format
+        categorical_cols: Columns to store as categoricals
+        target_col: Name of target column (cast to float32)
+        ts_col: Name of timestamp column (cast to naive datetime64[ns])
+
+    Returns:
+        The same DataFrame with compact dtypes
+    """
+    categorical_cols = CATEGORICAL_COLS if categorical_cols is None else categorical_cols
+
+    for col in categorical_cols:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    if target_col in df.columns:
+        df[target_col] = df[target_col].astype(np.float32)
+
+    if ts_col in df.columns and df[ts_col].dtype != "datetime64[ns]":
+        ds = pd.to_datetime(df[ts_col])
+        if ds.dt.tz is not None:
+            # Cache naive UTC timestamps
+            ds = ds.dt.tz_convert(None)
+        df[ts_col] = ds.astype("datetime64[ns]")
+
+    return df
+
+
+class CacheWriter:
+    """Incremental writer for a Parquet cache.
+
+    Each call to ``write`` appends one or more row groups, so a dataset can
+    be cached chunk by chunk without holding it in memory. The file is
+    written under a temporary name and moved into place on ``close`` so
+    readers never see a partial cache.
+    """
+
+    def __init__(self, path: Path, fingerprint: str):
+        """Initialize cache writer.
+
+        Args:
+            path: Cache file path
+            fingerprint: Fingerprint of the raw sources
+        """
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append a chunk of rows to the cache.
+
+        Args:
+            df: DataFrame chunk with the same columns and dtypes as earlier chunks
+        """
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+        if self._writer is None:
+            metadata = dict(table.schema.metadata or {})
+            metadata[FINGERPRINT_KEY] = self.fingerprint.encode()
+            self._schema = table.schema.with_metadata(metadata)
+            self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+
+        self._writer.write_table(table.cast(self._schema), row_group_size=ROW_GROUP_SIZE)
+
+    def close(self) -> None:
+        """Finalize the cache file."""
+        if self._writer is None:
+            raise ValueError("No data written to cache")
+
+        self._writer.close()
+        self.tmp_path.replace(self.path)
+
+        # Appended increments belong to the previous base; a rebuild supersedes them
+        clear_deltas(self.path)
+
+    def abort(self) -> None:
+        """Discard a partially written cache."""
+        if self._writer is not None:
+            self._writer.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "CacheWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_cache(df: pd.DataFrame, path: Path, fingerprint: str) -> None:
+    """Write a long-format frame to a Parquet cache.
+
+    Timestamps are stored as int64 nanoseconds and categoricals as
+    dictionary-encoded columns. The source fingerprint is embedded in the
+    file's schema metadata.
+
+    Args:
+        df: DataFrame in long format with compact dtypes
+        path: Cache file path
+        fingerprint: Fingerprint of the raw sources
+    """
+    with CacheWriter(path, fingerprint) as writer:
+        writer.write(df)
+
+
+def read_cache(path: Path, fingerprint: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Read a Parquet cache if it exists and is up to date.
+
+    Appended increments are merged into the base, with later rows winning
+    on duplicate (series_id, ds) keys.
+
+    Args:
+        path: Cache file path
+        fingerprint: Expected source fingerprint (if None, not checked)
+
+    Returns:
+        Cached DataFrame, or None if missing or stale
+    """
+    if not cache_is_valid(path, fingerprint):
+        return None
+
+    files = cache_files(path)
+    if len(files) == 1:
+        return pq.read_table(path).to_pandas()
+
+    return merge_deltas(pq.read_table(files).to_pandas())
+
+
+def cache_is_valid(path: Path, fingerprint: Optional[str] = None) -> bool:
+    """Check whether a Parquet cache exists and matches the sources.
+
+    Args:
+        path: Cache file path
+        fingerprint: Expected source fingerprint (if None, not checked)
+
+    Returns:
+        True if the cache can be used
+    """
+    if not path.exists():
+        return False
+
+    if fingerprint is None:
+        return True
+
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(FINGERPRINT_KEY, b"").decode() == fingerprint
+
+
+def delta_paths(path: Path) -> List[Path]:
+    """List increments appended to a cache, oldest first.
+
+    Args:
+        path: Base cache file path
+
+    Returns:
+        Paths of delta files
+    """
+    path = Path(path)
+    return sorted(path.parent.glob(f"{path.stem}.delta-*.parquet"))
+
+
+def cache_files(path: Path) -> List[Path]:
+    """List the base cache file followed by its increments.
+
+    Args:
+        path: Base cache file path
+
+    Returns:
+        Paths of all files making up the cached dataset
+    """
+    return [Path(path), *delta_paths(path)]
+
+
+def write_delta(df: pd.DataFrame, path: Path) -> Path:
+    """Append an increment to a cache without rewriting the base file.
+
+    The increment is written with the base file's schema so all files can
+    be read together as one dataset.
+
+    Args:
+        df: New rows with the same columns as the base cache
+        path: Base cache file path
+
+    Returns:
+        Path of the written delta file
+    """
+    path = Path(path)
+    schema = pq.read_schema(path)
+
+    missing = [c for c in schema.names if c not in df.columns]
+    if missing:
+        raise ValueError(f"New rows are missing cache columns: {missing}")
+
+    existing = delta_paths(path)
+    seq = int(existing[-1].stem.rsplit("-", 1)[1]) + 1 if existing else 1
+    delta_path = path.parent / f"{path.stem}.delta-{seq:06d}.parquet"
+
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+    tmp_path = delta_path.with_suffix(".tmp")
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+    tmp_path.replace(delta_path)
+
+    return delta_path
+
+
+def clear_deltas(path: Path) -> None:
+    """Remove all increments and watermarks of a cache.
+
+    Args:
+        path: Base cache file path
+    """
+    for delta in delta_paths(path):
+        delta.unlink()
+    watermarks_path(path).unlink(missing_ok=True)
+
+
+def merge_deltas(
+    df: pd.DataFrame,
+    id_col: str = "series_id",
+    ts_col: str = "ds",
+) -> pd.DataFrame:
+    """Resolve a base-plus-increments frame into one long-format frame.
+
+    Args:
+        df: Rows from the base cache followed by rows from each increment
+        id_col: Name of ID column
+        ts_col: Name of timestamp column
+
+    Returns:
+        DataFrame with one row per (id, timestamp), sorted by both
+    """
+    df = df.drop_duplicates(subset=[id_col, ts_col], keep="last")
+    return df.sort_values([id_col, ts_col], kind="stable").reset_index(drop=True)
+
+
+def watermarks_path(path: Path) -> Path:
+    """Get the per-series watermark file of a cache.
+
+    Args:
+        path: Base cache file path
+
+    Returns:
+        Path of the watermark JSON file
+    """
+    path = Path(path)
+    return path.parent / f"{path.stem}.watermarks.json"
+
+
+def read_watermarks(path: Path) -> Optional[Dict[str, int]]:
+    """Read per-series high-water marks (int64 nanoseconds).
+
+    Args:
+        path: Base cache file path
+
+    Returns:
+        Mapping of series ID to latest timestamp, or None if not recorded
+    """
+    wm_path = watermarks_path(path)
+    if not wm_path.exists():
+        return None
+
+    with open(wm_path, "r") as f:
+        return json.load(f)
+
+
+def write_watermarks(path: Path, watermarks: Dict[str, int]) -> None:
+    """Persist per-series high-water marks.
+
+    Args:
+        path: Base cache file path
+        watermarks: Mapping of series ID to latest timestamp (int64 ns)
+    """
+    wm_path = watermarks_path(path)
+    tmp_path = wm_path.with_suffix(".tmp")
+
+    with open(tmp_path, "w") as f:
+        json.dump(watermarks, f)
+
+    tmp_path.replace(wm_path)
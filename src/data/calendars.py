@@ -0,0 +1,91 @@
+"""Holiday calendars cached on disk per (country, year)."""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import holidays
+import numpy as np
+
+EPOCH_DAY = np.datetime64("1970-01-01", "D")
+
+
+def default_cache_dir() -> Path:
+    """Get the holiday cache directory.
+
+    Lives under ``$ARTIFACTS_DIR/cache`` and is namespaced by the installed
+    ``holidays`` version, since library upgrades can change calendars.
+
+    Returns:
+        Cache directory path
+    """
+    artifacts = os.environ.get("ARTIFACTS_DIR", "artifacts")
+    return Path(artifacts) / "cache" / f"holidays-{holidays.__version__}"
+
+
+@lru_cache(maxsize=None)
+def _country_year_days(country: str, year: int, cache_dir: str) -> Optional[np.ndarray]:
+    """Load one country's holidays for one year as day numbers.
+
+    Args:
+        country: Country code
+        year: Calendar year
+        cache_dir: Cache directory
+
+    Returns:
+        Sorted int64 days since 1970-01-01, or None if the country is unknown
+    """
+    path = Path(cache_dir) / f"{country}_{year}.json"
+
+    if path.exists():
+        with open(path, "r") as f:
+            return np.asarray(json.load(f), dtype=np.int64)
+
+    try:
+        dates = holidays.country_holidays(country, years=year).keys()
+    except Exception:
+        return None  # Skip if country not found
+
+    days = np.sort(
+        (np.array(sorted(dates), dtype="datetime64[D]") - EPOCH_DAY).astype(np.int64)
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(days.tolist(), f)
+    tmp_path.replace(path)
+
+    return days
+
+
+def get_holiday_days(
+    countries: Iterable[str],
+    years: Iterable[int],
+    cache_dir: Optional[str] = None,
+) -> np.ndarray:
+    """Get the union of holidays for several countries and years.
+
+    Args:
+        countries: Country codes (unknown codes are skipped)
+        years: Calendar years
+        cache_dir: Cache directory (if None, ``default_cache_dir()``)
+
+    Returns:
+        Sorted unique int64 days since 1970-01-01
+    """
+    cache_dir = str(cache_dir or default_cache_dir())
+
+    parts = []
+    for country in countries:
+        for year in years:
+            days = _country_year_days(country, int(year), cache_dir)
+            if days is not None:
+                parts.append(days)
+
+    if not parts:
+        return np.array([], dtype=np.int64)
+
+    return np.unique(np.concatenate(parts))
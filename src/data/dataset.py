@@ -0,0 +1,202 @@
+"""Lazy dataset handle over the columnar cache."""
+
+import hashlib
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.data.cache import cache_files, compute_fingerprint, merge_deltas
+
+
+class LazyDataset:
+    """Lazy, filterable view of a cached long-format dataset.
+
+    Filters on series IDs, hierarchy columns and timestamp ranges are only
+    recorded until ``collect`` is called. They are then passed to the
+    Parquet reader, which skips row groups whose statistics cannot match
+    and only decodes the requested columns. Increments appended with
+    ``ingest_observations`` are read and merged as well.
+
+    Example:
+        >>> ds = load_dataset(config_path, config, lazy=True)
+        >>> df = ds.filter(store="CA_1", start="2016-01-01").collect()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        columns: Optional[List[str]] = None,
+        ts_col: str = "ds",
+        id_col: str = "series_id",
+    ):
+        """Initialize lazy dataset.
+
+        Args:
+            path: Path to Parquet cache file
+            filters: Conjunction of (column, op, value) predicates
+            columns: Columns to read (if None, all columns)
+            ts_col: Name of timestamp column
+            id_col: Name of ID column
+        """
+        self.path = path
+        self.filters = list(filters or [])
+        self.columns = list(columns) if columns is not None else None
+        self.ts_col = ts_col
+        self.id_col = id_col
+
+    def _replace(self, **kwargs) -> "LazyDataset":
+        params = {
+            "path": self.path,
+            "filters": self.filters,
+            "columns": self.columns,
+            "ts_col": self.ts_col,
+            "id_col": self.id_col,
+        }
+        params.update(kwargs)
+        return LazyDataset(**params)
+
+    @property
+    def schema_columns(self) -> List[str]:
+        """Columns available in the underlying cache."""
+        return pq.read_schema(self.path).names
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the data ``collect`` returns.
+
+        Derived from the cache and increment files' metadata plus the
+        filters and projection, so nothing is read.
+        """
+        view = json.dumps([self.filters, self.columns], default=str)
+        source = compute_fingerprint(cache_files(self.path))
+        return hashlib.sha256(f"{source}:{view}".encode()).hexdigest()
+
+    def filter(
+        self,
+        series_ids: Optional[Sequence[str]] = None,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        **levels: Any,
+    ) -> "LazyDataset":
+        """Add filters to the dataset.
+
+        Args:
+            series_ids: Series to keep
+            start: Inclusive lower bound on the timestamp column
+            end: Exclusive upper bound on the timestamp column
+            **levels: Hierarchy column filters, e.g. ``store="CA_1"`` or
+                ``dept=["FOODS_1", "FOODS_2"]``
+
+        Returns:
+            New LazyDataset with the combined filters
+        """
+        filters = list(self.filters)
+
+        if series_ids is not None:
+            filters.append((self.id_col, "in", list(series_ids)))
+
+        for col, value in levels.items():
+            if isinstance(value, (list, tuple, set)):
+                filters.append((col, "in", list(value)))
+            else:
+                filters.append((col, "==", value))
+
+        if start is not None:
+            filters.append((self.ts_col, ">=", pd.Timestamp(start)))
+
+        if end is not None:
+            filters.append((self.ts_col, "<", pd.Timestamp(end)))
+
+        return self._replace(filters=filters)
+
+    def last(self, periods: Any) -> "LazyDataset":
+        """Keep only the most recent part of the dataset.
+
+        Args:
+            periods: Timedelta-like window (e.g. "90D") counted back from
+                the latest timestamp in the cache
+
+        Returns:
+            New LazyDataset restricted to the trailing window
+        """
+        _, ts_max = self.time_bounds()
+        cutoff = ts_max - pd.Timedelta(periods)
+        return self._replace(filters=[*self.filters, (self.ts_col, ">", cutoff)])
+
+    def select(self, columns: List[str]) -> "LazyDataset":
+        """Restrict the columns that will be read.
+
+        Args:
+            columns: Columns to read
+
+        Returns:
+            New LazyDataset with the column projection
+        """
+        return self._replace(columns=columns)
+
+    def time_bounds(self) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """Get the timestamp range from row-group statistics without reading data.
+
+        Row groups written without min/max statistics fall back to reading
+        their timestamp column.
+
+        Returns:
+            Tuple of (min timestamp, max timestamp)
+        """
+        mins, maxs = [], []
+        for path in cache_files(self.path):
+            parquet_file = pq.ParquetFile(path)
+            meta = parquet_file.metadata
+            col_idx = meta.schema.names.index(self.ts_col)
+
+            for i in range(meta.num_row_groups):
+                stats = meta.row_group(i).column(col_idx).statistics
+                if stats is not None and stats.has_min_max:
+                    mins.append(pd.Timestamp(stats.min))
+                    maxs.append(pd.Timestamp(stats.max))
+                    continue
+
+                ts = parquet_file.read_row_group(i, columns=[self.ts_col]).column(0).to_pandas()
+                if ts.notna().any():
+                    mins.append(ts.min())
+                    maxs.append(ts.max())
+
+        return min(mins), max(maxs)
+
+    def collect(self) -> pd.DataFrame:
+        """Read the filtered dataset into memory.
+
+        Returns:
+            DataFrame in long format
+        """
+        files = cache_files(self.path)
+        columns = self.columns
+
+        # Increments are resolved on (id, ts), so both must be read
+        if len(files) > 1 and columns is not None:
+            columns = list(dict.fromkeys([self.id_col, self.ts_col, *columns]))
+
+        table = pq.read_table(
+            files if len(files) > 1 else self.path,
+            columns=columns,
+            filters=self.filters or None,
+        )
+        df = table.to_pandas()
+
+        if len(files) > 1:
+            df = merge_deltas(df, self.id_col, self.ts_col)
+            if self.columns is not None:
+                df = df[self.columns]
+
+        # Drop categories that were filtered out so groupby yields no empty groups
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].cat.remove_unused_categories()
+
+        return df
+
+    def __repr__(self) -> str:
+        return f"LazyDataset(path={self.path!r}, filters={self.filters}, columns={self.columns})"
@@ -0,0 +1,245 @@
+"""Content-addressed on-disk store for feature matrices."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import holidays
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+
+import src
+from src.data.cache import compute_fingerprint, frame_fingerprint
+from src.data.features import (
+    FEATURE_FAMILIES,
+    PROMO_FIELDS,
+    _assemble_features,
+    load_promo_events,
+    plan_features,
+)
+
+# Modules whose code determines feature values
+FEATURE_MODULES = [
+    Path(__file__).parent / "features.py",
+    Path(__file__).parent / "calendars.py",
+    Path(__file__).parent.parent / "utils" / "timeindex.py",
+]
+
+# Families whose values also depend on the target column
+TARGET_FAMILIES = {"lags", "rolls"}
+
+# Families whose values also depend on the series grouping (weather is
+# joined per zone and lagged within each series)
+SERIES_FAMILIES = {"lags", "rolls", "weather"}
+
+
+def code_version() -> str:
+    """Get a version string for the feature engineering code.
+
+    Hashes the feature module sources, so editing them invalidates stored
+    matrices without a manual version bump.
+
+    Returns:
+        Hex digest of the package version and feature module sources
+    """
+    digest = hashlib.sha256(f"{src.__version__}:{holidays.__version__}".encode())
+    for path in FEATURE_MODULES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def family_config(config: Dict, family: str) -> Any:
+    """Get the part of a features config that determines one family.
+
+    Args:
+        config: Features configuration dict
+        family: Feature family name
+
+    Returns:
+        JSON-serializable config of the family
+    """
+    if family == "calendar":
+        return None
+    if family == "weather":
+        # Weather values come from a file outside the panel
+        weather_config = dict(config["weather"])
+        weather_config["source"] = compute_fingerprint([weather_config["path"]])
+        return weather_config
+    if family == "promos" and isinstance(config["promos"], dict) and config["promos"].get("path"):
+        promo_config = dict(config["promos"])
+        promo_config["source"] = compute_fingerprint([promo_config["path"]])
+        return promo_config
+    return config.get(family)
+
+
+class FeatureStore:
+    """Local content-addressed cache of ``build_features`` output.
+
+    Each feature family of a matrix is stored as its own Parquet file,
+    addressed by a hash of the family's config, the data fingerprint and
+    the feature code version. Changing one family (e.g. adding a lag)
+    only recomputes that family; re-running with an unchanged features
+    config skips feature engineering entirely.
+
+    Layout::
+
+        root/<data key>/<family>-<family key>.parquet
+        root/<data key>/promos-<family key>.npz  (sparse promo indicators)
+
+    Example:
+        >>> store = FeatureStore()
+        >>> features = store.build_features(df, config["features"], id_col="series_id")
+        >>> store.last_built  # families computed by the last call
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """Initialize feature store.
+
+        Args:
+            root: Store directory (if None, ``$ARTIFACTS_DIR/cache/features``)
+        """
+        if root is None:
+            root = Path(os.environ.get("ARTIFACTS_DIR", "artifacts")) / "cache" / "features"
+        self.root = Path(root)
+        self.last_hits: List[str] = []
+        self.last_built: List[str] = []
+
+    def _family_path(
+        self,
+        family: str,
+        config: Dict,
+        fingerprint: str,
+        ts_col: str,
+        target_col: str,
+        id_col: Optional[str],
+        version: str,
+        promo_scope: Optional[Dict[str, str]] = None,
+    ) -> Path:
+        payload = {
+            "family": family,
+            "config": family_config(config, family),
+            "ts_col": ts_col,
+            "compact": bool(config.get("compact")),
+            "code": version,
+        }
+        if family in TARGET_FAMILIES:
+            payload["target_col"] = target_col
+        if family in SERIES_FAMILIES:
+            payload["id_col"] = id_col
+        if family == "promos":
+            payload["scope"] = promo_scope
+
+        # Sparse promo indicators are kept sparse on disk
+        suffix = ".parquet"
+        if family == "promos" and load_promo_events(config["promos"])[1] == "sparse":
+            suffix = ".npz"
+
+        return self.root / fingerprint[:32] / f"{family}-{_hash(payload)[:32]}{suffix}"
+
+    def build_features(
+        self,
+        df: pd.DataFrame,
+        config: Dict,
+        ts_col: str = "ds",
+        target_col: str = "y",
+        id_col: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Build features like ``build_features``, reusing stored families.
+
+        Args:
+            df: DataFrame with time series
+            config: Features configuration dict
+            ts_col: Name of timestamp column
+            target_col: Name of target column
+            id_col: Name of ID column for panel data
+            fingerprint: Data fingerprint (if None, hashed from the input
+                columns; pass a cache fingerprint to skip hashing)
+
+        Returns:
+            Same frame as ``build_features(df, config, ...)``
+        """
+        if fingerprint is None:
+            columns = [c for c in (id_col, ts_col, target_col) if c is not None]
+            fingerprint = frame_fingerprint(df, columns)
+
+        plan = plan_features(config)
+        version = code_version()
+
+        # Scoped promos match rows on panel columns outside the data fingerprint
+        promo_scope = None
+        if "promos" in plan:
+            events, _ = load_promo_events(config["promos"])
+            scope_cols = [c for c in events.columns if c not in PROMO_FIELDS and c in df.columns]
+            promo_scope = {col: frame_fingerprint(df, [col]) for col in scope_cols}
+
+        paths = {
+            family: self._family_path(
+                family, config, fingerprint, ts_col, target_col, id_col, version, promo_scope
+            )
+            for family in plan
+        }
+
+        self.last_hits = [family for family, path in paths.items() if path.exists()]
+        self.last_built = [family for family in plan if family not in self.last_hits]
+
+        built = None
+        if self.last_built:
+            built = _assemble_features(
+                df, config, ts_col, target_col, id_col, families=self.last_built
+            )
+            for family in self.last_built:
+                self._write(built[plan[family]], paths[family])
+
+        frames = [df]
+        for family, _ in FEATURE_FAMILIES:
+            if family not in plan:
+                continue
+            if family in self.last_hits:
+                block = self._read(paths[family], plan[family], df.index)
+            else:
+                block = built[plan[family]]
+            frames.append(block)
+
+        result = pd.concat(frames, axis=1, copy=False)
+        if not pd.api.types.is_datetime64_any_dtype(result[ts_col]):
+            result[ts_col] = pd.to_datetime(result[ts_col])
+
+        return result
+
+    def _read(self, path: Path, columns: List[str], index: pd.Index) -> pd.DataFrame:
+        """Read one stored family aligned to ``index``."""
+        if path.suffix == ".npz":
+            matrix = sparse.load_npz(path)
+            frame = pd.DataFrame.sparse.from_spmatrix(matrix, index=index, columns=columns)
+            return frame.astype(pd.SparseDtype(np.int8, 0))
+
+        block = pq.read_table(path).to_pandas()
+        block.index = index
+        return block
+
+    def _write(self, block: pd.DataFrame, path: Path) -> None:
+        """Write one family atomically so readers never see partial files."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+
+        if path.suffix == ".npz":
+            sparse.save_npz(tmp_path, block.sparse.to_coo().tocsr())
+        else:
+            table = pa.Table.from_pandas(block, preserve_index=False)
+            pq.write_table(table, tmp_path)
+        tmp_path.replace(path)
+
+    def clear(self) -> None:
+        """Remove every stored feature matrix."""
+        for path in self.root.glob("*/*.*"):
+            path.unlink()
@@ -1,12 +1,116 @@
 """Feature engineering for time series forecasting."""
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import holidays
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import sparse
 
-from src.utils.timeindex import create_fourier_features, get_calendar_features
+from src.data.calendars import get_holiday_days
+from src.utils.timeindex import (
+    CALENDAR_FEATURES,
+    factorize_timestamps,
+    fourier_feature_names,
+    iter_calendar_features,
+    iter_fourier_features,
+)
+
+# Holiday distances further than this (in days) are clipped
+HOLIDAY_DISTANCE_CAP = 366
+
+
+def _group_layout(
+    df: pd.DataFrame,
+    id_col: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Compute a stable series-contiguous ordering of a panel.
+    
+    Rows keep their original relative order within each series, matching
+    ``groupby(id_col)`` semantics.
+    
+    Args:
+        df: DataFrame with time series
+        id_col: Name of ID column for panel data (if None, one series)
+    
+    Returns:
+        Tuple of (order, sorted group codes, position within group,
+        group size), the last three aligned with ``order``. Rows with a
+        missing ID get code -1.
+    """
+    n = len(df)
+    
+    if id_col is None:
+        return (
+            np.arange(n),
+            np.zeros(n, dtype=np.int64),
+            np.arange(n),
+            np.full(n, n),
+        )
+    
+    codes, _ = pd.factorize(df[id_col])
+    order = np.argsort(codes, kind="stable")
+    codes_sorted = codes[order]
+    
+    # Group boundaries in the sorted layout
+    is_start = np.r_[True, codes_sorted[1:] != codes_sorted[:-1]] if n else np.array([], bool)
+    starts = np.flatnonzero(is_start)
+    sizes = np.diff(np.r_[starts, n])
+    group_idx = np.cumsum(is_start) - 1
+    
+    pos = np.arange(n) - starts[group_idx]
+    size = sizes[group_idx]
+    
+    return order, codes_sorted, pos, size
+
+
+def _lag_block(
+    values: np.ndarray,
+    lags: List[int],
+    layout: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Compute all lags of a panel target in one pass.
+    
+    Args:
+        values: Target values in original row order
+        lags: List of lag periods
+        layout: Output of ``_group_layout``
+        out: Optional preallocated (n_rows, n_lags) array to write into
+    
+    Returns:
+        Array of shape (n_rows, n_lags) in original row order
+    """
+    order, codes, pos, size = layout
+    n = len(values)
+    
+    dtype = values.dtype if np.issubdtype(values.dtype, np.floating) else np.float64
+    if out is None:
+        out = np.empty((n, len(lags)), dtype=dtype)
+    
+    # Input already series-contiguous: compute straight into the output
+    contiguous = np.array_equal(order, np.arange(n))
+    y = values if contiguous else values[order]
+    block = out if contiguous else np.empty_like(out)
+    block[:] = np.nan
+    
+    # Shift the contiguous array, then blank positions that crossed a boundary
+    for j, lag in enumerate(lags):
+        if abs(lag) >= max(n, 1):
+            continue
+        if lag >= 0:
+            block[lag:, j] = y[:n - lag]
+            invalid = pos < lag
+        else:
+            block[:lag, j] = y[-lag:]
+            invalid = pos >= size + lag
+        block[invalid | (codes < 0), j] = np.nan
+    
+    if not contiguous:
+        out[order] = block
+    
+    return out
 
 
 def create_lag_features(
@@ -17,6 +121,10 @@ def create_lag_features(
 ) -> pd.DataFrame:
     """Create lag features.
     
+    The panel is laid out series-contiguous once and every lag is taken
+    from that single array, masking positions that would cross a series
+    boundary.
+    
     Args:
         df: DataFrame with time series
         lags: List of lag periods
@@ -28,16 +136,202 @@ def create_lag_features(
     """
     df = df.copy()
     
-    if id_col:
-        for lag in lags:
-            df[f"lag_{lag}"] = df.groupby(id_col)[target_col].shift(lag)
-    else:
-        for lag in lags:
-            df[f"lag_{lag}"] = df[target_col].shift(lag)
+    if not lags:
+        return df
+    
+    layout = _group_layout(df, id_col)
+    block = _lag_block(df[target_col].to_numpy(), lags, layout)
+    
+    for j, lag in enumerate(lags):
+        df[f"lag_{lag}"] = block[:, j]
     
     return df
 
 
+def _window_extreme(
+    y: np.ndarray,
+    k: np.ndarray,
+    window: int,
+    op: np.ufunc,
+) -> np.ndarray:
+    """Trailing-window min or max with per-row window lengths.
+    
+    Uses a doubling table: level ``p`` holds the extreme over the last
+    ``p`` values, and a window of length ``k`` is covered by two
+    overlapping power-of-two spans. Each level is one vectorized pass, so
+    the cost is O(n log window) with no per-row Python work.
+    
+    Args:
+        y: Values in series-contiguous order
+        k: Window length per row (1 <= k <= window)
+        window: Maximum window length
+        op: ``np.fmin`` or ``np.fmax`` (NaN-ignoring)
+    
+    Returns:
+        Array of window extremes
+    """
+    n = len(y)
+    out = np.full(n, np.nan)
+    span = 1 << np.floor(np.log2(k)).astype(np.int64)
+    rows = np.arange(n)
+    
+    level = y
+    p = 1
+    while p <= window:
+        hit = rows[span == p]
+        if hit.size:
+            out[hit] = op(level[hit], level[hit - k[hit] + p])
+        
+        if 2 * p > window:
+            break
+        nxt = level.copy()
+        nxt[p:] = op(level[p:], level[:-p])
+        level = nxt
+        p *= 2
+    
+    return out
+
+
+def _window_sum(
+    x: np.ndarray,
+    pos: np.ndarray,
+    window: int,
+    lo: np.ndarray,
+) -> np.ndarray:
+    """Trailing-window sums from prefix sums restarted every ``window`` rows.
+    
+    Restarting the running sum at each series start and every ``window``
+    rows keeps prefix magnitudes bounded by one window, so differencing
+    them loses no more precision than an online rolling sum. A window then
+    spans at most two segments.
+    
+    Args:
+        x: Values in series-contiguous order (NaNs already zeroed)
+        pos: Position of each row within its series
+        window: Window length
+        lo: First row of each row's window
+    
+    Returns:
+        Array of window sums
+    """
+    seg_start = pos % window == 0
+    seg = np.cumsum(seg_start) - 1
+    
+    prefix = pd.Series(x).groupby(seg).cumsum().to_numpy()
+    totals = np.add.reduceat(x, np.flatnonzero(seg_start))
+    before_lo = prefix[lo] - x[lo]
+    
+    same = seg[lo] == seg
+    return np.where(same, prefix - before_lo, prefix + totals[seg[lo]] - before_lo)
+
+
+def _rolling_names(windows: List[Dict[str, any]]) -> List[str]:
+    """Get rolling feature names in the order they are created.
+    
+    Args:
+        windows: List of window configs with 'window' and 'stats' keys
+    
+    Returns:
+        List of column names (unknown statistics are skipped)
+    """
+    names = []
+    for window_config in windows:
+        window = window_config["window"]
+        for stat in window_config.get("stats", ["mean"]):
+            if stat in ("mean", "std", "min", "max"):
+                names.append(f"rolling_{window}_{stat}")
+    return names
+
+
+def _rolling_block(
+    values: np.ndarray,
+    windows: List[Dict[str, any]],
+    layout: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    out: Optional[np.ndarray] = None,
+) -> Tuple[List[str], np.ndarray]:
+    """Compute all rolling statistics of a panel target.
+    
+    Matches ``rolling(window, min_periods=1)`` applied per series. Means
+    and standard deviations come from segmented prefix sums of per-series
+    centered values (see ``_window_sum``); min and max use
+    ``_window_extreme``.
+    
+    Args:
+        values: Target values in original row order
+        windows: List of window configs with 'window' and 'stats' keys
+        layout: Output of ``_group_layout``
+        out: Optional preallocated (n_rows, n_columns) array to write into
+    
+    Returns:
+        Tuple of (column names, array of shape (n_rows, n_columns) in
+        original row order)
+    """
+    order, codes, pos, size = layout
+    n = len(values)
+    
+    names = _rolling_names(windows)
+    if out is None:
+        out = np.empty((n, len(names)))
+    out[:] = np.nan
+    if n == 0 or not names:
+        return names, out
+    
+    # Input already series-contiguous: compute straight into the output
+    contiguous = np.array_equal(order, np.arange(n))
+    block = out if contiguous else np.empty_like(out)
+    
+    y = values[order].astype(np.float64)
+    valid = ~np.isnan(y) & (codes >= 0)
+    y[~valid] = np.nan
+    
+    # Center each series on its mean to keep window sums well conditioned
+    starts = np.flatnonzero(pos == 0)
+    group_idx = np.cumsum(pos == 0) - 1
+    filled = np.where(valid, y, 0.0)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    means = np.add.reduceat(filled, starts) / np.maximum(counts, 1)
+    offset = means[group_idx]
+    centered = np.where(valid, y - offset, 0.0)
+    squared = centered * centered
+    
+    cn = np.concatenate([[0], np.cumsum(valid)])
+    rows = np.arange(n)
+    
+    j = 0
+    for window_config in windows:
+        window = window_config["window"]
+        k = np.minimum(pos + 1, window)
+        lo = rows - k + 1
+        
+        cnt = cn[rows + 1] - cn[lo]
+        s = _window_sum(centered, pos, window, lo)
+        
+        for stat in window_config.get("stats", ["mean"]):
+            if stat == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    col = np.where(cnt >= 1, s / cnt + offset, np.nan)
+            elif stat == "std":
+                s2 = _window_sum(squared, pos, window, lo)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    var = (s2 - s * s / cnt) / (cnt - 1)
+                col = np.where(cnt >= 2, np.sqrt(np.maximum(var, 0.0)), np.nan)
+            elif stat == "min":
+                col = _window_extreme(y, k, window, np.fmin)
+            elif stat == "max":
+                col = _window_extreme(y, k, window, np.fmax)
+            else:
+                continue
+            
+            col[codes < 0] = np.nan
+            block[:, j] = col
+            j += 1
+    
+    if not contiguous:
+        out[order] = block
+    
+    return names, out
+
+
 def create_rolling_features(
     df: pd.DataFrame,
     windows: List[Dict[str, any]],
@@ -46,6 +340,9 @@ def create_rolling_features(
 ) -> pd.DataFrame:
     """Create rolling window features.
     
+    All windows and statistics are computed together from one
+    series-contiguous layout of the target (see ``_rolling_block``).
+    
     Args:
         df: DataFrame with time series
         windows: List of window configs with 'window' and 'stats' keys
@@ -57,42 +354,117 @@ def create_rolling_features(
     """
     df = df.copy()
     
-    for window_config in windows:
-        window = window_config["window"]
-        stats = window_config.get("stats", ["mean"])
-        
-        if id_col:
-            grouped = df.groupby(id_col)[target_col]
-        else:
-            grouped = df[target_col]
-        
-        for stat in stats:
-            if stat == "mean":
-                df[f"rolling_{window}_mean"] = grouped.transform(
-                    lambda x: x.rolling(window, min_periods=1).mean()
-                )
-            elif stat == "std":
-                df[f"rolling_{window}_std"] = grouped.transform(
-                    lambda x: x.rolling(window, min_periods=1).std()
-                )
-            elif stat == "min":
-                df[f"rolling_{window}_min"] = grouped.transform(
-                    lambda x: x.rolling(window, min_periods=1).min()
-                )
-            elif stat == "max":
-                df[f"rolling_{window}_max"] = grouped.transform(
-                    lambda x: x.rolling(window, min_periods=1).max()
-                )
+    layout = _group_layout(df, id_col)
+    names, block = _rolling_block(df[target_col].to_numpy(), windows, layout)
+    
+    for j, name in enumerate(names):
+        df[name] = block[:, j]
     
     return df
 
 
+def _day_numbers(ds: pd.Series) -> np.ndarray:
+    """Convert timestamps to int64 days since 1970-01-01 (local calendar date)."""
+    ds = pd.to_datetime(ds)
+    missing = int(ds.isna().sum())
+    if missing:
+        # NaT would become the smallest int64 and span a huge day range
+        raise ValueError(f"{missing} timestamps are missing (NaT); drop or fill them first")
+    if ds.dt.tz is not None:
+        ds = ds.dt.tz_localize(None)
+    return ds.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+def _iter_holiday_features(
+    ds: pd.Series,
+    countries: List[str],
+    lookback: int = 0,
+    lookahead: int = 0,
+    distance: bool = False,
+    codes: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[str, np.ndarray]]:
+    """Yield holiday features one column at a time.
+    
+    Features are computed once per unique calendar day on an integer
+    day-number array and broadcast back to rows. Window flags are lookups
+    into a dense holiday indicator spanning the needed day range, and
+    distances come from a single ``searchsorted`` against the sorted
+    holiday days.
+    
+    Args:
+        ds: Series of timestamps
+        countries: List of country codes
+        lookback: Days before holiday to mark
+        lookahead: Days after holiday to mark
+        distance: Whether to add days to the next / since the last holiday
+        codes: If given, ``ds`` holds distinct timestamps (see
+            ``factorize_timestamps``) and columns are broadcast with them
+    
+    Yields:
+        Tuples of (feature name, values), in ``_holiday_names`` order
+    """
+    days, day_codes = np.unique(_day_numbers(ds), return_inverse=True)
+    if codes is not None:
+        day_codes = day_codes[codes]
+    codes = day_codes
+    
+    if len(days) == 0:
+        for name in _holiday_names(lookback, lookahead, distance):
+            yield name, np.zeros(len(codes), dtype=int)
+        return
+    
+    # Calendars only need to cover the window the flags can reach
+    lo, hi = days[0] - lookahead, days[-1] + lookback
+    if distance:
+        lo, hi = lo - HOLIDAY_DISTANCE_CAP, hi + HOLIDAY_DISTANCE_CAP
+    years = range(
+        int(str(np.datetime64(int(lo), "D"))[:4]),
+        int(str(np.datetime64(int(hi), "D"))[:4]) + 1,
+    )
+    holiday_days = get_holiday_days(countries, years)
+    
+    # Dense indicator over [lo, hi]; row offsets index straight into it
+    indicator = np.zeros(hi - lo + 1, dtype=np.int64)
+    in_range = holiday_days[(holiday_days >= lo) & (holiday_days <= hi)]
+    indicator[in_range - lo] = 1
+    base = days - lo
+    
+    yield "is_holiday", indicator[base][codes]
+    
+    for i in range(1, lookback + 1):
+        yield f"holiday_minus_{i}", indicator[base + i][codes]
+    
+    for i in range(1, lookahead + 1):
+        yield f"holiday_plus_{i}", indicator[base - i][codes]
+    
+    if distance:
+        cap = HOLIDAY_DISTANCE_CAP
+        # Sentinels keep both neighbours defined and clip to the cap
+        inner = holiday_days[(holiday_days > days[0] - cap) & (holiday_days < days[-1] + cap)]
+        padded = np.concatenate([[days[0] - cap], inner, [days[-1] + cap]])
+        nxt = np.searchsorted(padded, days, side="left")
+        yield "days_to_holiday", np.minimum(padded[nxt] - days, cap)[codes]
+        prev = nxt - (padded[nxt] != days)
+        yield "days_since_holiday", np.minimum(days - padded[prev], cap)[codes]
+
+
+def _holiday_names(lookback: int = 0, lookahead: int = 0, distance: bool = False) -> List[str]:
+    """Get holiday feature names in the order they are created."""
+    names = ["is_holiday"]
+    names += [f"holiday_minus_{i}" for i in range(1, lookback + 1)]
+    names += [f"holiday_plus_{i}" for i in range(1, lookahead + 1)]
+    if distance:
+        names += ["days_to_holiday", "days_since_holiday"]
+    return names
+
+
 def create_holiday_features(
     df: pd.DataFrame,
     ts_col: str = "ds",
     countries: Optional[List[str]] = None,
     lookback: int = 0,
     lookahead: int = 0,
+    distance: bool = False,
 ) -> pd.DataFrame:
     """Create holiday features.
     
@@ -102,6 +474,8 @@ def create_holiday_features(
         countries: List of country codes
         lookback: Days before holiday to mark
         lookahead: Days after holiday to mark
+        distance: Whether to add days to the next / since the last holiday
+            (capped at ``HOLIDAY_DISTANCE_CAP``)
     
     Returns:
         DataFrame with holiday features
@@ -109,47 +483,273 @@ def create_holiday_features(
     df = df.copy()
     countries = countries or ["US"]
     
-    # Get all holidays
-    years = df[ts_col].dt.year.unique()
-    all_holidays = set()
-    
-    for country in countries:
-        for year in years:
-            try:
-                country_holidays = holidays.country_holidays(country, years=year)
-                all_holidays.update(country_holidays.keys())
-            except Exception:
-                pass  # Skip if country not found
-    
-    # Create holiday feature
-    df["is_holiday"] = df[ts_col].dt.date.isin(all_holidays).astype(int)
-    
-    # Create lookback/lookahead features
-    if lookback > 0 or lookahead > 0:
-        holiday_dates = pd.DataFrame({"date": list(all_holidays)})
-        holiday_dates["date"] = pd.to_datetime(holiday_dates["date"])
+    for name, values in _iter_holiday_features(
+        df[ts_col], countries, lookback, lookahead, distance
+    ):
+        df[name] = values
+    
+    return df
+
+
+# Promo event columns that are not scope columns
+PROMO_FIELDS = ("start", "end", "name")
+
+PROMO_MODES = ("dense", "aggregate", "sparse")
+
+# Columns of the aggregate promo mode
+PROMO_AGGREGATES = ["promo_active_count", "promo_days_since_start"]
+
+
+def _promo_name(promo: Dict[str, str]) -> str:
+    """Get the feature name of a promo."""
+    start = pd.to_datetime(promo["start"])
+    name = promo.get("name")
+    if name is None or name != name:  # Missing or NaN
+        name = f"promo_{start.strftime('%Y%m%d')}"
+    return f"promo_{name}"
+
+
+def load_promo_events(promos: Any) -> Tuple[pd.DataFrame, str]:
+    """Normalize a promos config into an events table and output mode.
+    
+    ``promos`` is either a list of event dicts (dense mode) or a dict with
+    ``events`` (list of dicts) or ``path`` (CSV or Parquet file) and an
+    optional ``mode``: 'dense' (one indicator column per event),
+    'aggregate' (``PROMO_AGGREGATES``) or 'sparse' (indicator columns with
+    a sparse dtype). Event fields other than ``PROMO_FIELDS`` scope the
+    event to rows whose panel column has that value, e.g.
+    ``{"start": ..., "end": ..., "store": "CA_1"}``.
+    
+    Args:
+        promos: Promos config
+    
+    Returns:
+        Tuple of (events with start, end, name and scope columns, mode)
+    
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if isinstance(promos, dict):
+        mode = promos.get("mode", "dense")
+        path = promos.get("path")
+        if path:
+            events = pd.read_parquet(path) if str(path).endswith(".parquet") else pd.read_csv(path)
+        else:
+            events = pd.DataFrame(promos.get("events", []))
+    else:
+        mode = "dense"
+        events = pd.DataFrame(list(promos or []))
+    
+    if mode not in PROMO_MODES:
+        raise ValueError(f"Unknown promo mode: {mode}")
+    
+    if events.empty:
+        return pd.DataFrame(columns=list(PROMO_FIELDS)), mode
+    
+    events = events.copy()
+    events["name"] = [_promo_name(event) for event in events.to_dict("records")]
+    events["start"] = pd.to_datetime(events["start"])
+    events["end"] = pd.to_datetime(events["end"])
+    
+    return events.reset_index(drop=True), mode
+
+
+def _promo_names(promos: Any) -> List[str]:
+    """Get promo feature names in the order they are created."""
+    events, mode = load_promo_events(promos)
+    if mode == "aggregate":
+        return list(PROMO_AGGREGATES)
+    return events["name"].tolist()
+
+
+def _iter_promo_scopes(
+    df: pd.DataFrame,
+    events: pd.DataFrame,
+    ts_col: str,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Resolve promo membership with a sorted interval index per scope.
+    
+    Events are grouped by the set of scope columns they use. For each
+    group, rows get an integer key ``scope code * width + time rank``, so
+    the keys of one scope value are contiguous and time ordered in the
+    sorted distinct keys, and every event covers one ``[lo, hi)`` range of
+    them, found with two ``searchsorted`` calls.
+    
+    Args:
+        df: DataFrame with time series
+        events: Output of ``load_promo_events``
+        ts_col: Name of timestamp column
+    
+    Yields:
+        Tuples of (event positions, lo, hi, row key codes) where event
+        ``i`` covers the rows with ``lo[i] <= key code < hi[i]``
+    """
+    ts = df[ts_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    starts = events["start"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    ends = events["end"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    
+    times = np.unique(np.concatenate([ts, starts, ends]))
+    width = len(times) + 1
+    ts_rank = np.searchsorted(times, ts)
+    
+    scope_cols = [c for c in events.columns if c not in PROMO_FIELDS]
+    if scope_cols:
+        scoped = events[scope_cols].notna().to_numpy()
+    else:
+        scoped = np.zeros((len(events), 0), dtype=bool)
+    levels, level_codes = np.unique(scoped, axis=0, return_inverse=True)
+    level_codes = level_codes.reshape(-1)
+    
+    for level, mask in enumerate(levels):
+        cols = [c for c, used in zip(scope_cols, mask) if used]
+        positions = np.flatnonzero(level_codes == level)
+        
+        if cols:
+            missing = [c for c in cols if c not in df.columns]
+            if missing:
+                raise ValueError(f"Promo scope columns not in data: {missing}")
+            row_values = pd.MultiIndex.from_arrays([df[c].astype(str).to_numpy() for c in cols])
+            row_scope, scope_values = row_values.factorize()
+            event_values = pd.MultiIndex.from_arrays(
+                [events[c].iloc[positions].astype(str).to_numpy() for c in cols]
+            )
+            event_scope = pd.MultiIndex.from_tuples(scope_values).get_indexer(event_values) \
+                if len(scope_values) else np.full(len(positions), -1)
+        else:
+            row_scope = np.zeros(len(df), dtype=np.int64)
+            event_scope = np.zeros(len(positions), dtype=np.int64)
+        
+        # Events scoped to values absent from the data match nothing
+        known = event_scope >= 0
+        positions, event_scope = positions[known], event_scope[known]
         
-        for i in range(1, lookback + 1):
-            before_dates = set(holiday_dates["date"] - pd.Timedelta(days=i))
-            df[f"holiday_minus_{i}"] = df[ts_col].dt.date.isin(before_dates).astype(int)
+        keys, key_codes = np.unique(row_scope * width + ts_rank, return_inverse=True)
+        event_base = event_scope * width
+        lo = np.searchsorted(keys, event_base + np.searchsorted(times, starts[positions]), "left")
+        hi = np.searchsorted(keys, event_base + np.searchsorted(times, ends[positions]), "right")
         
-        for i in range(1, lookahead + 1):
-            after_dates = set(holiday_dates["date"] + pd.Timedelta(days=i))
-            df[f"holiday_plus_{i}"] = df[ts_col].dt.date.isin(after_dates).astype(int)
+        yield positions, lo, hi, key_codes.reshape(-1)
+
+
+def _promo_block(
+    df: pd.DataFrame,
+    promos: Any,
+    ts_col: str = "ds",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Compute dense or aggregate promo features.
     
-    return df
+    Args:
+        df: DataFrame with time series
+        promos: Promos config (see ``load_promo_events``)
+        ts_col: Name of timestamp column
+        out: Optional preallocated array to write into
+    
+    Returns:
+        Array of shape (n_rows, n_columns) in ``_promo_names`` order
+    """
+    events, mode = load_promo_events(promos)
+    n = len(df)
+    
+    if mode == "aggregate":
+        if out is None:
+            out = np.empty((n, len(PROMO_AGGREGATES)), dtype=np.int64)
+        count = np.zeros(n, dtype=np.int64)
+        latest = np.full(n, np.iinfo(np.int64).min)
+        starts = events["start"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        
+        for positions, lo, hi, key_codes in _iter_promo_scopes(df, events, ts_col):
+            # Difference array over the sorted keys gives active counts
+            diff = np.zeros(key_codes.max() + 2 if n else 1, dtype=np.int64)
+            np.add.at(diff, lo, 1)
+            np.add.at(diff, hi, -1)
+            count += np.cumsum(diff)[:-1][key_codes]
+            
+            # Latest start among the active events of each key
+            lengths = hi - lo
+            covered = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+            covered += np.arange(lengths.sum())
+            key_latest = np.full(len(diff) - 1, np.iinfo(np.int64).min)
+            np.maximum.at(key_latest, covered, np.repeat(starts[positions], lengths))
+            latest = np.maximum(latest, key_latest[key_codes])
+        
+        ts = df[ts_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        days = (ts - latest) // (86400 * 10**9)
+        out[:, 0] = count
+        out[:, 1] = np.where(count > 0, days, -1)
+        return out
+    
+    rows, cols = _promo_pairs(df, events, ts_col)
+    if out is None:
+        out = np.empty((n, len(events)), dtype=np.int64)
+    out[:] = 0
+    out[rows, cols] = 1
+    return out
+
+
+def _promo_pairs(
+    df: pd.DataFrame,
+    events: pd.DataFrame,
+    ts_col: str,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the (row, event) pairs of active promos."""
+    all_rows, all_cols = [], []
+    
+    for positions, lo, hi, key_codes in _iter_promo_scopes(df, events, ts_col):
+        # Rows grouped by key, so each event's rows are one contiguous slice
+        order = np.argsort(key_codes, kind="stable")
+        bounds = np.searchsorted(key_codes[order], np.arange(key_codes.max() + 2 if len(df) else 1))
+        row_lo, row_hi = bounds[lo], bounds[hi]
+        lengths = row_hi - row_lo
+        
+        covered = np.repeat(row_lo - np.cumsum(lengths) + lengths, lengths)
+        covered += np.arange(lengths.sum())
+        all_rows.append(order[covered])
+        all_cols.append(np.repeat(positions, lengths))
+    
+    if not all_rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    
+    return np.concatenate(all_rows), np.concatenate(all_cols)
+
+
+def promo_indicator_matrix(
+    df: pd.DataFrame,
+    promos: Any,
+    ts_col: str = "ds",
+) -> Tuple[sparse.csr_matrix, List[str]]:
+    """Build a sparse row x event promo indicator matrix.
+    
+    Args:
+        df: DataFrame with time series
+        promos: Promos config (see ``load_promo_events``)
+        ts_col: Name of timestamp column
+    
+    Returns:
+        Tuple of (CSR matrix of shape (n_rows, n_events), event names)
+    """
+    events, _ = load_promo_events(promos)
+    rows, cols = _promo_pairs(df, events, ts_col)
+    
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+        shape=(len(df), len(events)),
+    )
+    return matrix, events["name"].tolist()
 
 
 def create_promo_features(
     df: pd.DataFrame,
-    promos: List[Dict[str, str]],
+    promos: Any,
     ts_col: str = "ds",
 ) -> pd.DataFrame:
     """Create promotion features.
     
     Args:
         df: DataFrame with time series
-        promos: List of promo dicts with 'start', 'end', 'name' keys
+        promos: List of promo dicts with 'start', 'end', 'name' keys and
+            optional scope columns, or a promos config dict (see
+            ``load_promo_events``)
         ts_col: Name of timestamp column
     
     Returns:
@@ -157,72 +757,655 @@ def create_promo_features(
     """
     df = df.copy()
     
-    for promo in promos:
-        start = pd.to_datetime(promo["start"])
-        end = pd.to_datetime(promo["end"])
-        name = promo.get("name", f"promo_{start.strftime('%Y%m%d')}")
-        
-        df[f"promo_{name}"] = (
-            (df[ts_col] >= start) & (df[ts_col] <= end)
-        ).astype(int)
+    for name, values in _promo_frame(df, promos, ts_col).items():
+        df[name] = values
+    
+    return df
+
+
+def _promo_frame(
+    df: pd.DataFrame,
+    promos: Any,
+    ts_col: str = "ds",
+    dtype: type = np.int64,
+) -> pd.DataFrame:
+    """Compute promo features as a DataFrame aligned to ``df``."""
+    _, mode = load_promo_events(promos)
+    
+    if mode == "sparse":
+        matrix, names = promo_indicator_matrix(df, promos, ts_col)
+        frame = pd.DataFrame.sparse.from_spmatrix(matrix, index=df.index, columns=names)
+        return frame.astype(pd.SparseDtype(np.int8, 0))
+    
+    block = _promo_block(df, promos, ts_col, out=None)
+    return pd.DataFrame(
+        block.astype(dtype, copy=False), index=df.index, columns=_promo_names(promos)
+    )
+
+
+def _weather_names(weather_config: Dict) -> List[str]:
+    """Get weather feature names in the order they are created."""
+    features = list(weather_config.get("features", []))
+    lags = weather_config.get("lags", [])
+    return features + [f"{feature}_lag_{lag}" for feature in features for lag in lags]
+
+
+def load_weather(
+    path: str,
+    features: List[str],
+    ts_col: str = "ds",
+    zone_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """Load weather observations, reading only the needed columns.
+    
+    Args:
+        path: Path to weather Parquet file
+        features: Weather columns to read
+        ts_col: Name of timestamp column
+        zone_col: Optional name of zone column
+    
+    Returns:
+        DataFrame sorted by (zone, timestamp)
+    """
+    columns = [ts_col] + ([zone_col] if zone_col else []) + list(features)
+    weather = pq.read_table(path, columns=columns).to_pandas()
+    
+    sort_cols = [zone_col, ts_col] if zone_col else [ts_col]
+    return weather.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+
+
+def _join_weather(
+    ds: pd.Series,
+    zones: Optional[pd.Series],
+    weather: pd.DataFrame,
+    features: List[str],
+    ts_col: str = "ds",
+    zone_col: Optional[str] = None,
+    tolerance: Optional[pd.Timedelta] = None,
+) -> np.ndarray:
+    """As-of join weather onto rows without a hash merge.
+    
+    Each row takes the latest weather observation at or before its
+    timestamp (of its own zone when ``zones`` is given). Timestamps are
+    ranked on their sorted union so that (zone, timestamp) becomes one
+    sortable integer key, and a single ``searchsorted`` finds every match.
+    
+    Args:
+        ds: Row timestamps
+        zones: Row zones (if None, weather is shared by all rows)
+        weather: Output of ``load_weather``
+        features: Weather columns to join
+        ts_col: Name of weather timestamp column
+        zone_col: Name of weather zone column
+        tolerance: Optional maximum age of a matched observation
+    
+    Returns:
+        Array of shape (n_rows, n_features), NaN where nothing matched
+    """
+    n = len(ds)
+    out = np.full((n, len(features)), np.nan)
+    if n == 0 or len(weather) == 0:
+        return out
+    
+    w_ts = weather[ts_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    r_ts = ds.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    
+    if zones is not None and zone_col is not None:
+        w_zone, zone_values = pd.factorize(weather[zone_col].astype(str))
+        r_zone = pd.Index(zone_values).get_indexer(zones.astype(str).to_numpy())
+    else:
+        w_zone = np.zeros(len(weather), dtype=np.int64)
+        r_zone = np.zeros(n, dtype=np.int64)
+    
+    union = np.unique(np.concatenate([w_ts, r_ts]))
+    width = len(union) + 1
+    w_key = w_zone * width + np.searchsorted(union, w_ts)
+    r_key = r_zone * width + np.searchsorted(union, r_ts)
+    
+    idx = np.searchsorted(w_key, r_key, side="right") - 1
+    valid = (idx >= 0) & (r_zone >= 0)
+    valid[valid] &= w_zone[idx[valid]] == r_zone[valid]
+    if tolerance is not None:
+        valid[valid] &= r_ts[valid] - w_ts[idx[valid]] <= tolerance.value
+    
+    values = weather[features].to_numpy(dtype=np.float64)
+    out[valid] = values[idx[valid]]
+    
+    return out
+
+
+def _join_weather_config(
+    df: pd.DataFrame,
+    weather_config: Dict,
+    ts_col: str,
+    id_col: Optional[str],
+) -> np.ndarray:
+    """Load the configured weather file and as-of join it onto rows.
+    
+    Weather is joined per zone when ``zone_col`` is configured, or when the
+    weather file has a column named like ``id_col``.
+    
+    Args:
+        df: DataFrame with time series
+        weather_config: Weather config dict
+        ts_col: Name of timestamp column
+        id_col: Name of ID column for panel data
+    
+    Returns:
+        Array of shape (n_rows, n_features)
+    
+    Raises:
+        ValueError: If the config has no 'path'
+    """
+    if not weather_config.get("path"):
+        raise ValueError("Weather features need a 'path' to a weather Parquet file")
+    
+    path = weather_config["path"]
+    features = list(weather_config.get("features", []))
+    
+    zone_col = weather_config.get("zone_col")
+    if zone_col is None and id_col is not None and id_col in pq.read_schema(path).names:
+        zone_col = id_col
+    
+    weather = load_weather(path, features, ts_col, zone_col)
+    tolerance = weather_config.get("tolerance")
+    
+    return _join_weather(
+        df[ts_col],
+        df[id_col] if zone_col is not None and id_col is not None else None,
+        weather,
+        features,
+        ts_col,
+        zone_col,
+        pd.Timedelta(tolerance) if tolerance is not None else None,
+    )
+
+
+def _weather_block(
+    df: pd.DataFrame,
+    weather_config: Dict,
+    ts_col: str,
+    id_col: Optional[str],
+    layout: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Join weather and compute its lags into one block.
+    
+    Args:
+        df: DataFrame with time series
+        weather_config: Weather config dict
+        ts_col: Name of timestamp column
+        id_col: Name of ID column for panel data
+        layout: Output of ``_group_layout``
+        out: Optional preallocated array to write into
+    
+    Returns:
+        Array of shape (n_rows, n_columns) in ``_weather_names`` order
+    """
+    features = list(weather_config.get("features", []))
+    lags = list(weather_config.get("lags", []))
+    
+    joined = _join_weather_config(df, weather_config, ts_col, id_col)
+    
+    if out is None:
+        out = np.empty((len(df), len(features) * (1 + len(lags))))
+    
+    n_features = len(features)
+    out[:, :n_features] = joined
+    
+    # Weather lags use the same series-contiguous engine as target lags
+    for f in range(n_features):
+        start = n_features + f * len(lags)
+        _lag_block(joined[:, f], lags, layout, out=out[:, start:start + len(lags)])
+    
+    return out
+
+
+def create_weather_features(
+    df: pd.DataFrame,
+    weather_config: Dict,
+    ts_col: str = "ds",
+    id_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """Create weather features and their lags.
+    
+    Args:
+        df: DataFrame with time series
+        weather_config: Weather config with 'path', 'features' and
+            optional 'lags', 'zone_col' and 'tolerance' keys
+        ts_col: Name of timestamp column
+        id_col: Name of ID column for panel data
+    
+    Returns:
+        DataFrame with weather features
+    """
+    df = df.copy()
+    
+    names = _weather_names(weather_config)
+    block = _weather_block(df, weather_config, ts_col, id_col, _group_layout(df, id_col))
+    
+    for j, name in enumerate(names):
+        df[name] = block[:, j]
     
     return df
 
 
+# Feature families in output column order, with the dtype of their block
+FEATURE_FAMILIES = [
+    ("calendar", np.int64),
+    ("fourier", np.float64),
+    ("lags", np.float64),
+    ("rolls", np.float64),
+    ("holidays", np.int64),
+    ("promos", np.int64),
+    ("weather", np.float64),
+]
+
+# Smallest dtypes that hold each family, used when ``config["compact"]`` is set
+COMPACT_DTYPES = {
+    "calendar": np.int16,  # year and dayofyear exceed int8
+    "fourier": np.float32,
+    "lags": np.float32,
+    "rolls": np.float32,
+    "holidays": np.int16,  # holiday distances reach HOLIDAY_DISTANCE_CAP
+    "promos": np.int8,
+    "weather": np.float32,
+}
+
+
+def family_dtypes(config: Dict) -> Dict[str, type]:
+    """Get the block dtype of each feature family.
+    
+    Args:
+        config: Features configuration dict (``compact: true`` selects
+            ``COMPACT_DTYPES``)
+    
+    Returns:
+        Mapping of feature family to dtype
+    """
+    if not config.get("compact"):
+        return dict(FEATURE_FAMILIES)
+    
+    dtypes = dict(COMPACT_DTYPES)
+    if config.get("promos") and load_promo_events(config["promos"])[1] == "aggregate":
+        dtypes["promos"] = np.int16  # Days since start exceed int8
+    return dtypes
+
+
+def plan_features(config: Dict) -> Dict[str, List[str]]:
+    """Plan every feature column ``build_features`` will create.
+    
+    Args:
+        config: Features configuration dict
+    
+    Returns:
+        Mapping of feature family to column names, in output order
+    """
+    plan = {"calendar": list(CALENDAR_FEATURES)}
+    
+    if config.get("fourier"):
+        fourier_config = config["fourier"]
+        plan["fourier"] = fourier_feature_names(
+            fourier_config.get("periods", [7, 365.25]),
+            fourier_config.get("k", 5),
+        )
+    
+    if config.get("lags"):
+        plan["lags"] = [f"lag_{lag}" for lag in config["lags"]]
+    
+    if config.get("rolls"):
+        plan["rolls"] = _rolling_names(config["rolls"])
+    
+    if config.get("holidays"):
+        holiday_config = config["holidays"]
+        plan["holidays"] = _holiday_names(
+            holiday_config.get("lookback", 0),
+            holiday_config.get("lookahead", 0),
+            holiday_config.get("distance", False),
+        )
+    
+    if config.get("promos"):
+        plan["promos"] = _promo_names(config["promos"])
+    
+    if config.get("weather") and config["weather"].get("enabled", True):
+        plan["weather"] = _weather_names(config["weather"])
+    
+    return plan
+
+
+def _dense_plan(config: Dict) -> Dict[str, List[str]]:
+    """Get the planned families that are stored in dense blocks."""
+    plan = plan_features(config)
+    if "promos" in plan and load_promo_events(config["promos"])[1] == "sparse":
+        del plan["promos"]
+    return plan
+
+
+def estimate_feature_memory(n_rows: int, config: Dict) -> int:
+    """Estimate the bytes needed for the feature block of ``n_rows`` rows.
+    
+    Args:
+        n_rows: Number of rows
+        config: Features configuration dict
+    
+    Returns:
+        Estimated size of the feature columns in bytes
+    """
+    plan = _dense_plan(config)
+    
+    row_bytes = sum(
+        len(plan.get(family, [])) * np.dtype(dtype).itemsize
+        for family, dtype in family_dtypes(config).items()
+    )
+    
+    return n_rows * row_bytes
+
+
+def _assemble_features(
+    df: pd.DataFrame,
+    config: Dict,
+    ts_col: str,
+    target_col: str,
+    id_col: Optional[str],
+    families: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Build all planned features into preallocated blocks in one pass.
+    
+    Args:
+        df: DataFrame with time series (not modified)
+        config: Features configuration dict
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+        families: Feature families to build (if None, all planned families)
+    
+    Returns:
+        Input columns followed by all feature columns
+    """
+    # Shallow copy: replacing ds below must not touch the caller's frame
+    df = df.copy(deep=False)
+    if not pd.api.types.is_datetime64_any_dtype(df[ts_col]):
+        df[ts_col] = pd.to_datetime(df[ts_col])
+    ds = df[ts_col]
+    n = len(df)
+    
+    plan = plan_features(config)
+    if families is not None:
+        plan = {family: cols for family, cols in plan.items() if family in families}
+    dense = _dense_plan(config)
+    
+    # One block per dtype; each family writes into its own column slice
+    dtypes = family_dtypes(config)
+    blocks = {}
+    slices = {}
+    for dtype in dict.fromkeys(dtypes.values()):
+        width = 0
+        for family, _ in FEATURE_FAMILIES:
+            if dtypes[family] is dtype and family in plan and family in dense:
+                slices[family] = slice(width, width + len(plan[family]))
+                width += len(plan[family])
+        blocks[dtype] = np.empty((n, width), dtype=dtype)
+    
+    def view(family: str) -> np.ndarray:
+        return blocks[dtypes[family]][:, slices[family]]
+    
+    def fill(family: str, columns: Iterator[Tuple[str, np.ndarray]]) -> None:
+        out = view(family)
+        for j, (_, values) in enumerate(columns):
+            out[:, j] = values
+    
+    # Time-only features are computed once per distinct timestamp
+    uniques, codes = factorize_timestamps(ds)
+    
+    if "calendar" in plan:
+        fill("calendar", iter_calendar_features(uniques, codes))
+    
+    if "fourier" in plan:
+        fourier_config = config["fourier"]
+        fill("fourier", iter_fourier_features(
+            uniques,
+            fourier_config.get("periods", [7, 365.25]),
+            fourier_config.get("k", 5),
+            codes,
+        ))
+    
+    layout = None
+    if "lags" in plan or "rolls" in plan or "weather" in plan:
+        layout = _group_layout(df, id_col)
+    
+    if "lags" in plan or "rolls" in plan:
+        values = df[target_col].to_numpy()
+        
+        if "lags" in plan:
+            _lag_block(values, config["lags"], layout, out=view("lags"))
+        if "rolls" in plan:
+            _rolling_block(values, config["rolls"], layout, out=view("rolls"))
+    
+    if "holidays" in plan:
+        holiday_config = config["holidays"]
+        fill("holidays", _iter_holiday_features(
+            uniques,
+            holiday_config.get("countries", ["US"]),
+            holiday_config.get("lookback", 0),
+            holiday_config.get("lookahead", 0),
+            holiday_config.get("distance", False),
+            codes,
+        ))
+    
+    if "promos" in plan and "promos" in dense:
+        _promo_block(df, config["promos"], ts_col, out=view("promos"))
+    
+    if "weather" in plan:
+        _weather_block(df, config["weather"], ts_col, id_col, layout, out=view("weather"))
+    
+    frames = [df]
+    for family, _ in FEATURE_FAMILIES:
+        if family in plan and family in dense:
+            frames.append(
+                pd.DataFrame(view(family), columns=plan[family], index=df.index, copy=False)
+            )
+        elif family in plan:
+            frames.append(_promo_frame(df, config["promos"], ts_col))
+    
+    return pd.concat(frames, axis=1, copy=False)
+
+
+# Shards per worker in parallel builds, for load balancing
+SHARDS_PER_WORKER = 4
+
+
+def _shard_rows(
+    df: pd.DataFrame,
+    id_col: str,
+    max_rows: int,
+) -> List[np.ndarray]:
+    """Split a panel into whole-series shards of at most ``max_rows`` rows.
+    
+    A single series longer than ``max_rows`` gets a shard of its own.
+    
+    Args:
+        df: DataFrame with time series
+        id_col: Name of ID column
+        max_rows: Target maximum rows per shard
+    
+    Returns:
+        List of positional row indices, one array per shard
+    """
+    order, codes, pos, size = _group_layout(df, id_col)
+    
+    starts = np.flatnonzero(pos == 0)
+    sizes = size[starts]
+    
+    shards = []
+    begin = 0
+    rows = 0
+    for g, group_size in enumerate(sizes):
+        if rows and rows + group_size > max_rows:
+            shards.append(order[starts[begin]:starts[g]])
+            begin, rows = g, 0
+        rows += group_size
+    if len(sizes):
+        shards.append(order[starts[begin]:])
+    
+    return shards
+
+
+def _budget_shards(
+    df: pd.DataFrame,
+    config: Dict,
+    id_col: Optional[str],
+    memory_budget: Optional[int],
+) -> Optional[List[np.ndarray]]:
+    """Plan whole-series shards whose feature columns fit in a budget.
+    
+    Args:
+        df: DataFrame with time series
+        config: Features configuration dict
+        id_col: Name of ID column for panel data
+        memory_budget: Maximum bytes of feature columns per shard
+    
+    Returns:
+        Positional row indices per shard, or None if no sharding is needed
+    """
+    n = len(df)
+    needed = estimate_feature_memory(n, config)
+    
+    if memory_budget is None or needed <= memory_budget:
+        return None
+    
+    if id_col is None:
+        raise MemoryError(
+            f"Features need ~{needed:,} bytes, over the {memory_budget:,} byte budget, "
+            "and a single series cannot be split"
+        )
+    
+    row_bytes = max(needed // max(n, 1), 1)
+    return _shard_rows(df, id_col, max(memory_budget // row_bytes, 1))
+
+
+def _parallel_shards(
+    df: pd.DataFrame,
+    id_col: str,
+    n_jobs: int,
+) -> List[np.ndarray]:
+    """Split a panel into whole-series shards for ``n_jobs`` workers.
+    
+    Makes ``SHARDS_PER_WORKER`` shards per worker so uneven series lengths
+    still balance across the pool.
+    
+    Args:
+        df: DataFrame with time series
+        id_col: Name of ID column
+        n_jobs: Number of workers (-1 for all cores)
+    
+    Returns:
+        List of positional row indices, one array per shard
+    """
+    n_workers = effective_n_jobs(n_jobs)
+    max_rows = -(-len(df) // max(n_workers * SHARDS_PER_WORKER, 1))
+    return _shard_rows(df, id_col, max(max_rows, 1))
+
+
+def iter_features(
+    df: pd.DataFrame,
+    config: Dict,
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+    memory_budget: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """Build features shard by shard within a memory budget.
+    
+    Each shard holds whole series, so lag and rolling features are
+    identical to a single ``build_features`` call on the full panel.
+    
+    Args:
+        df: DataFrame with time series
+        config: Features configuration dict
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+        memory_budget: Maximum bytes of feature columns per shard (if None,
+            one shard)
+    
+    Yields:
+        Feature DataFrames, one per shard
+    """
+    shards = _budget_shards(df, config, id_col, memory_budget)
+    
+    if shards is None:
+        yield _assemble_features(df, config, ts_col, target_col, id_col)
+        return
+    
+    for rows in shards:
+        yield _assemble_features(df.iloc[rows], config, ts_col, target_col, id_col)
+
+
 def build_features(
     df: pd.DataFrame,
     config: Dict,
     ts_col: str = "ds",
     target_col: str = "y",
     id_col: Optional[str] = None,
+    memory_budget: Optional[int] = None,
+    on_budget: str = "raise",
+    n_jobs: int = 1,
 ) -> pd.DataFrame:
     """Build all features from configuration.
     
+    All feature columns are planned from ``config`` up front and written
+    into preallocated blocks, without copying the input per feature family.
+    With ``compact: true`` in ``config`` the blocks use ``COMPACT_DTYPES``
+    (int8/int16 flags and calendar fields, float32 values).
+    
     Args:
         df: DataFrame with time series
         config: Features configuration dict
         ts_col: Name of timestamp column
         target_col: Name of target column
         id_col: Name of ID column for panel data
+        memory_budget: Optional maximum bytes for the feature columns
+        on_budget: What to do when the budget would be exceeded: 'raise'
+            fails before any work is done, 'chunk' builds whole-series
+            shards within the budget and reassembles them
+        n_jobs: Worker processes for panel data (-1 for all cores). The
+            panel is split into whole-series shards that are built in
+            parallel and reassembled in input order; the result is
+            identical to the serial path
     
     Returns:
         DataFrame with all features
     """
-    df = df.copy()
-    df[ts_col] = pd.to_datetime(df[ts_col])
+    if on_budget not in ("raise", "chunk"):
+        raise ValueError(f"Unknown on_budget: {on_budget}")
     
-    # Calendar features
-    calendar_feats = get_calendar_features(df[ts_col])
-    df = pd.concat([df, calendar_feats], axis=1)
+    if memory_budget is not None and on_budget == "raise":
+        needed = estimate_feature_memory(len(df), config)
+        if needed > memory_budget:
+            raise MemoryError(
+                f"Features need ~{needed:,} bytes, over the {memory_budget:,} byte budget"
+            )
     
-    # Fourier features
-    if "fourier" in config and config["fourier"]:
-        fourier_config = config["fourier"]
-        periods = fourier_config.get("periods", [7, 365.25])
-        k = fourier_config.get("k", 5)
-        
-        fourier_feats = create_fourier_features(df[ts_col], periods, k)
-        df = pd.concat([df, fourier_feats], axis=1)
+    shards = _budget_shards(df, config, id_col, memory_budget)
+    if n_jobs != 1 and id_col is not None:
+        parallel = _parallel_shards(df, id_col, n_jobs)
+        if shards is None or len(parallel) > len(shards):
+            shards = parallel
     
-    # Lag features
-    if "lags" in config and config["lags"]:
-        df = create_lag_features(df, config["lags"], target_col, id_col)
+    if shards is None:
+        return _assemble_features(df, config, ts_col, target_col, id_col)
     
-    # Rolling features
-    if "rolls" in config and config["rolls"]:
-        df = create_rolling_features(df, config["rolls"], target_col, id_col)
-    
-    # Holiday features
-    if "holidays" in config and config["holidays"]:
-        holiday_config = config["holidays"]
-        countries = holiday_config.get("countries", ["US"])
-        lookback = holiday_config.get("lookback", 0)
-        lookahead = holiday_config.get("lookahead", 0)
-        
-        df = create_holiday_features(df, ts_col, countries, lookback, lookahead)
-    
-    # Promo features
-    if "promos" in config and config["promos"]:
-        df = create_promo_features(df, config["promos"], ts_col)
+    if n_jobs == 1 or len(shards) == 1:
+        parts = [
+            _assemble_features(df.iloc[rows], config, ts_col, target_col, id_col)
+            for rows in shards
+        ]
+    else:
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(_assemble_features)(df.iloc[rows], config, ts_col, target_col, id_col)
+            for rows in shards
+        )
     
-    return df
+    # Restore the input row order
+    positions = np.concatenate(shards)
+    return pd.concat(parts, copy=False).iloc[np.argsort(positions, kind="stable")]
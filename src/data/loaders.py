@@ -1,9 +1,30 @@
 """Data loaders for different time series datasets."""
 
+import math
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+
+from src.data.cache import (
+    CacheWriter,
+    cache_files,
+    cache_is_valid,
+    compact_dtypes,
+    compute_fingerprint,
+    read_cache,
+    read_watermarks,
+    write_cache,
+    write_delta,
+    write_watermarks,
+)
+from src.data.dataset import LazyDataset
+
+# Wide M5 sales rows converted per chunk (each row expands to ~1,900 long rows)
+M5_CHUNK_ROWS = 1_000
 
 
 def load_m5_data(
@@ -12,6 +33,9 @@ def load_m5_data(
 ) -> pd.DataFrame:
     """Load M5 retail dataset.
     
+    The preprocessed long-format data is cached as Parquet next to the
+    sources and rebuilt whenever the source fingerprint changes.
+    
     Args:
         data_dir: Path to data directory
         subset: Optional subset name (small, medium, large)
@@ -19,71 +43,172 @@ def load_m5_data(
     Returns:
         DataFrame in long format with columns: series_id, ds, y
     """
-    data_path = Path(data_dir)
+    return read_cache(build_m5_cache(data_dir, subset))
+
+
+def build_m5_cache(
+    data_dir: str,
+    subset: Optional[str] = None,
+) -> Path:
+    """Build the M5 Parquet cache if it is missing or stale.
     
-    # Check for preprocessed file
-    if subset:
-        preprocessed = data_path / f"m5_{subset}_long.csv"
-    else:
-        preprocessed = data_path / "m5_long.csv"
+    Args:
+        data_dir: Path to data directory
+        subset: Optional subset name (small, medium, large)
     
-    if preprocessed.exists():
-        df = pd.read_csv(preprocessed)
-        df["ds"] = pd.to_datetime(df["ds"])
-        return df
+    Returns:
+        Path to the up-to-date cache file
+    """
+    data_path = Path(data_dir)
+    prefix = f"m5_{subset}" if subset else "m5"
     
-    # If raw M5 files exist, load and convert
-    # This is a simplified loader - real M5 requires more processing
+    # Long-format CSV (e.g. from scripts/fetch_m5.py) takes precedence over raw M5
+    long_file = data_path / f"{prefix}_long.csv"
+    cache_file = data_path / f"{prefix}_long.parquet"
     sales_file = data_path / "sales_train_validation.csv"
     calendar_file = data_path / "calendar.csv"
     
-    if not sales_file.exists():
+    if long_file.exists():
+        sources = [long_file]
+    elif sales_file.exists():
+        sources = [sales_file, calendar_file]
+    elif cache_file.exists():
+        # Sources were removed after caching; the cache is all we have
+        return cache_file
+    else:
         raise FileNotFoundError(
             f"M5 data not found at {data_path}. "
             "Run 'python scripts/fetch_m5.py' to download."
         )
     
-    sales = pd.read_csv(sales_file)
-    calendar = pd.read_csv(calendar_file)
-    
-    # Extract hierarchy from item_id
-    sales["state"] = sales["store_id"].str[:2]
-    sales["store"] = sales["store_id"]
-    sales["dept"] = sales["dept_id"]
-    sales["item"] = sales["item_id"]
-    
-    # Create series_id
-    sales["series_id"] = (
-        sales["state"] + "_" +
-        sales["store"] + "_" +
-        sales["dept"] + "_" +
-        sales["item"]
-    )
+    fingerprint = compute_fingerprint(sources)
+    if cache_is_valid(cache_file, fingerprint):
+        return cache_file
+    
+    if long_file.exists():
+        df_long = pd.read_csv(long_file)
+        df_long["ds"] = pd.to_datetime(df_long["ds"])
+        
+        # Sorted rows give tight row-group statistics for filter pushdown
+        df_long = df_long.sort_values(["series_id", "ds"]).reset_index(drop=True)
+        write_cache(compact_dtypes(df_long), cache_file, fingerprint)
+    else:
+        # Stream raw M5 straight into the cache
+        _convert_m5_raw(sales_file, calendar_file, cache_file, fingerprint)
     
-    # Melt to long format
-    id_cols = ["series_id", "state", "store", "dept", "item"]
-    value_cols = [c for c in sales.columns if c.startswith("d_")]
+    return cache_file
+
+
+def _convert_m5_raw(
+    sales_file: Path,
+    calendar_file: Path,
+    cache_file: Path,
+    fingerprint: str,
+    chunksize: int = M5_CHUNK_ROWS,
+) -> None:
+    """Convert raw wide M5 sales to a long-format cache in row chunks.
+    
+    Rows are written in (series_id, ds) order with bounded memory: the ID
+    columns are read first to find each wide row's output position, chunks
+    of wide rows are then spilled to temporary files by output chunk, and
+    each output chunk is sorted, reshaped with NumPy and appended to the
+    cache as its own row group. Peak memory is bounded by ``chunksize``
+    rather than by the size of the dataset; the spill files take about as
+    much disk as the wide float32 sales.
     
-    df_long = sales.melt(
-        id_vars=id_cols,
-        value_vars=value_cols,
-        var_name="d",
-        value_name="y",
+    Args:
+        sales_file: Path to sales_train_validation.csv
+        calendar_file: Path to calendar.csv
+        cache_file: Output cache file path
+        fingerprint: Fingerprint of the raw sources
+        chunksize: Number of wide sales rows per chunk
+    
+    Raises:
+        ValueError: If a ``d_`` sales column has no date in the calendar
+    """
+    header = pd.read_csv(sales_file, nrows=0).columns
+    value_cols = [c for c in header if c.startswith("d_")]
+    
+    # Vectorized day -> date lookup indexed by the day number in "d_<n>"
+    calendar = pd.read_csv(calendar_file, usecols=["d", "date"])
+    day_nums = calendar["d"].str[2:].astype(np.int64).to_numpy()
+    date_by_day = np.full(day_nums.max() + 1, np.datetime64("NaT"), dtype="datetime64[ns]")
+    date_by_day[day_nums] = pd.to_datetime(calendar["date"]).to_numpy()
+    
+    col_days = np.array([int(c[2:]) for c in value_cols], dtype=np.int64)
+    known = col_days < len(date_by_day)
+    known[known] = ~np.isnat(date_by_day[col_days[known]])
+    if not known.all():
+        missing = [col for col, ok in zip(value_cols, known) if not ok]
+        raise ValueError(f"Sales columns missing from {calendar_file}: {missing}")
+    col_dates = date_by_day[col_days]
+    order = np.argsort(col_dates, kind="stable")
+    value_cols = [value_cols[i] for i in order]
+    col_dates = col_dates[order]
+    n_days = len(value_cols)
+    
+    # Extract hierarchy from item_id; one small row per series
+    ids = pd.read_csv(sales_file, usecols=["store_id", "dept_id", "item_id"])
+    state = ids["store_id"].str[:2]
+    hierarchy = pd.DataFrame({
+        "series_id": state + "_" + ids["store_id"] + "_" + ids["dept_id"] + "_" + ids["item_id"],
+        "state": state,
+        "store": ids["store_id"],
+        "dept": ids["dept_id"],
+        "item": ids["item_id"],
+    })
+    
+    # Output position of each wide row in series_id order
+    by_series = np.argsort(hierarchy["series_id"].to_numpy(), kind="stable")
+    rank = np.empty(len(hierarchy), dtype=np.int64)
+    rank[by_series] = np.arange(len(hierarchy))
+    
+    reader = pd.read_csv(
+        sales_file,
+        usecols=value_cols,
+        dtype={c: np.float32 for c in value_cols},
+        chunksize=chunksize,
     )
     
-    # Join with calendar to get dates
-    calendar_map = calendar.set_index("d")["date"].to_dict()
-    df_long["ds"] = df_long["d"].map(calendar_map)
-    df_long["ds"] = pd.to_datetime(df_long["ds"])
-    
-    # Sort and clean
-    df_long = df_long.sort_values(["series_id", "ds"]).reset_index(drop=True)
-    df_long = df_long[["series_id", "ds", "y", "state", "store", "dept", "item"]]
-    
-    # Save preprocessed
-    df_long.to_csv(preprocessed, index=False)
-    
-    return df_long
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="m5-", dir=cache_file.parent) as tmp:
+        tmp_dir = Path(tmp)
+        
+        # Spill every wide row to the output chunk it belongs to
+        start = 0
+        for sales in reader:
+            values = sales[value_cols].to_numpy(dtype=np.float32)
+            positions = rank[start:start + len(sales)]
+            start += len(sales)
+            
+            buckets = positions // chunksize
+            for bucket in np.unique(buckets):
+                rows = buckets == bucket
+                with open(tmp_dir / f"{bucket}.values", "ab") as f:
+                    values[rows].tofile(f)
+                with open(tmp_dir / f"{bucket}.positions", "ab") as f:
+                    positions[rows].tofile(f)
+        
+        with CacheWriter(cache_file, fingerprint) as writer:
+            for bucket in range(math.ceil(len(hierarchy) / chunksize)):
+                positions = np.fromfile(tmp_dir / f"{bucket}.positions", dtype=np.int64)
+                values = np.fromfile(tmp_dir / f"{bucket}.values", dtype=np.float32)
+                order = np.argsort(positions)
+                values = values.reshape(len(positions), n_days)[order]
+                series = hierarchy.iloc[by_series[positions[order]]]
+                
+                # Wide -> long: repeat ids per day, tile dates per series
+                df_long = pd.DataFrame({
+                    "series_id": np.repeat(series["series_id"].to_numpy(), n_days),
+                    "ds": np.tile(col_dates, len(series)),
+                    "y": values.ravel(),
+                    "state": np.repeat(series["state"].to_numpy(), n_days),
+                    "store": np.repeat(series["store"].to_numpy(), n_days),
+                    "dept": np.repeat(series["dept"].to_numpy(), n_days),
+                    "item": np.repeat(series["item"].to_numpy(), n_days),
+                })
+                
+                writer.write(compact_dtypes(df_long))
 
 
 def load_opsd_data(
@@ -91,68 +216,123 @@ def load_opsd_data(
 ) -> pd.DataFrame:
     """Load OPSD energy dataset.
     
+    The preprocessed long-format data is cached as Parquet next to the
+    sources and rebuilt whenever the source fingerprint changes.
+    
     Args:
         data_dir: Path to data directory
     
     Returns:
         DataFrame in long format with columns: series_id, ds, y
     """
-    data_path = Path(data_dir)
+    return read_cache(build_opsd_cache(data_dir))
+
+
+def build_opsd_cache(
+    data_dir: str,
+) -> Path:
+    """Build the OPSD Parquet cache if it is missing or stale.
     
-    # Check for preprocessed file
-    preprocessed = data_path / "opsd_long.csv"
+    Args:
+        data_dir: Path to data directory
     
-    if preprocessed.exists():
-        df = pd.read_csv(preprocessed)
-        df["ds"] = pd.to_datetime(df["ds"])
-        return df
+    Returns:
+        Path to the up-to-date cache file
+    """
+    data_path = Path(data_dir)
     
-    # Load raw OPSD file
+    # Long-format CSV (e.g. from scripts/fetch_opsd.py) takes precedence over raw OPSD
+    long_file = data_path / "opsd_long.csv"
+    cache_file = data_path / "opsd_long.parquet"
     opsd_file = data_path / "opsd_time_series.csv"
     
-    if not opsd_file.exists():
+    if long_file.exists():
+        sources = [long_file]
+    elif opsd_file.exists():
+        sources = [opsd_file]
+    elif cache_file.exists():
+        # Sources were removed after caching; the cache is all we have
+        return cache_file
+    else:
         raise FileNotFoundError(
             f"OPSD data not found at {data_path}. "
             "Run 'python scripts/fetch_opsd.py' to download."
         )
     
-    df = pd.read_csv(opsd_file)
-    df["ds"] = pd.to_datetime(df["utc_timestamp"])
+    fingerprint = compute_fingerprint(sources)
+    if cache_is_valid(cache_file, fingerprint):
+        return cache_file
     
-    # Focus on load columns
-    load_cols = [c for c in df.columns if "load_actual" in c.lower()]
+    if long_file.exists():
+        df_long = pd.read_csv(long_file)
+        df_long["ds"] = pd.to_datetime(df_long["ds"])
+        df_long = df_long.sort_values(["series_id", "ds"]).reset_index(drop=True)
+    else:
+        df_long = _convert_opsd_raw(opsd_file)
+    
+    # Save preprocessed
+    write_cache(compact_dtypes(df_long), cache_file, fingerprint)
+    
+    return cache_file
+
+
+def _convert_opsd_raw(opsd_file: Path) -> pd.DataFrame:
+    """Convert the raw wide OPSD time series file to long format.
+    
+    Only the timestamp and load columns are parsed (as float32). The wide
+    block is transposed and flattened in one pass, so rows come out in
+    (series_id, ds) order without a global sort.
+    
+    Args:
+        opsd_file: Path to opsd_time_series.csv
+    
+    Returns:
+        DataFrame in long format
+    """
+    header = pd.read_csv(opsd_file, nrows=0).columns
+    
+    # Focus on load columns, in series_id order
+    load_cols = sorted(c for c in header if "load_actual" in c.lower())
     
     if not load_cols:
         raise ValueError("No load columns found in OPSD data")
     
-    # Convert to long format
-    df_long_parts = []
+    df = pd.read_csv(
+        opsd_file,
+        usecols=["utc_timestamp", *load_cols],
+        dtype={c: np.float32 for c in load_cols},
+    )
+    ds = pd.to_datetime(df["utc_timestamp"])
+    if ds.dt.tz is not None:
+        ds = ds.dt.tz_convert(None)
+    ds = ds.to_numpy(dtype="datetime64[ns]")
     
-    for col in load_cols:
-        df_sub = df[["ds", col]].copy()
-        df_sub = df_sub.dropna(subset=[col])
-        df_sub["series_id"] = col
-        df_sub = df_sub.rename(columns={col: "y"})
-        df_long_parts.append(df_sub)
+    order = np.argsort(ds, kind="stable")
+    ds = ds[order]
     
-    df_long = pd.concat(df_long_parts, ignore_index=True)
-    df_long = df_long.sort_values(["series_id", "ds"]).reset_index(drop=True)
+    # (n_series, n_timestamps) block flattened series-major
+    values = df[load_cols].to_numpy(dtype=np.float32)[order].T.ravel()
+    codes = np.repeat(np.arange(len(load_cols), dtype=np.int32), len(ds))
+    keep = ~np.isnan(values)
     
-    # Save preprocessed
-    df_long.to_csv(preprocessed, index=False)
+    df_long = pd.DataFrame({
+        "ds": np.tile(ds, len(load_cols))[keep],
+        "y": values[keep],
+        "series_id": pd.Categorical.from_codes(codes[keep], categories=load_cols),
+    })
     
     return df_long
 
 
-def load_dataset(config_path: str, config: dict) -> pd.DataFrame:
-    """Load dataset based on configuration.
+def build_dataset_cache(config_path: str, config: dict) -> Path:
+    """Build the Parquet cache for a configured dataset if needed.
     
     Args:
         config_path: Path to config file (for resolving relative paths)
         config: Dataset configuration dict
     
     Returns:
-        DataFrame in long format
+        Path to the up-to-date cache file
     """
     dataset_name = config["name"]
     data_dir = config["path"]
@@ -163,8 +343,94 @@ def load_dataset(config_path: str, config: dict) -> pd.DataFrame:
         data_dir = config_dir / data_dir
     
     if "m5" in dataset_name.lower() or "retail" in dataset_name.lower():
-        return load_m5_data(str(data_dir))
+        return build_m5_cache(str(data_dir))
     elif "opsd" in dataset_name.lower() or "energy" in dataset_name.lower():
-        return load_opsd_data(str(data_dir))
+        return build_opsd_cache(str(data_dir))
     else:
         raise ValueError(f"Unknown dataset: {dataset_name}")
+
+
+def load_dataset(
+    config_path: str,
+    config: dict,
+    lazy: bool = False,
+) -> Union[pd.DataFrame, LazyDataset]:
+    """Load dataset based on configuration.
+    
+    Args:
+        config_path: Path to config file (for resolving relative paths)
+        config: Dataset configuration dict
+        lazy: If True, return a LazyDataset handle over the cache instead
+            of materializing the full dataset
+    
+    Returns:
+        DataFrame in long format, or a LazyDataset if ``lazy`` is set
+    """
+    cache_file = build_dataset_cache(config_path, config)
+    
+    if lazy:
+        return LazyDataset(str(cache_file))
+    
+    return read_cache(cache_file)
+
+
+def ingest_observations(
+    cache_file: Path,
+    new_rows: pd.DataFrame,
+    on_late: str = "reject",
+    id_col: str = "series_id",
+    ts_col: str = "ds",
+) -> Dict[str, int]:
+    """Append new observations to a cached dataset.
+    
+    Each series has a high-water mark: the latest timestamp already
+    ingested. Rows after the mark are appended as a small increment file
+    next to the cache, so the cost is proportional to the new data. Rows
+    at or before the mark are late or duplicate and are handled per
+    ``on_late``. Rebuilding the cache from its sources discards increments.
+    
+    Args:
+        cache_file: Path to the cache (e.g. from ``build_dataset_cache``)
+        new_rows: New rows with the same columns as the cache
+        on_late: 'reject' to drop late/duplicate rows, 'merge' to keep
+            them (later values replace existing ones on the same timestamp)
+        id_col: Name of ID column
+        ts_col: Name of timestamp column
+    
+    Returns:
+        Dictionary with counts of 'appended' and 'rejected' rows
+    """
+    if on_late not in ("reject", "merge"):
+        raise ValueError(f"Unknown on_late policy: {on_late}")
+    
+    cache_file = Path(cache_file)
+    watermarks = read_watermarks(cache_file)
+    
+    if watermarks is None:
+        # First increment: derive marks from the ingested data once
+        existing = pq.read_table(cache_files(cache_file), columns=[id_col, ts_col]).to_pandas()
+        latest = existing.groupby(id_col, observed=True)[ts_col].max()
+        watermarks = {str(sid): int(ts.value) for sid, ts in latest.items()}
+    
+    rows = compact_dtypes(new_rows.reset_index(drop=True))
+    rows = rows.drop_duplicates(subset=[id_col, ts_col], keep="last")
+    
+    ids = rows[id_col].astype(str)
+    marks = ids.map(watermarks).fillna(np.iinfo(np.int64).min).astype(np.int64)
+    is_late = rows[ts_col].to_numpy(dtype="datetime64[ns]").view(np.int64) <= marks.to_numpy()
+    
+    rejected = 0
+    if on_late == "reject":
+        rejected = int(is_late.sum())
+        rows = rows[~is_late]
+    
+    if len(rows) > 0:
+        write_delta(rows, cache_file)
+        
+        latest = rows.groupby(ids.loc[rows.index], observed=True)[ts_col].max()
+        for sid, ts in latest.items():
+            watermarks[sid] = max(watermarks.get(sid, ts.value), int(ts.value))
+    
+    write_watermarks(cache_file, watermarks)
+    
+    return {"appended": len(rows), "rejected": rejected}
@@ -0,0 +1,334 @@
+"""Online feature updates for streaming observations."""
+
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.features import (
+    FEATURE_FAMILIES,
+    _iter_holiday_features,
+    _promo_frame,
+    _join_weather_config,
+    family_dtypes,
+    plan_features,
+)
+from src.utils.timeindex import factorize_timestamps, iter_calendar_features, iter_fourier_features
+
+
+class _WindowState:
+    """Running sums and monotonic deques of one rolling window."""
+
+    __slots__ = ("window", "count", "total", "total_sq", "mins", "maxs")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        # (position, value) pairs with increasing / decreasing values
+        self.mins: Deque[Tuple[int, float]] = deque()
+        self.maxs: Deque[Tuple[int, float]] = deque()
+
+
+class _SeriesState:
+    """Ring buffers of recent values and window states of one series."""
+
+    __slots__ = ("buffer", "weather", "t", "offset", "windows")
+
+    def __init__(self, size: int, windows: List[int], n_weather: int = 0):
+        self.buffer = np.full(size, np.nan)
+        self.weather = np.full((size, n_weather), np.nan)
+        self.t = 0  # Number of observations seen
+        self.offset: Optional[float] = None  # Shift keeping sums well conditioned
+        self.windows = [_WindowState(window) for window in windows]
+
+
+class OnlineFeatureState:
+    """Incrementally maintained features for the latest observation per series.
+
+    Mirrors ``build_features`` for one configuration: feeding a series'
+    observations through ``update`` yields, for each new row, the same
+    feature values ``build_features`` computes for that row on the full
+    history. Lags come from a per-series ring buffer, rolling mean/std from
+    running sums and rolling min/max from monotonic deques, so each
+    observation costs O(1) amortized. Weather is as-of joined for the new
+    rows and its lags come from a second ring buffer. Calendar, Fourier,
+    holiday and promo features depend only on the timestamp and are
+    computed per batch with the batch code paths.
+
+    Example:
+        >>> state = OnlineFeatureState.from_history(history, config, id_col="series_id")
+        >>> features = state.update(new_rows)  # one feature row per new observation
+    """
+
+    # Running sums are recomputed from the buffer every this many buffer
+    # lengths to stop floating point drift
+    RESYNC_EVERY = 4
+
+    def __init__(
+        self,
+        config: Dict,
+        ts_col: str = "ds",
+        target_col: str = "y",
+        id_col: Optional[str] = None,
+    ):
+        """Initialize empty online state.
+
+        Args:
+            config: Features configuration dict
+            ts_col: Name of timestamp column
+            target_col: Name of target column
+            id_col: Name of ID column for panel data
+
+        Raises:
+            ValueError: If the config has negative lags (future values)
+        """
+        self.config = config
+        self.ts_col = ts_col
+        self.target_col = target_col
+        self.id_col = id_col
+        self.plan = plan_features(config)
+
+        self.lags: List[int] = list(config.get("lags") or [])
+        if any(lag < 0 for lag in self.lags):
+            raise ValueError("Negative lags need future values and cannot be updated online")
+
+        self.rolls: List[Dict] = list(config.get("rolls") or [])
+        self.windows: List[int] = [roll["window"] for roll in self.rolls]
+
+        self.weather_config: Optional[Dict] = config["weather"] if "weather" in self.plan else None
+        weather_config = self.weather_config or {}
+        self.weather_features: List[str] = list(weather_config.get("features", []))
+        self.weather_lags: List[int] = list(weather_config.get("lags", []))
+        if any(lag < 0 for lag in self.weather_lags):
+            raise ValueError("Negative lags need future values and cannot be updated online")
+
+        self.size = max(
+            [lag + 1 for lag in self.lags + self.weather_lags] + self.windows + [1]
+        )
+
+        self.series: Dict[object, _SeriesState] = {}
+
+    @classmethod
+    def from_history(
+        cls,
+        df: pd.DataFrame,
+        config: Dict,
+        ts_col: str = "ds",
+        target_col: str = "y",
+        id_col: Optional[str] = None,
+    ) -> "OnlineFeatureState":
+        """Create state warmed up on historical observations.
+
+        Only the last rows of each series that the lags and windows can
+        reach are replayed.
+
+        Args:
+            df: DataFrame with time series, in time order within each series
+            config: Features configuration dict
+            ts_col: Name of timestamp column
+            target_col: Name of target column
+            id_col: Name of ID column for panel data
+
+        Returns:
+            Warmed-up OnlineFeatureState
+        """
+        state = cls(config, ts_col, target_col, id_col)
+
+        groups = [(None, df)] if id_col is None else df.groupby(id_col, observed=True, sort=False)
+        for series_id, group in groups:
+            tail = group.iloc[-state.size:]
+            weather = state._join_weather(tail)
+            series = state._series(series_id)
+            series.t = len(group) - len(tail)
+            for y, weather_row in zip(tail[target_col].to_numpy(dtype=np.float64), weather):
+                state._push(series, y, weather_row)
+
+        return state
+
+    def _series(self, series_id: object) -> _SeriesState:
+        series = self.series.get(series_id)
+        if series is None:
+            series = self.series[series_id] = _SeriesState(
+                self.size, self.windows, len(self.weather_features)
+            )
+        return series
+
+    def _join_weather(self, df: pd.DataFrame) -> np.ndarray:
+        """As-of join the configured weather onto rows."""
+        if self.weather_config is None:
+            return np.empty((len(df), 0))
+        return _join_weather_config(df, self.weather_config, self.ts_col, self.id_col)
+
+    def _push(self, series: _SeriesState, y: float, weather: Optional[np.ndarray] = None) -> None:
+        """Add one observation to a series' buffers and window states."""
+        t = series.t
+        valid = not np.isnan(y)
+        if valid and series.offset is None:
+            series.offset = y
+        shift = series.offset or 0.0
+
+        for window in series.windows:
+            # Value leaving the window, read before the buffer slot is reused
+            if t - window.window >= 0:
+                old = series.buffer[(t - window.window) % self.size]
+                if not np.isnan(old):
+                    window.count -= 1
+                    window.total -= old - shift
+                    window.total_sq -= (old - shift) ** 2
+
+            if valid:
+                window.count += 1
+                window.total += y - shift
+                window.total_sq += (y - shift) ** 2
+
+                while window.mins and window.mins[-1][1] >= y:
+                    window.mins.pop()
+                window.mins.append((t, y))
+                while window.maxs and window.maxs[-1][1] <= y:
+                    window.maxs.pop()
+                window.maxs.append((t, y))
+
+            for extremes in (window.mins, window.maxs):
+                while extremes and extremes[0][0] <= t - window.window:
+                    extremes.popleft()
+
+        series.buffer[t % self.size] = y
+        if weather is not None:
+            series.weather[t % self.size] = weather
+        series.t = t + 1
+
+        if series.t % (self.size * self.RESYNC_EVERY) == 0:
+            self._resync(series)
+
+    def _resync(self, series: _SeriesState) -> None:
+        """Recompute running sums exactly from the buffer."""
+        t = series.t
+        shift = series.offset or 0.0
+        for window in series.windows:
+            positions = np.arange(max(t - window.window, 0), t) % self.size
+            values = series.buffer[positions]
+            values = values[~np.isnan(values)] - shift
+            window.count = len(values)
+            window.total = float(values.sum())
+            window.total_sq = float((values * values).sum())
+
+    def _target_features(self, series: _SeriesState) -> List[float]:
+        """Lag and rolling features of a series' latest observation."""
+        t = series.t - 1
+        row = []
+
+        for lag in self.lags:
+            row.append(series.buffer[(t - lag) % self.size] if t - lag >= 0 else np.nan)
+
+        shift = series.offset or 0.0
+        for roll, window in zip(self.rolls, series.windows):
+            cnt = window.count
+            for stat in roll.get("stats", ["mean"]):
+                if stat == "mean":
+                    row.append(window.total / cnt + shift if cnt >= 1 else np.nan)
+                elif stat == "std":
+                    if cnt >= 2:
+                        var = (window.total_sq - window.total * window.total / cnt) / (cnt - 1)
+                        row.append(np.sqrt(max(var, 0.0)))
+                    else:
+                        row.append(np.nan)
+                elif stat == "min":
+                    row.append(window.mins[0][1] if window.mins else np.nan)
+                elif stat == "max":
+                    row.append(window.maxs[0][1] if window.maxs else np.nan)
+
+        return row
+
+    def _weather_lags(self, series: _SeriesState) -> List[float]:
+        """Weather lag features of a series' latest observation."""
+        t = series.t - 1
+        row = []
+        for f in range(len(self.weather_features)):
+            for lag in self.weather_lags:
+                row.append(series.weather[(t - lag) % self.size, f] if t - lag >= 0 else np.nan)
+        return row
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Ingest new observations and return their features.
+
+        Args:
+            df: New observations, in time order within each series
+
+        Returns:
+            Input columns followed by the feature columns, as
+            ``build_features`` would produce them for these rows
+        """
+        df = df.copy(deep=False)
+        if not pd.api.types.is_datetime64_any_dtype(df[self.ts_col]):
+            df[self.ts_col] = pd.to_datetime(df[self.ts_col])
+
+        ids = [None] * len(df) if self.id_col is None else df[self.id_col].tolist()
+        values = df[self.target_col].to_numpy(dtype=np.float64)
+        weather = self._join_weather(df)
+
+        n_target = len(self.plan.get("lags", [])) + len(self.plan.get("rolls", []))
+        target_block = np.empty((len(df), n_target))
+        weather_lags = np.empty((len(df), len(self.weather_features) * len(self.weather_lags)))
+        for i, (series_id, y) in enumerate(zip(ids, values)):
+            series = self._series(series_id)
+            self._push(series, y, weather[i])
+            target_block[i] = self._target_features(series)
+            weather_lags[i] = self._weather_lags(series)
+
+        uniques, codes = factorize_timestamps(df[self.ts_col])
+        columns = {}
+
+        def add(iterator: Iterator[Tuple[str, np.ndarray]]) -> None:
+            for name, values in iterator:
+                columns[name] = values
+
+        add(iter_calendar_features(uniques, codes))
+
+        if "fourier" in self.plan:
+            fourier_config = self.config["fourier"]
+            add(iter_fourier_features(
+                uniques,
+                fourier_config.get("periods", [7, 365.25]),
+                fourier_config.get("k", 5),
+                codes,
+            ))
+
+        for j, name in enumerate(self.plan.get("lags", []) + self.plan.get("rolls", [])):
+            columns[name] = target_block[:, j]
+
+        if "holidays" in self.plan:
+            holiday_config = self.config["holidays"]
+            add(_iter_holiday_features(
+                uniques,
+                holiday_config.get("countries", ["US"]),
+                holiday_config.get("lookback", 0),
+                holiday_config.get("lookahead", 0),
+                holiday_config.get("distance", False),
+                codes,
+            ))
+
+        if "promos" in self.plan:
+            promos = _promo_frame(df, self.config["promos"], self.ts_col)
+            for name in promos.columns:
+                values = promos[name]
+                sparse = isinstance(values.dtype, pd.SparseDtype)
+                columns[name] = values.array if sparse else values.to_numpy()
+
+        if "weather" in self.plan:
+            n_features = len(self.weather_features)
+            for j, name in enumerate(self.plan["weather"]):
+                columns[name] = weather[:, j] if j < n_features else weather_lags[:, j - n_features]
+
+        # Same column order and block dtypes as build_features
+        dtypes = family_dtypes(self.config)
+        features = pd.DataFrame({
+            name: columns[name] if isinstance(columns[name], pd.arrays.SparseArray)
+            else columns[name].astype(dtypes[family], copy=False)
+            for family, _ in FEATURE_FAMILIES
+            for name in self.plan.get(family, [])
+        }, index=df.index)
+
+        return pd.concat([df, features], axis=1)
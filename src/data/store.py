@@ -0,0 +1,195 @@
+"""Memory-mapped columnar store shared across processes."""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+OFFSETS_FILE = "offsets.npy"
+META_FILE = "meta.json"
+
+# Written to the metadata so other directories are rejected on open
+STORE_KIND = "frame"
+
+
+class FrameStore:
+    """Memory-mapped columnar copy of a DataFrame for sharing across processes.
+
+    Each column is saved as its own ``.npy`` file and opened with
+    ``np.load(mmap_mode="r")``: numeric and boolean columns as is,
+    datetimes as int64 nanoseconds and categorical/object columns as
+    integer codes with their categories in the metadata. A pickled store
+    only carries its path, so worker processes read rows through the page
+    cache instead of receiving pickled frames.
+
+    When built with an ID column, rows are grouped by series and an
+    ``offsets`` array of length ``n_series + 1`` marks where each series
+    starts and ends, so a series is one contiguous slice of every column.
+    """
+
+    def __init__(self, path: str):
+        """Open an existing store.
+
+        Args:
+            path: Store directory written by ``FrameStore.build``
+
+        Raises:
+            ValueError: If the directory does not hold a frame store
+        """
+        self.path = Path(path)
+
+        with open(self.path / META_FILE, "r") as f:
+            meta = json.load(f)
+        if meta.get("kind") != STORE_KIND:
+            raise ValueError(f"{self.path} is not a frame store (kind: {meta.get('kind')})")
+
+        self.columns: List[str] = meta["columns"]
+        self.kinds: Dict[str, str] = meta["kinds"]
+        self.categories: Dict[str, list] = meta["categories"]
+        self.n_rows: int = meta["n_rows"]
+        self.id_col: Optional[str] = meta["id_col"]
+        self._arrays = {
+            col: np.load(self.path / f"{i}.npy", mmap_mode="r")
+            for i, col in enumerate(self.columns)
+        }
+        self.offsets = np.load(self.path / OFFSETS_FILE)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, path: str, id_col: Optional[str] = None) -> "FrameStore":
+        """Write a DataFrame to a store and open it.
+
+        The index is not stored; rows are addressed by position.
+
+        Args:
+            df: DataFrame with unique string column names
+            path: Output store directory
+            id_col: ID column to index series by; its rows must be grouped
+                by series in sorted ID order, rows with a missing ID last
+                (if None, all rows form one series)
+
+        Returns:
+            Opened FrameStore
+
+        Raises:
+            ValueError: If ``id_col`` is missing or its rows are not grouped
+        """
+        if id_col is not None and id_col not in df.columns:
+            raise ValueError(f"ID column {id_col} not in frame")
+
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+
+        kinds = {}
+        categories = {}
+        for i, col in enumerate(df.columns):
+            values = df[col]
+            dtype = values.dtype
+
+            if isinstance(dtype, pd.SparseDtype):
+                values = values.sparse.to_dense()
+                dtype = values.dtype
+
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                kinds[col] = "datetime"
+                array = values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            elif isinstance(dtype, pd.CategoricalDtype) or dtype == object or col == id_col:
+                kinds[col] = "category"
+                codes, uniques = pd.factorize(values, sort=True)
+                categories[col] = [str(u) for u in uniques]
+                array = codes.astype(np.int32)
+            else:
+                kinds[col] = "numeric"
+                array = values.to_numpy()
+
+            np.save(out / f"{i}.npy", array)
+
+            if col == id_col:
+                counts = np.bincount(array[array >= 0], minlength=len(categories[col]))
+                grouped = np.repeat(np.arange(len(counts), dtype=array.dtype), counts)
+                if not np.array_equal(array[:len(grouped)], grouped):
+                    raise ValueError(f"Rows must be grouped by {id_col} to index series")
+
+        if id_col is None:
+            offsets = np.array([0, len(df)], dtype=np.int64)
+        else:
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        np.save(out / OFFSETS_FILE, offsets)
+
+        with open(out / META_FILE, "w") as f:
+            json.dump({
+                "kind": STORE_KIND,
+                "columns": [str(col) for col in df.columns],
+                "kinds": kinds,
+                "categories": categories,
+                "n_rows": len(df),
+                "id_col": id_col,
+            }, f)
+
+        return cls(str(out))
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getstate__(self) -> dict:
+        # Workers reopen the memory maps instead of receiving copies
+        return {"path": str(self.path)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+    def bounds(self, code: int) -> Tuple[int, int]:
+        """Get the [start, end) row positions of one series.
+
+        Args:
+            code: Series code, the position of its ID in
+                ``categories[id_col]`` (0 without an ID column)
+
+        Returns:
+            Tuple of (start, end) positions
+        """
+        return int(self.offsets[code]), int(self.offsets[code + 1])
+
+    def values(self, column: str) -> np.ndarray:
+        """Get the zero-copy stored array of a column.
+
+        Args:
+            column: Column name
+
+        Returns:
+            Memory-mapped array: codes into ``categories[column]`` (-1 for
+            missing) for categorical columns, int64 nanoseconds for
+            datetimes, the values otherwise
+        """
+        return self._arrays[column]
+
+    def take(
+        self,
+        rows: Optional[np.ndarray] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Materialize rows and columns as a DataFrame.
+
+        Args:
+            rows: Positional row indices (if None, all rows)
+            columns: Columns to include (if None, all columns)
+
+        Returns:
+            DataFrame with a RangeIndex; categorical columns come back as
+            ``category`` dtype and datetimes as ``datetime64[ns]``
+        """
+        data = {}
+        for col in columns or self.columns:
+            array = self._arrays[col]
+            array = np.asarray(array) if rows is None else array[rows]
+
+            kind = self.kinds[col]
+            if kind == "datetime":
+                data[col] = array.view("datetime64[ns]")
+            elif kind == "category":
+                data[col] = pd.Categorical.from_codes(array, categories=self.categories[col])
+            else:
+                data[col] = array
+
+        return pd.DataFrame(data)
@@ -43,6 +43,9 @@ def generate_anomaly_report(
     anomalies: pd.DataFrame,
     output_path: str,
     top_k: int = 20,
+    stats: Optional[Dict] = None,
+    id_col: Optional[str] = None,
+    ts_col: str = "ds",
 ) -> None:
     """Generate anomaly detection report.
     
@@ -50,23 +53,37 @@ def generate_anomaly_report(
         anomalies: DataFrame with anomaly flags and scores
         output_path: Path to save report
         top_k: Number of top anomalies to report
+        stats: Totals of a chunked run (rows, anomalies, mean_score and
+            max_score); if given, ``anomalies`` only needs the top rows
+        id_col: Name of ID column to list with the top anomalies (if None,
+            no ID column is listed)
+        ts_col: Name of timestamp column
     """
     output = Path(output_path)
     output.parent.mkdir(parents=True, exist_ok=True)
     
+    if stats is None:
+        stats = {
+            "rows": len(anomalies),
+            "anomalies": anomalies["is_anomaly"].sum(),
+            "mean_score": anomalies["anomaly_score"].mean(),
+            "max_score": anomalies["anomaly_score"].max(),
+        }
+    
     with open(output, "w") as f:
         f.write("# Anomaly Detection Report\n\n")
         f.write(f"Generated: {pd.Timestamp.now()}\n\n")
         
-        total_anomalies = anomalies["is_anomaly"].sum()
+        total_anomalies = stats["anomalies"]
         f.write(f"**Total Anomalies Detected**: {total_anomalies}\n\n")
         
         f.write(f"## Top {top_k} Anomalies\n\n")
         
         top_anomalies = anomalies.nlargest(top_k, "anomaly_score")
-        f.write(top_anomalies[["ds", "y", "yhat", "anomaly_score"]].to_markdown(index=False))
+        columns = ([id_col] if id_col else []) + [ts_col, "y", "yhat", "anomaly_score"]
+        f.write(top_anomalies[columns].to_markdown(index=False))
         
         f.write("\n\n## Statistics\n\n")
-        f.write(f"- Mean anomaly score: {anomalies['anomaly_score'].mean():.3f}\n")
-        f.write(f"- Max anomaly score: {anomalies['anomaly_score'].max():.3f}\n")
-        f.write(f"- Anomaly rate: {total_anomalies / len(anomalies) * 100:.2f}%\n")
+        f.write(f"- Mean anomaly score: {stats['mean_score']:.3f}\n")
+        f.write(f"- Max anomaly score: {stats['max_score']:.3f}\n")
+        f.write(f"- Anomaly rate: {total_anomalies / stats['rows'] * 100:.2f}%\n")
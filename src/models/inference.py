@@ -0,0 +1,468 @@
+"""Batch inference: forecast every series from its latest observation."""
+
+import math
+import shutil
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed, effective_n_jobs
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+from src.cv.backtest import GLOBAL, MODELS, TRAINERS
+from src.cv.features import FoldFeatures
+from src.data.feature_store import FeatureStore
+from src.data.features import build_features
+from src.utils.resources import peak_rss_mb
+
+
+def series_reach(features_config: Dict) -> int:
+    """Get how many trailing rows per series the origin features need.
+
+    Args:
+        features_config: Features configuration dict
+
+    Returns:
+        Number of most recent rows of each series that determine the lag,
+        rolling and weather lag features of its forecast rows
+    """
+    weather = features_config.get("weather") or {}
+    lags = list(features_config.get("lags") or []) + list(weather.get("lags") or [])
+    windows = [roll["window"] for roll in features_config.get("rolls") or []]
+    return max([lag for lag in lags if lag > 0] + windows + [1])
+
+
+def future_frame(
+    df: pd.DataFrame,
+    horizon: int,
+    freq: str,
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """Create the rows to forecast after each series' last observation.
+
+    Other columns (e.g. hierarchy levels) are carried over from each
+    series' last row.
+
+    Args:
+        df: DataFrame with time series, in time order within each series
+        horizon: Number of steps to forecast
+        freq: Pandas frequency string
+        ts_col: Name of timestamp column
+        target_col: Name of target column (set to NaN)
+        id_col: Name of ID column for panel data
+
+    Returns:
+        DataFrame with ``horizon`` rows per series, series in order of
+        appearance
+    """
+    last = df.groupby(id_col, observed=True, sort=False).tail(1) if id_col else df.tail(1)
+    future = last.loc[last.index.repeat(horizon)].reset_index(drop=True)
+
+    steps = np.tile(np.arange(1, horizon + 1), len(last))
+    origin = pd.DatetimeIndex(future[ts_col])
+    offset = to_offset(freq)
+
+    if isinstance(offset, Tick):
+        future[ts_col] = origin + pd.to_timedelta(steps * offset.nanos, unit="ns")
+    else:
+        # Calendar offsets (e.g. month ends) are applied one step count at a time
+        ds = origin.to_numpy().copy()
+        for h in range(1, horizon + 1):
+            at = steps == h
+            ds[at] = (origin[at] + h * offset).to_numpy()
+        future[ts_col] = ds
+
+    future[target_col] = np.nan
+
+    return future
+
+
+def origin_features(
+    history: pd.DataFrame,
+    features_config: Dict,
+    horizon: int,
+    freq: str,
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """Build the features of the forecast rows from the latest observations.
+
+    Only the last ``series_reach`` rows of each series are used, and the
+    forecast rows get the same causal features as backtest test rows
+    (``FoldFeatures``): lags reaching past the origin are NaN and rolling
+    statistics are frozen at the origin.
+
+    Args:
+        history: DataFrame with time series, in time order within each series
+        features_config: Features configuration dict
+        horizon: Number of steps to forecast
+        freq: Pandas frequency string
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+
+    Returns:
+        Feature rows of the forecast horizon, ``horizon`` per series
+    """
+    reach = series_reach(features_config)
+    if id_col:
+        tail = history.groupby(id_col, observed=True, sort=False).tail(reach)
+    else:
+        tail = history.tail(reach)
+
+    future = future_frame(tail, horizon, freq, ts_col, target_col, id_col)
+    frame = pd.concat([tail, future], ignore_index=True)
+    is_future = np.r_[np.zeros(len(tail), dtype=bool), np.ones(len(future), dtype=bool)]
+
+    if id_col:
+        order = np.lexsort((frame[ts_col].to_numpy(), pd.factorize(frame[id_col])[0]))
+    else:
+        order = np.argsort(frame[ts_col].to_numpy(), kind="stable")
+    frame = frame.iloc[order].reset_index(drop=True)
+    is_future = is_future[order]
+
+    fold_features = FoldFeatures(frame, features_config, ts_col, target_col, id_col)
+    return fold_features.test_features(np.flatnonzero(~is_future), np.flatnonzero(is_future))
+
+
+def fit_global_model(
+    df: pd.DataFrame,
+    name: str,
+    config: Dict,
+    features_config: Dict,
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+    n_jobs: int = 1,
+    feature_store: Optional[FeatureStore] = None,
+    fingerprint: Optional[str] = None,
+) -> Any:
+    """Fit a global model on the full history for batch forecasting.
+
+    Args:
+        df: DataFrame with time series
+        name: Model name in ``TRAINERS``
+        config: Model config
+        features_config: Features configuration dict
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+        n_jobs: Cores for feature building and training (-1 for all cores)
+        feature_store: Store to reuse the feature matrix from (if None,
+            features are always built)
+        fingerprint: Data fingerprint of ``df`` for ``feature_store``; if
+            None, the store hashes the panel
+
+    Returns:
+        Fitted model with a ``predict(X)`` method
+
+    Raises:
+        ValueError: If the model cannot be trained ahead of forecasting
+    """
+    if name not in TRAINERS:
+        raise ValueError(f"Model {name} cannot be pre-trained. Available: {list(TRAINERS)}")
+
+    if feature_store is not None:
+        features = feature_store.build_features(
+            df, features_config, ts_col, target_col, id_col, fingerprint=fingerprint
+        )
+    else:
+        features = build_features(df, features_config, ts_col, target_col, id_col, n_jobs=n_jobs)
+    labeled = features[target_col].notna().to_numpy()
+    feature_cols = [c for c in features.columns if c not in (ts_col, target_col)]
+
+    return TRAINERS[name](
+        config,
+        features.loc[labeled, feature_cols],
+        features.loc[labeled, target_col].to_numpy(dtype=np.float64),
+        effective_n_jobs(n_jobs),
+    )
+
+
+def save_model(model: Any, path: str) -> None:
+    """Save a fitted model atomically.
+
+    Args:
+        model: Fitted model
+        path: Output file path
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    joblib.dump(model, tmp_path)
+    tmp_path.replace(path)
+
+
+def load_model(path: str) -> Any:
+    """Load a model saved with ``save_model``.
+
+    Args:
+        path: Model file path
+
+    Returns:
+        Fitted model
+    """
+    return _load_model(str(path), Path(path).stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=4)
+def _load_model(path: str, mtime_ns: int) -> Any:
+    # Workers forecast many chunks with the same model; load it once per
+    # process and version of the file
+    return joblib.load(path)
+
+
+class ForecastWriter:
+    """Streaming writer for forecast chunks.
+
+    The output format follows the path: ``.csv`` appends to one CSV file,
+    ``.parquet`` appends one row group per chunk to one Parquet file, and
+    any other path is written as a directory of Parquet parts, one per
+    chunk. Output goes to a temporary name and is moved into place on
+    ``close``, so readers never see a partial forecast.
+    """
+
+    def __init__(self, path: str):
+        """Initialize forecast writer.
+
+        Args:
+            path: Output file or directory path
+        """
+        self.path = Path(path)
+        suffix = self.path.suffix.lower()
+        self.format = {".csv": "csv", ".parquet": "parquet"}.get(suffix, "partitioned")
+        self.tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        self.n_parts = 0
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append a chunk of forecasts.
+
+        Args:
+            df: Forecast rows with the same columns and dtypes as earlier chunks
+        """
+        if self.n_parts == 0:
+            self.tmp_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.format == "csv":
+            mode = "a" if self.n_parts else "w"
+            df.to_csv(self.tmp_path, mode=mode, header=not self.n_parts, index=False)
+        elif self.format == "parquet":
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            self.tmp_path.mkdir(exist_ok=True)
+            pq.write_table(
+                pa.Table.from_pandas(df, preserve_index=False),
+                self.tmp_path / f"part-{self.n_parts:05d}.parquet",
+            )
+
+        self.n_parts += 1
+
+    def close(self) -> None:
+        """Finalize the output."""
+        if self.n_parts == 0:
+            raise ValueError("No forecasts written")
+
+        if self._writer is not None:
+            self._writer.close()
+
+        if self.format == "partitioned" and self.path.exists():
+            shutil.rmtree(self.path)
+        self.tmp_path.replace(self.path)
+
+    def abort(self) -> None:
+        """Discard partially written output."""
+        if self._writer is not None:
+            self._writer.close()
+        if self.tmp_path.is_dir():
+            shutil.rmtree(self.tmp_path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ForecastWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _forecast_chunk(
+    history: pd.DataFrame,
+    kind: str,
+    fit: Callable,
+    config: Dict,
+    model_path: Optional[str],
+    features_config: Dict,
+    horizon: int,
+    freq: str,
+    ts_col: str,
+    target_col: str,
+    id_col: Optional[str],
+) -> Tuple[pd.DataFrame, float]:
+    """Forecast one chunk of series.
+
+    Returns:
+        Tuple of (forecast rows, peak RSS of the worker in MB)
+    """
+    id_cols = [id_col] if id_col else []
+
+    if kind == GLOBAL:
+        features = origin_features(
+            history, features_config, horizon, freq, ts_col, target_col, id_col
+        )
+        model = load_model(model_path)
+        feature_cols = getattr(model, "feature_cols", None) or [
+            c for c in features.columns if c not in (ts_col, target_col)
+        ]
+        forecast = features[id_cols + [ts_col]].reset_index(drop=True)
+        forecast["yhat"] = np.asarray(model.predict(features[feature_cols]), dtype=np.float64)
+    else:
+        future = future_frame(history, horizon, freq, ts_col, target_col, id_col)
+        forecast = future[id_cols + [ts_col]].copy()
+        yhat = np.full(len(forecast), np.nan)
+
+        groups = history.groupby(id_col, observed=True, sort=False) if id_col else [(None, history)]
+        for i, (_, group) in enumerate(groups):
+            y = group[target_col].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(y)
+            if valid.any():
+                ds = group[ts_col].to_numpy()[valid]
+                yhat[i * horizon:(i + 1) * horizon] = fit(config, ds, y[valid], horizon, freq)
+        forecast["yhat"] = yhat
+
+    if id_col:
+        forecast[id_col] = forecast[id_col].astype(str)
+
+    return forecast, peak_rss_mb()
+
+
+def batch_forecast(
+    df: pd.DataFrame,
+    name: str,
+    config: Dict,
+    features_config: Dict,
+    horizon: int,
+    freq: str,
+    writer: ForecastWriter,
+    model_path: Optional[str] = None,
+    ts_col: str = "ds",
+    target_col: str = "y",
+    id_col: Optional[str] = None,
+    n_jobs: int = 1,
+    chunk_size: int = 1000,
+    time_budget: Optional[float] = None,
+    registry: Optional[Dict[str, Tuple[str, Callable, Optional[int]]]] = None,
+) -> Dict[str, float]:
+    """Forecast every series in parallel chunks and stream the results.
+
+    Series are split into chunks of ``chunk_size`` and forecast in a
+    joblib process pool. Chunks are dispatched lazily and each finished
+    chunk is written right away, so memory holds only the chunks in
+    flight, never the full forecast. Local models are fit per series on
+    its history; global models are loaded from ``model_path`` and only
+    receive the last ``series_reach`` rows of each series.
+
+    Args:
+        df: DataFrame with time series
+        name: Model name
+        config: Model config (used by local models)
+        features_config: Features configuration dict (used by global models)
+        horizon: Number of steps to forecast
+        freq: Pandas frequency string
+        writer: Writer the forecast chunks are streamed to
+        model_path: Fitted global model saved with ``save_model``
+        ts_col: Name of timestamp column
+        target_col: Name of target column
+        id_col: Name of ID column for panel data
+        n_jobs: Number of worker processes (-1 for all cores)
+        chunk_size: Number of series per chunk
+        time_budget: Wall-clock budget in seconds. Once every worker has
+            finished a chunk, the run stops as soon as the projected total
+            time exceeds the budget.
+        registry: Model name -> (kind, fit function, threads) (if None,
+            the backtest ``MODELS``)
+
+    Returns:
+        Run statistics: rows, series, chunks, seconds, rows_per_sec and
+        peak_rss_mb (the largest of the main process and the workers)
+
+    Raises:
+        ValueError: If the model is unknown or a global model has no model_path
+        TimeoutError: If the projected run time exceeds ``time_budget``
+    """
+    start = time.perf_counter()
+
+    registry = registry or MODELS
+    if name not in registry:
+        raise ValueError(f"Unknown model: {name}. Available: {list(registry)}")
+    kind, fit, _ = registry[name]
+    if kind == GLOBAL and model_path is None:
+        raise ValueError(f"Global model {name} needs a fitted model_path")
+
+    df = df.sort_values([id_col, ts_col] if id_col else ts_col, kind="stable")
+    df = df.reset_index(drop=True)
+    codes = pd.factorize(df[id_col])[0] if id_col else np.zeros(len(df), dtype=np.int64)
+
+    if kind == GLOBAL:
+        # Global models only need each series' most recent rows
+        pos = df.groupby(codes, sort=False).cumcount(ascending=False).to_numpy()
+        keep = pos < series_reach(features_config)
+        df = df[keep].reset_index(drop=True)
+        codes = codes[keep]
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(df) else np.array([], int)
+    bounds = np.r_[starts, len(df)]
+    n_series = len(starts)
+    n_chunks = math.ceil(n_series / chunk_size)
+    n_workers = min(effective_n_jobs(n_jobs), max(n_chunks, 1))
+
+    def chunks():
+        for i in range(0, n_series, chunk_size):
+            history = df.iloc[bounds[i]:bounds[min(i + chunk_size, n_series)]]
+            yield delayed(_forecast_chunk)(
+                history, kind, fit, config, model_path, features_config,
+                horizon, freq, ts_col, target_col, id_col,
+            )
+
+    rows = 0
+    worker_peak = 0.0
+    outputs = Parallel(n_jobs=n_workers, return_as="generator")(chunks())
+    for done, (forecast, peak) in enumerate(outputs, 1):
+        writer.write(forecast)
+        rows += len(forecast)
+        worker_peak = max(worker_peak, peak)
+
+        if time_budget is not None and n_workers <= done < n_chunks:
+            projected = (time.perf_counter() - start) * n_chunks / done
+            if projected > time_budget:
+                raise TimeoutError(
+                    f"Projected run time {projected:.0f}s exceeds the time budget of "
+                    f"{time_budget:.0f}s after {done}/{n_chunks} chunks"
+                )
+
+    seconds = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "series": n_series,
+        "chunks": n_chunks,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else float("inf"),
+        "peak_rss_mb": max(peak_rss_mb(), worker_peak),
+    }
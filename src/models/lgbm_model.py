@@ -29,6 +29,10 @@ class LightGBMForecaster:
     ):
         """Fit LightGBM model.
         
+        ``X`` is handed to LightGBM as is, so a compact feature matrix
+        (``compact: true`` in the features config) is binned from its
+        float32/int8/int16 columns without a float64 copy.
+        
         Args:
             X: Training features
             y: Training target
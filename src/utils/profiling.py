@@ -0,0 +1,146 @@
+"""Per-stage wall time, CPU time and memory profiling."""
+
+import cProfile
+import json
+import pstats
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from src.utils.resources import peak_rss_mb
+
+# Functions listed in the text summary of each cProfile dump
+TOP_FUNCTIONS = 30
+
+
+class StageProfiler:
+    """Record wall time, CPU time and peak RSS of named pipeline stages.
+
+    Stages are timed in the calling process and should not be nested.
+    CPU time and peak RSS are those of the calling process only; work done
+    in worker processes shows up as wall time. Peak RSS is a high-water
+    mark, so ``rss_growth_mb`` (how much a stage raised it) is the column
+    to read for a stage's own footprint.
+
+    A disabled profiler records nothing, so pipelines can wrap their stages
+    unconditionally.
+
+    Example:
+        >>> profiler = StageProfiler(cprofile_dir="artifacts/reports/profiles")
+        >>> with profiler.stage("load"):
+        ...     df = load_dataset(config_path, config)
+        >>> print(profiler.summary())
+    """
+
+    def __init__(self, enabled: bool = True, cprofile_dir: Optional[str] = None):
+        """Initialize profiler.
+
+        Args:
+            enabled: Whether to record stages
+            cprofile_dir: Directory to write a cProfile dump (``.prof``) and
+                its pstats text summary (``.txt``) per stage to (if None,
+                stages are only timed)
+        """
+        self.enabled = enabled
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+        self.records: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time one stage.
+
+        Args:
+            name: Stage name
+
+        Yields:
+            None; the stage is recorded when the block exits, even on error
+        """
+        if not self.enabled:
+            yield
+            return
+
+        profile = cProfile.Profile() if self.cprofile_dir is not None else None
+        rss_before = peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile is not None:
+            profile.enable()
+
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            record = {
+                "stage": name,
+                "wall_s": time.perf_counter() - wall_start,
+                "cpu_s": time.process_time() - cpu_start,
+                "peak_rss_mb": peak_rss_mb(),
+            }
+            record["rss_growth_mb"] = record["peak_rss_mb"] - rss_before
+            if profile is not None:
+                record["cprofile"] = self._dump(profile, name)
+            self.records.append(record)
+
+    def _dump(self, profile: cProfile.Profile, name: str) -> str:
+        self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", name)
+        path = self.cprofile_dir / f"{len(self.records):02d}_{slug}.prof"
+        profile.dump_stats(str(path))
+
+        with open(path.with_suffix(".txt"), "w") as f:
+            stats = pstats.Stats(profile, stream=f)
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+        return str(path)
+
+    def summary(self) -> pd.DataFrame:
+        """Get the recorded stages.
+
+        Returns:
+            DataFrame with one row per stage in run order, plus a total row
+            (peak RSS of the total is the overall high-water mark)
+        """
+        columns = ["stage", "wall_s", "cpu_s", "peak_rss_mb", "rss_growth_mb"]
+        table = pd.DataFrame(self.records, columns=columns)
+        if table.empty:
+            return table
+
+        total = {
+            "stage": "total",
+            "wall_s": table["wall_s"].sum(),
+            "cpu_s": table["cpu_s"].sum(),
+            "peak_rss_mb": table["peak_rss_mb"].max(),
+            "rss_growth_mb": table["rss_growth_mb"].sum(),
+        }
+        table = pd.concat([table, pd.DataFrame([total])], ignore_index=True)
+        table["wall_pct"] = 100 * table["wall_s"] / max(total["wall_s"], 1e-12)
+        return table
+
+    def write(self, output_dir: str, name: str) -> List[str]:
+        """Write the summary table and a JSON report.
+
+        Args:
+            output_dir: Output directory
+            name: File name prefix (e.g. ``backtest_retail_m5``)
+
+        Returns:
+            Paths of the written table (``<name>_profile.txt``) and JSON
+            report (``<name>_profile.json``)
+        """
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+
+        table_path = output / f"{name}_profile.txt"
+        table = self.summary().to_string(index=False, float_format="{:.3f}".format)
+        table_path.write_text(table + "\n")
+
+        json_path = output / f"{name}_profile.json"
+        with open(json_path, "w") as f:
+            json.dump({"name": name, "stages": self.records}, f, indent=2)
+
+        return [str(table_path), str(json_path)]
@@ -0,0 +1,15 @@
+"""Process resource usage helpers."""
+
+import resource
+import sys
+
+
+def peak_rss_mb() -> float:
+    """Get the peak resident memory of the current process.
+    
+    Returns:
+        Peak RSS in megabytes
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
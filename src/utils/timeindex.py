@@ -1,7 +1,7 @@
 """Time index utilities for handling time series data."""
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -99,6 +99,90 @@ def fill_time_gaps(
     return df
 
 
+CALENDAR_FEATURES = [
+    "dayofweek",
+    "dayofmonth",
+    "dayofyear",
+    "week",
+    "month",
+    "quarter",
+    "year",
+    "is_weekend",
+    "is_month_start",
+    "is_month_end",
+    "is_quarter_start",
+    "is_quarter_end",
+]
+
+
+# Fourier terms are anchored here so a given timestamp always gets the same
+# values, whatever the data window
+FOURIER_EPOCH = pd.Timestamp("1970-01-01")
+
+
+def factorize_timestamps(ds: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """Split timestamps into distinct values and integer codes.
+    
+    Time-only features can then be computed once per distinct timestamp
+    and broadcast back to rows with ``values[codes]``.
+    
+    Args:
+        ds: Series of timestamps
+    
+    Returns:
+        Tuple of (distinct timestamps, codes such that ``uniques[codes] == ds``)
+    
+    Raises:
+        ValueError: If any timestamp is missing (NaT would get code -1 and
+            silently take the last distinct timestamp's values)
+    """
+    codes, uniques = pd.factorize(pd.to_datetime(ds))
+    missing = int((codes == -1).sum())
+    if missing:
+        raise ValueError(f"{missing} timestamps are missing (NaT); drop or fill them first")
+    return pd.Series(uniques), codes
+
+
+def iter_calendar_features(
+    ds: pd.Series,
+    codes: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[str, np.ndarray]]:
+    """Yield calendar features one column at a time.
+    
+    Lets callers write each column straight into a preallocated block
+    instead of building an intermediate DataFrame.
+    
+    Args:
+        ds: Series of timestamps
+        codes: If given, ``ds`` holds distinct timestamps (see
+            ``factorize_timestamps``) and each column is broadcast to rows
+            with ``values[codes]``
+    
+    Yields:
+        Tuples of (feature name, values), in ``CALENDAR_FEATURES`` order
+    """
+    ds = pd.to_datetime(ds)
+    dt = ds.dt
+    
+    def expand(values: np.ndarray) -> np.ndarray:
+        return values if codes is None else values[codes]
+    
+    dayofweek = dt.dayofweek.to_numpy()
+    
+    yield "dayofweek", expand(dayofweek)
+    yield "dayofmonth", expand(dt.day.to_numpy())
+    yield "dayofyear", expand(dt.dayofyear.to_numpy())
+    yield "week", expand(dt.isocalendar().week.to_numpy(dtype=np.int64))
+    yield "month", expand(dt.month.to_numpy())
+    yield "quarter", expand(dt.quarter.to_numpy())
+    yield "year", expand(dt.year.to_numpy())
+    yield "is_weekend", expand((dayofweek >= 5).astype(int))
+    yield "is_month_start", expand(dt.is_month_start.to_numpy().astype(int))
+    yield "is_month_end", expand(dt.is_month_end.to_numpy().astype(int))
+    yield "is_quarter_start", expand(dt.is_quarter_start.to_numpy().astype(int))
+    yield "is_quarter_end", expand(dt.is_quarter_end.to_numpy().astype(int))
+
+
 def get_calendar_features(ds: pd.Series) -> pd.DataFrame:
     """Extract calendar features from datetime series.
     
@@ -109,25 +193,64 @@ def get_calendar_features(ds: pd.Series) -> pd.DataFrame:
         DataFrame with calendar features
     """
     ds = pd.to_datetime(ds)
+    uniques, codes = factorize_timestamps(ds)
     
-    features = pd.DataFrame({
-        "dayofweek": ds.dt.dayofweek,
-        "dayofmonth": ds.dt.day,
-        "dayofyear": ds.dt.dayofyear,
-        "week": ds.dt.isocalendar().week,
-        "month": ds.dt.month,
-        "quarter": ds.dt.quarter,
-        "year": ds.dt.year,
-        "is_weekend": ds.dt.dayofweek.isin([5, 6]).astype(int),
-        "is_month_start": ds.dt.is_month_start.astype(int),
-        "is_month_end": ds.dt.is_month_end.astype(int),
-        "is_quarter_start": ds.dt.is_quarter_start.astype(int),
-        "is_quarter_end": ds.dt.is_quarter_end.astype(int),
-    })
+    features = pd.DataFrame(dict(iter_calendar_features(uniques, codes)), index=ds.index)
     
     return features
 
 
+def fourier_feature_names(periods: List[float], k: int = 5) -> List[str]:
+    """Get Fourier feature names in the order they are created.
+    
+    Args:
+        periods: List of seasonal periods (in days)
+        k: Number of Fourier terms
+    
+    Returns:
+        List of column names
+    """
+    names = []
+    for period in periods:
+        for i in range(1, k + 1):
+            names.append(f"fourier_sin_{period}_{i}")
+            names.append(f"fourier_cos_{period}_{i}")
+    return names
+
+
+def iter_fourier_features(
+    ds: pd.Series,
+    periods: List[float],
+    k: int = 5,
+    codes: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[str, np.ndarray]]:
+    """Yield Fourier features one column at a time.
+    
+    Args:
+        ds: Series of timestamps
+        periods: List of seasonal periods (in days)
+        k: Number of Fourier terms
+        codes: If given, ``ds`` holds distinct timestamps and each column is
+            broadcast to rows with ``values[codes]``
+    
+    Yields:
+        Tuples of (feature name, values), in ``fourier_feature_names`` order
+    """
+    ds = pd.to_datetime(ds)
+    # Days since FOURIER_EPOCH (tz-aware timestamps are taken in UTC)
+    ns = ds.to_numpy(dtype="datetime64[ns]").view(np.int64) - FOURIER_EPOCH.value
+    t = ns / (86400 * 10**9)
+    
+    for period in periods:
+        for i in range(1, k + 1):
+            angle = 2 * np.pi * i * t / period
+            sin, cos = np.sin(angle), np.cos(angle)
+            if codes is not None:
+                sin, cos = sin[codes], cos[codes]
+            yield f"fourier_sin_{period}_{i}", sin
+            yield f"fourier_cos_{period}_{i}", cos
+
+
 def create_fourier_features(
     ds: pd.Series,
     periods: List[float],
@@ -144,13 +267,8 @@ def create_fourier_features(
         DataFrame with Fourier features
     """
     ds = pd.to_datetime(ds)
-    # Convert to days since epoch
-    t = (ds - ds.min()).dt.total_seconds() / 86400
+    uniques, codes = factorize_timestamps(ds)
     
-    features = {}
-    for period in periods:
-        for i in range(1, k + 1):
-            features[f"fourier_sin_{period}_{i}"] = np.sin(2 * np.pi * i * t / period)
-            features[f"fourier_cos_{period}_{i}"] = np.cos(2 * np.pi * i * t / period)
+    features = dict(iter_fourier_features(uniques, periods, k, codes))
     
-    return pd.DataFrame(features)
+    return pd.DataFrame(features, index=ds.index)
@@ -4,6 +4,18 @@ import pytest
 import pandas as pd
 import numpy as np
 
+from src.cv.backtest import GLOBAL, LOCAL
+
+
+def last_value(config, ds, y, horizon, freq):
+    """Local test model repeating the last observation."""
+    return np.full(horizon, y[-1])
+
+
+def mean_lag(config, X_train, y_train, X_test, threads):
+    """Global test model predicting the weekly lag."""
+    return X_test["lag_7"].fillna(y_train.mean()).to_numpy()
+
 
 @pytest.fixture
 def sample_timeseries():
@@ -37,3 +49,29 @@ def sample_config():
             "min_train_points": 30,
         },
     }
+
+
+@pytest.fixture
+def registry():
+    """Create a backtest registry of a local and a global test model."""
+    return {"last": (LOCAL, last_value, 1), "lag": (GLOBAL, mean_lag, None)}
+
+
+@pytest.fixture
+def make_panel():
+    """Create a factory of daily panels of random series s0, s1, ..."""
+    def make(n_series=3, periods=40):
+        dates = pd.date_range("2024-01-01", periods=periods, freq="D")
+        rng = np.random.default_rng(0)
+        return pd.concat([
+            pd.DataFrame({"series_id": f"s{i}", "ds": dates, "y": rng.normal(size=periods)})
+            for i in range(n_series)
+        ], ignore_index=True)
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def isolated_artifacts(tmp_path, monkeypatch):
+    """Keep on-disk caches (e.g. holiday calendars) out of the working tree."""
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "artifacts"))
@@ -0,0 +1,169 @@
+"""Unit tests for chunked anomaly scoring."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.anomaly.residual import detect_anomalies_residual
+from src.anomaly.streaming import TopK, score_forecasts
+from src.cv.backtest import run_backtest
+from src.data.cache import write_cache
+from src.data.dataset import LazyDataset
+from src.models.inference import ForecastWriter
+
+RESIDUAL = {"method": "quantile", "lower_quantile": 0.01, "upper_quantile": 0.99}
+
+IFOREST = {"n_estimators": 50, "contamination": 0.02, "random_state": 0}
+
+
+@pytest.fixture
+def predictions(tmp_path):
+    """Write backtest-style predictions of three series on different scales."""
+    rng = np.random.default_rng(0)
+    parts = []
+    for i, scale in enumerate([1.0, 10.0, 100.0]):
+        y = scale * rng.normal(size=500)
+        parts.append(pd.DataFrame({
+            "model": "naive",
+            "fold": 0,
+            "series_id": f"s{i}",
+            "ds": pd.date_range("2024-01-01", periods=500, freq="h"),
+            "y": y,
+            "yhat": y + scale * rng.standard_t(3, size=500),
+        }))
+    df = pd.concat(parts, ignore_index=True)
+    path = tmp_path / "predictions.parquet"
+    df.to_parquet(path, index=False)
+    return df, path
+
+
+def test_residual_matches_per_series_detection(predictions):
+    """Test that chunked flags match detection on each full series."""
+    df, path = predictions
+
+    expected = 0
+    for _, group in df.groupby("series_id"):
+        flags, _ = detect_anomalies_residual(
+            group["y"].to_numpy(), group["yhat"].to_numpy(), **RESIDUAL
+        )
+        expected += flags.sum()
+
+    top, stats = score_forecasts(str(path), "residual", RESIDUAL, k=5, batch_size=64)
+
+    assert stats["rows"] == len(df)
+    assert stats["series"] == 3
+    assert stats["anomalies"] == expected
+
+    residual = (df["y"] - df["yhat"]).abs()
+    np.testing.assert_allclose(top["anomaly_score"], residual.nlargest(5).to_numpy())
+
+
+def test_iforest_independent_of_batch_size(predictions):
+    """Test that the fitted forest and its scores do not depend on chunking."""
+    _, path = predictions
+
+    small, small_stats = score_forecasts(str(path), "iforest", IFOREST, k=10, batch_size=37)
+    large, large_stats = score_forecasts(str(path), "iforest", IFOREST, k=10, batch_size=10_000)
+
+    pd.testing.assert_frame_equal(small, large)
+    assert small_stats == pytest.approx(large_stats)
+    assert 0 < small_stats["anomalies"] < 0.1 * small_stats["rows"]
+
+
+def test_mean_score_skips_undefined_scores(tmp_path):
+    """Test that zero-variance series do not drag the mean score toward zero."""
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2024-01-01", periods=50, freq="h")
+    noisy = pd.DataFrame({"series_id": "a", "ds": dates, "y": rng.normal(size=50), "yhat": 0.0})
+    flat = pd.DataFrame({"series_id": "b", "ds": dates, "y": 1.0, "yhat": 0.0})
+    path = tmp_path / "forecast.parquet"
+    pd.concat([noisy, flat], ignore_index=True).to_parquet(path, index=False)
+
+    _, stats = score_forecasts(str(path), "residual", {"method": "std"}, batch_size=20)
+
+    _, scores = detect_anomalies_residual(noisy["y"].to_numpy(), noisy["yhat"].to_numpy(), "std")
+    assert stats["rows"] == 100
+    assert stats["mean_score"] == pytest.approx(scores.mean())
+
+    flat.to_parquet(path, index=False)
+    _, stats = score_forecasts(str(path), "residual", {"method": "std"})
+    assert np.isnan(stats["mean_score"]) and np.isnan(stats["max_score"])
+
+
+def test_multi_model_predictions_need_a_model(predictions, tmp_path):
+    """Test that residuals of several models are never pooled."""
+    df, path = predictions
+    other = df.assign(model="lgbm", yhat=df["y"])
+    multi = tmp_path / "multi.parquet"
+    pd.concat([df, other], ignore_index=True).to_parquet(multi, index=False)
+
+    with pytest.raises(ValueError, match=r"several models \['lgbm', 'naive'\]"):
+        score_forecasts(str(multi), "residual", RESIDUAL, batch_size=100)
+
+    expected = score_forecasts(str(path), "residual", RESIDUAL, batch_size=100)
+    result = score_forecasts(str(multi), "residual", RESIDUAL, model="naive", batch_size=100)
+
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    assert result[1] == expected[1]
+
+
+def test_actuals_joined_from_dataset(predictions, tmp_path):
+    """Test scoring forecasts that carry no actuals."""
+    df, path = predictions
+    cache = tmp_path / "long.parquet"
+    write_cache(df[["series_id", "ds", "y"]], cache, "fp")
+
+    forecasts = tmp_path / "forecast.parquet"
+    df.drop(columns=["model", "fold", "y"]).to_parquet(forecasts, index=False)
+
+    expected = score_forecasts(str(path), "residual", RESIDUAL, model="naive", batch_size=100)
+    result = score_forecasts(
+        str(forecasts), "residual", RESIDUAL, actuals=LazyDataset(str(cache)), batch_size=100
+    )
+
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    assert result[1] == expected[1]
+
+
+def test_scores_backtest_output(registry, tmp_path):
+    """Test scoring backtest predictions written with the dataset's columns."""
+    rng = np.random.default_rng(2)
+    dates = pd.date_range("2024-01-01", periods=120, freq="D")
+    panel = pd.concat([
+        pd.DataFrame({"store": f"s{i}", "date": dates, "sales": rng.normal(size=120).cumsum()})
+        for i in range(3)
+    ], ignore_index=True)
+    cv = {"n_splits": 3, "horizon": 14, "min_train_points": 60}
+    predictions, _ = run_backtest(
+        panel, {"last": {}}, {}, cv, "D", ts_col="date", target_col="sales", id_col="store",
+        registry=registry,
+    )
+
+    writer = ForecastWriter(str(tmp_path / "predictions.parquet"))
+    writer.write(predictions)
+    writer.close()
+
+    top, stats = score_forecasts(
+        str(writer.path), "residual", RESIDUAL, k=5, model="last",
+        target_col="sales", id_col="store", ts_col="date",
+    )
+
+    assert stats["rows"] == len(predictions)
+    assert stats["series"] == 3
+    assert top.columns[:2].tolist() == ["store", "date"]
+    residual = (predictions["sales"] - predictions["yhat"]).abs()
+    np.testing.assert_allclose(top["anomaly_score"], residual.nlargest(5).to_numpy())
+
+
+def test_top_k_keeps_largest():
+    """Test that the heap keeps the k largest scores across batches."""
+    rng = np.random.default_rng(1)
+    scores = rng.normal(size=1000)
+    df = pd.DataFrame({"row": np.arange(1000), "score": scores})
+
+    top = TopK(7)
+    for start in range(0, 1000, 90):
+        top.push(df.iloc[start:start + 90], scores[start:start + 90])
+
+    result = top.frame(["row", "score"])
+    assert result["row"].tolist() == df.nlargest(7, "score")["row"].tolist()
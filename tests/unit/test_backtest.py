@@ -0,0 +1,137 @@
+"""Unit tests for the parallel backtest engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cv.backtest import LOCAL, run_backtest
+from src.cv.results import ResultStore
+from src.data.feature_store import FeatureStore
+
+
+@pytest.fixture
+def panel():
+    """Create a shuffled panel of random walks."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    df = pd.concat([
+        pd.DataFrame({"series_id": f"s{i}", "ds": dates, "y": rng.normal(size=60).cumsum()})
+        for i in range(6)
+    ], ignore_index=True)
+    return df.sample(frac=1, random_state=0)
+
+
+def test_run_backtest(registry, panel):
+    """Test predictions and metrics of the (model x fold) grid."""
+    cv = {"n_splits": 2, "horizon": 7, "min_train_points": 30}
+    
+    predictions, metrics = run_backtest(
+        panel, {"last": {}, "lag": {}}, {"lags": [7]}, cv, "D",
+        id_col="series_id", registry=registry,
+    )
+    
+    assert metrics[["model", "fold"]].values.tolist() == [
+        ["last", 0], ["last", 1], ["lag", 0], ["lag", 1],
+    ]
+    assert (metrics["n_predictions"] == 6 * 7).all()
+    
+    # Last fold of series s0: last value before the final week
+    s0 = panel[panel["series_id"] == "s0"].sort_values("ds")
+    last = predictions[(predictions["model"] == "last") & (predictions["fold"] == 1)]
+    last = last[last["series_id"] == "s0"]
+    assert last["ds"].tolist() == s0["ds"].iloc[-7:].tolist()
+    assert np.allclose(last["yhat"], s0["y"].iloc[-8])
+    
+    # A 7-day lag is fully known over a 7-day horizon
+    lag = predictions[(predictions["model"] == "lag") & (predictions["fold"] == 1)]
+    lag = lag[lag["series_id"] == "s0"]
+    assert np.allclose(lag["yhat"], s0["y"].iloc[-14:-7])
+
+
+def test_run_backtest_parallel_is_deterministic(registry, panel):
+    """Test that worker processes produce the serial results."""
+    cv = {"n_splits": 2, "horizon": 7, "min_train_points": 30}
+    args = (panel, {"last": {}, "lag": {}}, {"lags": [7]}, cv, "D")
+    
+    serial = run_backtest(*args, id_col="series_id", registry=registry)
+    parallel = run_backtest(*args, id_col="series_id", registry=registry, n_jobs=2)
+    
+    for expected, result in zip(serial, parallel):
+        pd.testing.assert_frame_equal(expected, result)
+
+
+def test_run_backtest_integer_ids(registry, panel):
+    """Test that local models see the history of their own series with numeric IDs."""
+    cv = {"n_splits": 1, "horizon": 7, "min_train_points": 30}
+    numeric = panel.assign(series_id=panel["series_id"].str[1:].astype(int) * 10)
+    
+    kwargs = {"id_col": "series_id", "registry": registry}
+    
+    expected, _ = run_backtest(panel, {"last": {}}, {}, cv, "D", **kwargs)
+    result, _ = run_backtest(numeric, {"last": {}}, {}, cv, "D", **kwargs)
+    
+    assert result["yhat"].tolist() == expected["yhat"].tolist()
+
+
+def test_run_backtest_unknown_model(panel):
+    """Test that unknown models are rejected before any work."""
+    with pytest.raises(ValueError, match="Unknown models"):
+        run_backtest(panel, {"tft": {}}, {}, {}, "D", id_col="series_id")
+
+
+FITS = []
+
+
+def counted_last_value(config, ds, y, horizon, freq):
+    """Local test model recording each fit."""
+    FITS.append(len(y))
+    return np.full(horizon, y[-1])
+
+
+def test_run_backtest_resumes_from_results(registry, panel, tmp_path):
+    """Test that stored units are reused and only missing ones are fitted."""
+    counted = {**registry, "last": (LOCAL, counted_last_value, 1)}
+    cv = {"n_splits": 2, "horizon": 7, "min_train_points": 30}
+    results = ResultStore(str(tmp_path / "results"))
+    
+    FITS.clear()
+    first = run_backtest(
+        panel, {"last": {}}, {"lags": [7]}, cv, "D",
+        id_col="series_id", registry=counted, results=results,
+    )
+    assert len(FITS) == 6 * 2
+    
+    # Lose one stored part, as if its task had not finished
+    parts = sorted((tmp_path / "results").glob("*/*/part-0001-*.parquet"))
+    parts[0].unlink()
+    
+    FITS.clear()
+    resumed = run_backtest(
+        panel, {"last": {}, "lag": {}}, {"lags": [7]}, cv, "D",
+        id_col="series_id", registry=counted, results=results,
+    )
+    assert 0 < len(FITS) < 6
+    
+    pd.testing.assert_frame_equal(resumed[0][resumed[0]["model"] == "last"], first[0])
+    assert set(resumed[1]["model"]) == {"last", "lag"}
+
+
+def test_run_backtest_reuses_stored_features(registry, panel, tmp_path):
+    """Test that a rerun on the same data reads its features from the store."""
+    cv = {"n_splits": 2, "horizon": 7, "min_train_points": 30}
+    args = (panel, {"lag": {}}, {"lags": [7]}, cv, "D")
+    store = FeatureStore(str(tmp_path / "features"))
+    
+    expected = run_backtest(*args, id_col="series_id", registry=registry)
+    first = run_backtest(
+        *args, id_col="series_id", registry=registry, feature_store=store, fingerprint="fp"
+    )
+    assert store.last_built == ["calendar", "lags"]
+    
+    second = run_backtest(
+        *args, id_col="series_id", registry=registry, feature_store=store, fingerprint="fp"
+    )
+    assert store.last_built == []
+    
+    for result in (first, second):
+        pd.testing.assert_frame_equal(result[0], expected[0])
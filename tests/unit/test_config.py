@@ -0,0 +1,24 @@
+"""Unit tests for configuration loading."""
+
+from pathlib import Path
+
+import yaml
+
+from src.config import load_config
+
+
+def test_weather_path_relative_to_config(tmp_path):
+    """Test that the weather file is found next to the config, not the cwd."""
+    config = yaml.safe_load(open("configs/energy_opsd.yaml"))
+    config_dir = tmp_path / "configs"
+    config_dir.mkdir()
+    path = config_dir / "energy.yaml"
+    path.write_text(yaml.safe_dump(config))
+    
+    cfg = load_config(str(path))
+    
+    assert Path(cfg.features.weather["path"]) == config_dir / "data/energy/weather.parquet"
+    
+    config["features"]["weather"]["path"] = "/srv/weather.parquet"
+    path.write_text(yaml.safe_dump(config))
+    assert load_config(str(path)).features.weather["path"] == "/srv/weather.parquet"
@@ -0,0 +1,33 @@
+"""Unit tests for fold-aware features."""
+
+import numpy as np
+import pandas as pd
+
+from src.cv.features import FoldFeatures
+from src.data.features import build_features
+
+
+def test_fold_features_are_causal():
+    """Test that test rows only see data before the fold cutoff."""
+    dates = pd.date_range("2024-01-01", periods=30, freq="D")
+    df = pd.concat([
+        pd.DataFrame({"series_id": sid, "ds": dates, "y": np.arange(30.0) * (i + 1)})
+        for i, sid in enumerate(["a", "b"])
+    ], ignore_index=True)
+    config = {"lags": [1, 7], "rolls": [{"window": 3, "stats": ["mean"]}]}
+    
+    folds = FoldFeatures(df, config, id_col="series_id")
+    
+    # Train on the first 20 days of each series, test on the next 5
+    in_train = df["ds"] < dates[20]
+    in_test = (df["ds"] >= dates[20]) & (df["ds"] < dates[25])
+    train, test = folds.fold(np.flatnonzero(in_train), np.flatnonzero(in_test))
+    
+    pd.testing.assert_frame_equal(train, build_features(df[in_train], config, id_col="series_id"))
+    
+    test_a = test[test["series_id"] == "a"]
+    # lag_1 is only known on the first test day; lag_7 on all of them
+    assert test_a["lag_1"].notna().tolist() == [True, False, False, False, False]
+    assert test_a["lag_7"].tolist() == [13.0, 14.0, 15.0, 16.0, 17.0]
+    # Rolling mean frozen at the last training day (days 17-19)
+    assert (test_a["rolling_3_mean"] == 18.0).all()
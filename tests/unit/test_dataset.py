@@ -0,0 +1,108 @@
+"""Unit tests for the lazy dataset handle."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.data.cache import compact_dtypes, write_cache, write_delta
+from src.data.dataset import LazyDataset
+from src.data.loaders import load_dataset
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    """Write a small two-store retail cache."""
+    dates = pd.date_range("2016-01-01", periods=100, freq="D")
+    parts = []
+    for store in ["CA_1", "TX_1"]:
+        for dept in ["FOODS", "HOBBIES"]:
+            parts.append(pd.DataFrame({
+                "series_id": f"{store}_{dept}",
+                "ds": dates,
+                "y": np.arange(100, dtype=float),
+                "store": store,
+                "dept": dept,
+            }))
+    df = compact_dtypes(pd.concat(parts, ignore_index=True))
+    path = tmp_path / "m5_long.parquet"
+    write_cache(df, path, "fp")
+    return path
+
+
+def test_filter_hierarchy(cache_file):
+    """Test filtering on hierarchy columns."""
+    df = LazyDataset(str(cache_file)).filter(store="CA_1", dept=["FOODS"]).collect()
+    
+    assert len(df) == 100
+    assert df["series_id"].unique().tolist() == ["CA_1_FOODS"]
+    assert df["series_id"].cat.categories.tolist() == ["CA_1_FOODS"]
+
+
+def test_filter_dates_and_columns(cache_file):
+    """Test date-range filters and column projection."""
+    lazy = LazyDataset(str(cache_file)).filter(
+        series_ids=["TX_1_HOBBIES"],
+        start="2016-03-01",
+        end="2016-03-11",
+    ).select(["series_id", "ds", "y"])
+    
+    df = lazy.collect()
+    
+    assert df.columns.tolist() == ["series_id", "ds", "y"]
+    assert len(df) == 10
+    assert df["ds"].min() == pd.Timestamp("2016-03-01")
+
+
+def test_last(cache_file):
+    """Test trailing-window filter from row-group statistics."""
+    lazy = LazyDataset(str(cache_file))
+    
+    assert lazy.time_bounds() == (pd.Timestamp("2016-01-01"), pd.Timestamp("2016-04-09"))
+    
+    df = lazy.last("7D").collect()
+    assert df["ds"].nunique() == 7
+
+
+def test_time_bounds_without_statistics(tmp_path):
+    """Test that row groups written without statistics are read instead."""
+    df = pd.DataFrame({
+        "series_id": "a",
+        "ds": pd.date_range("2016-01-01", periods=10, freq="D"),
+        "y": np.arange(10.0),
+    })
+    path = tmp_path / "nostats.parquet"
+    pq.write_table(pa.Table.from_pandas(df), path, row_group_size=4, write_statistics=False)
+    
+    lazy = LazyDataset(str(path))
+    
+    assert lazy.time_bounds() == (pd.Timestamp("2016-01-01"), pd.Timestamp("2016-01-10"))
+
+
+def test_fingerprint(cache_file):
+    """Test that the fingerprint follows increments, filters and projection."""
+    lazy = LazyDataset(str(cache_file))
+    fingerprint = lazy.fingerprint
+    
+    assert LazyDataset(str(cache_file)).fingerprint == fingerprint
+    assert lazy.filter(store="CA_1").fingerprint != fingerprint
+    assert lazy.select(["series_id", "ds", "y"]).fingerprint != fingerprint
+    
+    write_delta(lazy.last("1D").collect().assign(y=-1.0), cache_file)
+    assert lazy.fingerprint != fingerprint
+
+
+def test_load_dataset_lazy(tmp_path):
+    """Test that load_dataset can return a lazy handle."""
+    pd.DataFrame({
+        "series_id": ["DE_load"] * 3,
+        "ds": pd.date_range("2016-01-01", periods=3, freq="h"),
+        "y": [1.0, 2.0, 3.0],
+    }).to_csv(tmp_path / "opsd_long.csv", index=False)
+    config = {"name": "energy_opsd", "path": str(tmp_path)}
+    
+    lazy = load_dataset("configs/energy_opsd.yaml", config, lazy=True)
+    
+    assert isinstance(lazy, LazyDataset)
+    assert len(lazy.filter(start="2016-01-01 01:00").collect()) == 2
@@ -0,0 +1,83 @@
+"""Unit tests for the feature store."""
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import FeatureStore
+from src.data.features import build_features
+
+
+CONFIG = {
+    "lags": [1, 7],
+    "rolls": [{"window": 7, "stats": ["mean"]}],
+    "fourier": {"periods": [7], "k": 2},
+    "holidays": {"countries": ["US"], "lookback": 1, "lookahead": 1},
+}
+
+
+def test_feature_store_reuses_matrix(make_panel, tmp_path):
+    """Test that an unchanged config and dataset skip feature engineering."""
+    store = FeatureStore(str(tmp_path / "features"))
+    df = make_panel()
+    expected = build_features(df, CONFIG, id_col="series_id")
+    
+    first = store.build_features(df, CONFIG, id_col="series_id")
+    assert store.last_hits == []
+    
+    second = store.build_features(df, CONFIG, id_col="series_id")
+    assert store.last_built == []
+    
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+
+
+def test_feature_store_partial_reuse(make_panel, tmp_path):
+    """Test that only changed families are recomputed."""
+    store = FeatureStore(str(tmp_path / "features"))
+    df = make_panel()
+    store.build_features(df, CONFIG, id_col="series_id")
+    
+    config = {**CONFIG, "lags": [1, 7, 14]}
+    result = store.build_features(df, config, id_col="series_id")
+    
+    assert store.last_built == ["lags"]
+    pd.testing.assert_frame_equal(result, build_features(df, config, id_col="series_id"))
+    
+    # New data invalidates every family
+    changed = df.assign(y=df["y"] + 1)
+    store.build_features(changed, config, id_col="series_id")
+    assert store.last_hits == []
+
+
+def test_feature_store_keys_weather_by_series(make_panel, tmp_path):
+    """Test that weather lagged per series is not reused across groupings."""
+    weather = pd.DataFrame({
+        "ds": pd.date_range("2024-01-01", periods=40, freq="D"),
+        "temperature": np.arange(40.0),
+    })
+    path = tmp_path / "weather.parquet"
+    weather.to_parquet(path)
+    config = {"weather": {"path": str(path), "features": ["temperature"], "lags": [1]}}
+    
+    store = FeatureStore(str(tmp_path / "features"))
+    df = make_panel()
+    store.build_features(df, config, id_col="series_id", fingerprint="fp")
+    
+    pooled = store.build_features(df, config, fingerprint="fp")
+    assert store.last_built == ["weather"]
+    pd.testing.assert_frame_equal(pooled, build_features(df, config))
+
+
+def test_feature_store_keys_promos_by_scope(make_panel, tmp_path):
+    """Test that changing a promo scope column recomputes only promos."""
+    promos = {"events": [{"start": "2024-01-05", "end": "2024-01-10", "store": "CA_1"}]}
+    config = {"lags": [1], "promos": promos}
+    store = FeatureStore(str(tmp_path / "features"))
+    df = make_panel().assign(store=lambda d: np.where(d["series_id"] == "s0", "CA_1", "TX_1"))
+    store.build_features(df, config, id_col="series_id", fingerprint="fp")
+    
+    moved = df.assign(store=np.where(df["series_id"] == "s1", "CA_1", "TX_1"))
+    result = store.build_features(moved, config, id_col="series_id", fingerprint="fp")
+    
+    assert store.last_built == ["promos"]
+    pd.testing.assert_frame_equal(result, build_features(moved, config, id_col="series_id"))
@@ -4,7 +4,16 @@ import pandas as pd
 import numpy as np
 import pytest
 
-from src.data.features import create_lag_features, create_rolling_features, build_features
+from src.data.features import (
+    build_features,
+    create_holiday_features,
+    create_lag_features,
+    create_promo_features,
+    create_rolling_features,
+    create_weather_features,
+    estimate_feature_memory,
+    plan_features,
+)
 
 
 def test_create_lag_features():
@@ -22,6 +31,21 @@ def test_create_lag_features():
     assert result["lag_1"].iloc[5] == 4
 
 
+def test_create_lag_features_panel():
+    """Test panel lags match per-series shifts on an interleaved panel."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "series_id": rng.choice(["a", "b", "c"], size=60),
+        "y": rng.normal(size=60),
+    })
+    
+    result = create_lag_features(df, lags=[1, 3, 25], target_col="y", id_col="series_id")
+    
+    for lag in [1, 3, 25]:
+        expected = df.groupby("series_id")["y"].shift(lag)
+        pd.testing.assert_series_equal(result[f"lag_{lag}"], expected, check_names=False)
+
+
 def test_create_rolling_features():
     """Test rolling window features."""
     df = pd.DataFrame({
@@ -39,6 +63,26 @@ def test_create_rolling_features():
     assert result["rolling_7_mean"].iloc[6] == pytest.approx(3.0)
 
 
+def test_create_rolling_features_panel():
+    """Test grouped rolling stats match pandas per-series rolling."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "series_id": rng.choice(["a", "b", "c"], size=300),
+        "y": rng.normal(size=300) * 5 + 100,
+    })
+    df.loc[[3, 40, 41], "y"] = np.nan
+    
+    windows = [{"window": 7, "stats": ["mean", "std", "min", "max"]}]
+    result = create_rolling_features(df, windows, target_col="y", id_col="series_id")
+    
+    grouped = df.groupby("series_id")["y"]
+    for stat in ["mean", "std", "min", "max"]:
+        expected = grouped.transform(lambda x: getattr(x.rolling(7, min_periods=1), stat)())
+        np.testing.assert_allclose(
+            result[f"rolling_7_{stat}"].to_numpy(), expected.to_numpy(), rtol=1e-9
+        )
+
+
 def test_build_features():
     """Test full feature building pipeline."""
     df = pd.DataFrame({
@@ -68,3 +112,148 @@ def test_build_features():
     # Check Fourier features
     assert "fourier_sin_7_1" in result.columns
     assert "fourier_cos_7_1" in result.columns
+
+
+def test_create_holiday_features(tmp_path):
+    """Test holiday flags, distances and the on-disk calendar cache."""
+    df = pd.DataFrame({"ds": pd.date_range("2023-12-20", "2024-01-10", freq="12h")})
+    
+    result = create_holiday_features(df, countries=["US"], lookback=2, lookahead=1, distance=True)
+    by_day = result.set_index("ds")
+    
+    # Christmas and New Year's Day, for both rows of the day
+    assert by_day.loc["2023-12-25", "is_holiday"].tolist() == [1, 1]
+    assert by_day.loc["2024-01-01 12:00", "is_holiday"] == 1
+    assert by_day.loc["2023-12-23", "holiday_minus_2"].tolist() == [1, 1]
+    assert by_day.loc["2023-12-26", "holiday_plus_1"].tolist() == [1, 1]
+    assert by_day.loc["2023-12-24", "holiday_minus_1"].tolist() == [1, 1]
+    
+    assert by_day.loc["2023-12-28", "days_to_holiday"].tolist() == [4, 4]
+    assert by_day.loc["2023-12-28", "days_since_holiday"].tolist() == [3, 3]
+    assert by_day.loc["2024-01-01", "days_to_holiday"].tolist() == [0, 0]
+    
+    cached = list((tmp_path / "artifacts" / "cache").glob("holidays-*/US_*.json"))
+    assert {p.name for p in cached} >= {"US_2023.json", "US_2024.json"}
+
+
+def test_build_features_plan_matches_output(make_panel):
+    """Test that planned columns are exactly the columns built."""
+    config = {
+        "lags": [1, 7],
+        "rolls": [{"window": 7, "stats": ["mean", "max"]}],
+        "fourier": {"periods": [7], "k": 2},
+        "holidays": {"countries": ["US"], "lookback": 1, "lookahead": 1},
+        "promos": [{"start": "2024-01-10", "end": "2024-01-12", "name": "sale"}],
+    }
+    df = make_panel(4, 60)
+    
+    result = build_features(df, config, id_col="series_id")
+    planned = [c for cols in plan_features(config).values() for c in cols]
+    
+    assert list(result.columns) == list(df.columns) + planned
+    assert result["promo_sale"].sum() == 3 * 4
+    assert "lag_1" not in df.columns
+
+
+def test_build_features_memory_budget(make_panel):
+    """Test failing fast and chunking under a memory budget."""
+    config = {"lags": [1, 7], "rolls": [{"window": 7, "stats": ["mean"]}]}
+    df = make_panel(4, 60).sample(frac=1, random_state=0)
+    budget = estimate_feature_memory(len(df), config) // 3
+    
+    with pytest.raises(MemoryError):
+        build_features(df, config, id_col="series_id", memory_budget=budget)
+    
+    chunked = build_features(
+        df, config, id_col="series_id", memory_budget=budget, on_budget="chunk"
+    )
+    expected = build_features(df, config, id_col="series_id")
+    
+    pd.testing.assert_frame_equal(chunked, expected)
+
+
+def test_build_features_compact(make_panel):
+    """Test that compact mode shrinks dtypes without changing values."""
+    config = {
+        "lags": [1, 7],
+        "rolls": [{"window": 7, "stats": ["mean", "std"]}],
+        "fourier": {"periods": [7], "k": 1},
+        "holidays": {"countries": ["US"], "distance": True},
+    }
+    df = make_panel(4, 60)
+    
+    default = build_features(df, config, id_col="series_id")
+    compact = build_features(df, {**config, "compact": True}, id_col="series_id")
+    
+    assert compact["lag_1"].dtype == np.float32
+    assert compact["year"].dtype == np.int16
+    assert compact["days_to_holiday"].dtype == np.int16
+    compact_bytes = estimate_feature_memory(len(df), {**config, "compact": True})
+    assert compact_bytes < estimate_feature_memory(len(df), config)
+    pd.testing.assert_frame_equal(compact, default, check_dtype=False, rtol=1e-6)
+
+
+def test_create_weather_features(tmp_path):
+    """Test the as-of weather join and weather lags."""
+    weather = pd.DataFrame({
+        "ds": pd.date_range("2024-01-01", periods=4, freq="2h"),
+        "temperature": [1.0, 2.0, 3.0, 4.0],
+        "humidity": [0.5, 0.6, 0.7, 0.8],
+    })
+    path = tmp_path / "weather.parquet"
+    weather.to_parquet(path)
+    
+    dates = pd.date_range("2023-12-31 23:00", periods=6, freq="h")
+    df = pd.DataFrame({
+        "series_id": ["a"] * 6 + ["b"] * 6,
+        "ds": list(dates) * 2,
+        "y": np.arange(12.0),
+    })
+    config = {"path": str(path), "features": ["temperature"], "lags": [1]}
+    
+    result = create_weather_features(df, config, id_col="series_id")
+    
+    # Latest observation at or before each hour; none before the first one
+    expected = [np.nan, 1.0, 1.0, 2.0, 2.0, 3.0]
+    np.testing.assert_array_equal(result["temperature"].to_numpy(), expected * 2)
+    lagged = ([np.nan] + expected[:-1]) * 2
+    np.testing.assert_array_equal(result["temperature_lag_1"].to_numpy(), lagged)
+    assert "humidity" not in result.columns
+
+
+def test_build_features_parallel(make_panel):
+    """Test that the sharded parallel build matches the serial build."""
+    config = {"lags": [1, 7], "rolls": [{"window": 7, "stats": ["mean", "std", "max"]}]}
+    df = make_panel(n_series=6).sample(frac=1, random_state=0)
+    
+    serial = build_features(df, config, id_col="series_id")
+    parallel = build_features(df, config, id_col="series_id", n_jobs=2)
+    
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_create_promo_features_scoped(make_panel):
+    """Test promo scopes and the aggregate and sparse modes."""
+    df = make_panel(n_series=2, periods=10)
+    events = [
+        {"start": "2024-01-02", "end": "2024-01-04", "name": "all"},
+        {"start": "2024-01-03", "end": "2024-01-05", "name": "s0_only", "series_id": "s0"},
+        {"start": "2024-01-03", "end": "2024-01-05", "name": "unknown", "series_id": "zz"},
+    ]
+    
+    dense = create_promo_features(df, events)
+    s0 = dense["series_id"] == "s0"
+    assert dense.loc[s0, "promo_s0_only"].sum() == 3
+    assert dense.loc[~s0, "promo_s0_only"].sum() == 0
+    assert dense["promo_unknown"].sum() == 0
+    
+    aggregate = create_promo_features(df, {"events": events, "mode": "aggregate"})
+    row = aggregate[s0 & (aggregate["ds"] == "2024-01-04")].iloc[0]
+    assert row["promo_active_count"] == 2
+    assert row["promo_days_since_start"] == 1
+    inactive = aggregate["promo_active_count"] == 0
+    assert (aggregate.loc[inactive, "promo_days_since_start"] == -1).all()
+    
+    sparse = create_promo_features(df, {"events": events, "mode": "sparse"})
+    assert isinstance(sparse["promo_all"].dtype, pd.SparseDtype)
+    np.testing.assert_array_equal(sparse["promo_all"].sparse.to_dense(), dense["promo_all"])
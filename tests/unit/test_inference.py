@@ -0,0 +1,105 @@
+"""Unit tests for batch inference."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cv.features import FoldFeatures
+from src.models.inference import (
+    ForecastWriter,
+    batch_forecast,
+    future_frame,
+    origin_features,
+    save_model,
+)
+
+
+class LagModel:
+    """Global test model predicting the weekly lag."""
+    
+    feature_cols = ["lag_7", "rolling_7_mean"]
+    
+    def predict(self, X):
+        return X["lag_7"].fillna(X["rolling_7_mean"]).to_numpy()
+
+
+FEATURES = {"lags": [1, 7], "rolls": [{"window": 7, "stats": ["mean", "std"]}]}
+
+
+@pytest.fixture
+def panel():
+    """Create a shuffled panel with series of different lengths."""
+    rng = np.random.default_rng(0)
+    df = pd.concat([
+        pd.DataFrame({
+            "series_id": f"s{i}",
+            "ds": pd.date_range("2024-01-01", periods=30 + i),
+            "y": 0.0,
+        })
+        for i in range(5)
+    ], ignore_index=True)
+    df["y"] = rng.normal(size=len(df)).cumsum()
+    return df.sample(frac=1, random_state=0)
+
+
+def test_origin_features_match_full_history(panel):
+    """Test that features from the series tails match a full-history build."""
+    history = panel.sort_values(["series_id", "ds"]).reset_index(drop=True)
+    future = future_frame(history, 10, "D", id_col="series_id")
+    full = pd.concat([history, future]).sort_values(["series_id", "ds"], kind="stable")
+    full = full.reset_index(drop=True)
+    is_future = full["y"].isna().to_numpy()
+    
+    expected = FoldFeatures(full, FEATURES, id_col="series_id").test_features(
+        np.flatnonzero(~is_future), np.flatnonzero(is_future)
+    )
+    result = origin_features(history, FEATURES, 10, "D", id_col="series_id")
+    
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True), expected.reset_index(drop=True), check_exact=False
+    )
+    # Lags past the origin are unknown, rolling stats are frozen at it
+    s0 = result[result["series_id"] == "s0"]
+    assert s0["lag_1"].notna().sum() == 1
+    assert s0["rolling_7_mean"].nunique() == 1
+
+
+@pytest.mark.parametrize("output", ["forecast.csv", "forecast.parquet", "forecast"])
+def test_batch_forecast_streams_chunks(registry, panel, tmp_path, output):
+    """Test chunked forecasts of global and local models."""
+    save_model(LagModel(), str(tmp_path / "model.joblib"))
+    path = tmp_path / output
+    
+    with ForecastWriter(str(path)) as writer:
+        stats = batch_forecast(
+            panel, "lag", {}, FEATURES, 7, "D", writer,
+            model_path=str(tmp_path / "model.joblib"), id_col="series_id", chunk_size=2,
+            registry=registry,
+        )
+    
+    assert stats["rows"] == 5 * 7 and stats["chunks"] == 3
+    assert stats["rows_per_sec"] > 0 and stats["peak_rss_mb"] > 0
+    
+    if output.endswith(".csv"):
+        forecast = pd.read_csv(path, parse_dates=["ds"])
+    else:
+        forecast = pd.read_parquet(path)
+    s0 = panel[panel["series_id"] == "s0"].sort_values("ds")
+    s0_forecast = forecast[forecast["series_id"] == "s0"]
+    assert s0_forecast["ds"].min() == s0["ds"].max() + pd.Timedelta(days=1)
+    assert np.allclose(s0_forecast["yhat"], s0["y"].iloc[-7:])
+
+
+def test_batch_forecast_time_budget(registry, panel, tmp_path):
+    """Test that a run projected over budget stops without leaving output."""
+    path = tmp_path / "forecast.parquet"
+    
+    with pytest.raises(TimeoutError, match="time budget"):
+        with ForecastWriter(str(path)) as writer:
+            batch_forecast(
+                panel, "last", {}, FEATURES, 7, "D", writer,
+                id_col="series_id", chunk_size=1, time_budget=0.0, registry=registry,
+            )
+    
+    assert not path.exists()
+    assert not (tmp_path / "forecast.parquet.tmp").exists()
@@ -0,0 +1,264 @@
+"""Unit tests for data loaders."""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.data.cache import FINGERPRINT_KEY, delta_paths, read_cache, read_watermarks
+from src.data.dataset import LazyDataset
+from src.data.loaders import (
+    _convert_m5_raw,
+    build_opsd_cache,
+    ingest_observations,
+    load_m5_data,
+    load_opsd_data,
+)
+
+
+@pytest.fixture
+def m5_long_dir(tmp_path):
+    """Write a small long-format M5 file."""
+    dates = pd.date_range("2016-01-01", periods=10, freq="D")
+    parts = []
+    for item in ["FOODS_001", "FOODS_002"]:
+        parts.append(pd.DataFrame({
+            "series_id": f"CA_CA_1_FOODS_{item}",
+            "ds": dates,
+            "y": np.arange(10),
+            "state": "CA",
+            "store": "CA_1",
+            "dept": "FOODS",
+            "item": item,
+        }))
+    pd.concat(parts).to_csv(tmp_path / "m5_long.csv", index=False)
+    return tmp_path
+
+
+def test_load_m5_data_writes_compact_cache(m5_long_dir):
+    """Test that loading M5 data writes a compact Parquet cache."""
+    df = load_m5_data(str(m5_long_dir))
+    
+    assert (m5_long_dir / "m5_long.parquet").exists()
+    assert isinstance(df["series_id"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["store"].dtype, pd.CategoricalDtype)
+    assert df["y"].dtype == np.float32
+    assert df["ds"].dtype == "datetime64[ns]"
+    assert len(df) == 20
+
+
+def test_load_m5_data_reads_cache(m5_long_dir, monkeypatch):
+    """Test that a warm load does not reparse the source CSV."""
+    expected = load_m5_data(str(m5_long_dir))
+    
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("source CSV should not be reparsed")
+    
+    monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+    result = load_m5_data(str(m5_long_dir))
+    
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_load_m5_data_invalidates_stale_cache(m5_long_dir):
+    """Test that changing the sources rebuilds the cache."""
+    load_m5_data(str(m5_long_dir))
+    
+    source = m5_long_dir / "m5_long.csv"
+    df = pd.read_csv(source)
+    df["y"] = df["y"] + 100
+    df.to_csv(source, index=False)
+    
+    result = load_m5_data(str(m5_long_dir))
+    
+    assert result["y"].min() == 100
+
+
+def test_load_opsd_data_raw(tmp_path):
+    """Test OPSD conversion from the raw wide file."""
+    raw = pd.DataFrame({
+        "utc_timestamp": pd.date_range("2016-01-01", periods=5, freq="h", tz="UTC"),
+        "DE_load_actual_entsoe_transparency": [1.0, 2.0, np.nan, 4.0, 5.0],
+        "FR_load_actual_entsoe_transparency": [6.0, 7.0, 8.0, 9.0, 10.0],
+    })
+    raw.to_csv(tmp_path / "opsd_time_series.csv", index=False)
+    
+    df = load_opsd_data(str(tmp_path))
+    
+    assert len(df) == 9
+    assert df["ds"].dt.tz is None
+    assert df["y"].dtype == np.float32
+    assert list(df["series_id"].cat.categories) == [
+        "DE_load_actual_entsoe_transparency",
+        "FR_load_actual_entsoe_transparency",
+    ]
+    
+    assert FINGERPRINT_KEY in pq.read_schema(tmp_path / "opsd_long.parquet").metadata
+
+
+def test_load_m5_data_missing(tmp_path):
+    """Test error when no M5 data is present."""
+    with pytest.raises(FileNotFoundError):
+        load_m5_data(str(tmp_path))
+
+
+@pytest.fixture
+def m5_raw_dir(tmp_path):
+    """Write small raw wide M5 sales and calendar files."""
+    sales = pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "item_id": ["FOODS_1_001", "FOODS_1_002", "HOBBIES_1_001"],
+        "dept_id": ["FOODS_1", "FOODS_1", "HOBBIES_1"],
+        "cat_id": ["FOODS", "FOODS", "HOBBIES"],
+        "store_id": ["CA_1", "CA_1", "TX_2"],
+        "state_id": ["CA", "CA", "TX"],
+        "d_1": [1, 10, 100],
+        "d_2": [2, 20, 200],
+        "d_3": [3, 30, 300],
+    })
+    calendar = pd.DataFrame({
+        "date": ["2011-01-29", "2011-01-30", "2011-01-31"],
+        "d": ["d_1", "d_2", "d_3"],
+    })
+    sales.to_csv(tmp_path / "sales_train_validation.csv", index=False)
+    calendar.to_csv(tmp_path / "calendar.csv", index=False)
+    return tmp_path
+
+
+def test_convert_m5_raw_chunked(m5_raw_dir):
+    """Test that chunked conversion matches a full wide-to-long melt."""
+    sales_file = m5_raw_dir / "sales_train_validation.csv"
+    calendar_file = m5_raw_dir / "calendar.csv"
+    cache_file = m5_raw_dir / "m5_long.parquet"
+    
+    _convert_m5_raw(sales_file, calendar_file, cache_file, "fp", chunksize=2)
+    
+    result = read_cache(cache_file, "fp")
+    
+    assert pq.ParquetFile(cache_file).num_row_groups == 2
+    assert len(result) == 9
+    assert result["ds"].iloc[:3].tolist() == list(
+        pd.to_datetime(["2011-01-29", "2011-01-30", "2011-01-31"])
+    )
+    assert result["y"].tolist() == [1, 2, 3, 10, 20, 30, 100, 200, 300]
+    assert result["series_id"].iloc[-1] == "TX_TX_2_HOBBIES_1_HOBBIES_1_001"
+    assert result["state"].iloc[-1] == "TX"
+
+
+def test_convert_m5_raw_sorts_series(m5_raw_dir):
+    """Test that rows come out in (series_id, ds) order whatever the source order."""
+    sales_file = m5_raw_dir / "sales_train_validation.csv"
+    sales = pd.read_csv(sales_file).iloc[[2, 0, 1]]
+    sales[[*sales.columns[:-3], "d_3", "d_1", "d_2"]].to_csv(sales_file, index=False)
+    cache_file = m5_raw_dir / "m5_long.parquet"
+    
+    _convert_m5_raw(sales_file, m5_raw_dir / "calendar.csv", cache_file, "fp", chunksize=2)
+    
+    result = read_cache(cache_file, "fp")
+    assert result["y"].tolist() == [1, 2, 3, 10, 20, 30, 100, 200, 300]
+    assert result["series_id"].astype(str).is_monotonic_increasing
+    first = pq.ParquetFile(cache_file).read_row_group(0).column("series_id").to_pylist()
+    assert first == ["CA_CA_1_FOODS_1_FOODS_1_001"] * 3 + ["CA_CA_1_FOODS_1_FOODS_1_002"] * 3
+    assert not list(m5_raw_dir.glob("m5-*"))
+
+
+def test_convert_m5_raw_unknown_day(m5_raw_dir):
+    """Test that sales days missing from the calendar are rejected."""
+    sales_file = m5_raw_dir / "sales_train_validation.csv"
+    pd.read_csv(sales_file).assign(d_4=0).to_csv(sales_file, index=False)
+    
+    with pytest.raises(ValueError, match="d_4"):
+        _convert_m5_raw(
+            sales_file, m5_raw_dir / "calendar.csv", m5_raw_dir / "m5_long.parquet", "fp"
+        )
+
+
+def test_load_m5_data_raw(m5_raw_dir):
+    """Test loading M5 from raw files."""
+    df = load_m5_data(str(m5_raw_dir))
+    
+    assert len(df) == 9
+    assert isinstance(df["series_id"].dtype, pd.CategoricalDtype)
+    assert df["series_id"].nunique() == 3
+
+
+def test_convert_opsd_raw_order(tmp_path):
+    """Test that OPSD output is in (series_id, ds) order without NaNs."""
+    raw = pd.DataFrame({
+        "utc_timestamp": pd.to_datetime(
+            ["2016-01-01T02:00:00Z", "2016-01-01T00:00:00Z", "2016-01-01T01:00:00Z"]
+        ),
+        "FR_load_actual_entsoe_transparency": [3.0, 1.0, np.nan],
+        "DE_load_actual_entsoe_transparency": [30.0, 10.0, 20.0],
+        "DE_solar_generation_actual": [0.0, 0.0, 0.0],
+    })
+    raw.to_csv(tmp_path / "opsd_time_series.csv", index=False)
+    
+    df = load_opsd_data(str(tmp_path))
+    
+    assert df["series_id"].astype(str).tolist() == [
+        "DE_load_actual_entsoe_transparency",
+    ] * 3 + ["FR_load_actual_entsoe_transparency"] * 2
+    assert df["y"].tolist() == [10.0, 20.0, 30.0, 1.0, 3.0]
+    assert df["ds"].is_monotonic_increasing is False
+    assert df["ds"].iloc[:3].is_monotonic_increasing
+
+
+def _energy_rows(series_id, start, values):
+    return pd.DataFrame({
+        "series_id": series_id,
+        "ds": pd.date_range(start, periods=len(values), freq="h"),
+        "y": values,
+    })
+
+
+@pytest.fixture
+def energy_cache(tmp_path):
+    """Build a small OPSD cache with two series."""
+    pd.concat([
+        _energy_rows("DE_load", "2016-01-01", [1.0, 2.0, 3.0]),
+        _energy_rows("FR_load", "2016-01-01", [10.0, 20.0]),
+    ]).to_csv(tmp_path / "opsd_long.csv", index=False)
+    return build_opsd_cache(str(tmp_path))
+
+
+def test_ingest_observations_appends(energy_cache):
+    """Test appending new rows past the watermarks."""
+    new_rows = pd.concat([
+        _energy_rows("DE_load", "2016-01-01 03:00", [4.0]),
+        _energy_rows("NL_load", "2016-01-01", [7.0]),
+    ])
+    
+    result = ingest_observations(energy_cache, new_rows)
+    df = read_cache(energy_cache)
+    
+    assert result == {"appended": 2, "rejected": 0}
+    assert len(delta_paths(energy_cache)) == 1
+    assert len(df) == 7
+    assert df[df["series_id"] == "DE_load"]["y"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert read_watermarks(energy_cache)["NL_load"] == pd.Timestamp("2016-01-01").value
+
+
+def test_ingest_observations_rejects_late(energy_cache):
+    """Test that late and duplicate rows are rejected by default."""
+    new_rows = pd.concat([
+        _energy_rows("DE_load", "2016-01-01 02:00", [99.0, 4.0]),
+        _energy_rows("FR_load", "2015-12-31 23:00", [5.0]),
+    ])
+    
+    result = ingest_observations(energy_cache, new_rows)
+    df = read_cache(energy_cache)
+    
+    assert result == {"appended": 1, "rejected": 2}
+    assert df[df["series_id"] == "DE_load"]["y"].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_ingest_observations_merges_late(energy_cache):
+    """Test that merged late rows replace existing values."""
+    new_rows = _energy_rows("DE_load", "2016-01-01 01:00", [99.0])
+    
+    result = ingest_observations(energy_cache, new_rows, on_late="merge")
+    lazy = LazyDataset(str(energy_cache)).filter(series_ids=["DE_load"]).select(["y"])
+    
+    assert result == {"appended": 1, "rejected": 0}
+    assert lazy.collect()["y"].tolist() == [1.0, 99.0, 3.0]
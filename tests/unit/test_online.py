@@ -0,0 +1,43 @@
+"""Unit tests for online feature updates."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.features import build_features
+from src.data.online import OnlineFeatureState
+
+
+CONFIG = {
+    "lags": [1, 3],
+    "rolls": [{"window": 4, "stats": ["mean", "std", "min", "max"]}],
+    "fourier": {"periods": [7], "k": 1},
+    "holidays": {"countries": ["US"], "lookback": 1, "lookahead": 1, "distance": True},
+}
+
+
+def test_online_matches_batch():
+    """Test that streamed updates reproduce batch features row by row."""
+    dates = pd.date_range("2023-12-15", periods=30, freq="D")
+    rng = np.random.default_rng(0)
+    df = pd.concat([
+        pd.DataFrame({"series_id": f"s{i}", "ds": dates, "y": rng.normal(size=30) + 100})
+        for i in range(2)
+    ]).sort_values(["ds", "series_id"], kind="stable").reset_index(drop=True)
+    df.loc[7, "y"] = np.nan
+    
+    expected = build_features(df, CONFIG, id_col="series_id")
+    
+    cutoff = dates[10]
+    state = OnlineFeatureState.from_history(df[df["ds"] < cutoff], CONFIG, id_col="series_id")
+    online = pd.concat([
+        state.update(df[df["ds"] == ds]) for ds in dates[dates >= cutoff]
+    ])
+    
+    pd.testing.assert_frame_equal(online, expected.loc[online.index], rtol=1e-9)
+
+
+def test_online_rejects_negative_lags():
+    """Test that leads cannot be updated online."""
+    with pytest.raises(ValueError):
+        OnlineFeatureState({"lags": [-1]})
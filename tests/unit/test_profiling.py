@@ -0,0 +1,84 @@
+"""Unit tests for the stage profiler."""
+
+import json
+import pstats
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cv.backtest import run_backtest
+from src.utils.profiling import StageProfiler
+
+
+def busy(n):
+    """Burn some CPU."""
+    return sum(i * i for i in range(n))
+
+
+def test_stages_are_recorded(tmp_path):
+    """Test timings, the summary table and the JSON report."""
+    profiler = StageProfiler()
+    with profiler.stage("load"):
+        busy(10_000)
+    with pytest.raises(RuntimeError):
+        with profiler.stage("fit"):
+            busy(200_000)
+            raise RuntimeError("failed")
+
+    assert [r["stage"] for r in profiler.records] == ["load", "fit"]
+    for record in profiler.records:
+        assert record["wall_s"] >= 0 and record["cpu_s"] >= 0 and record["peak_rss_mb"] > 0
+
+    summary = profiler.summary()
+    assert summary["stage"].tolist() == ["load", "fit", "total"]
+    assert summary["wall_s"].iloc[-1] == pytest.approx(summary["wall_s"].iloc[:-1].sum())
+    assert summary["wall_pct"].iloc[-1] == pytest.approx(100)
+
+    table_path, json_path = profiler.write(str(tmp_path), "backtest_test")
+    assert "total" in open(table_path).read()
+    report = json.load(open(json_path))
+    assert report["name"] == "backtest_test"
+    assert [stage["stage"] for stage in report["stages"]] == ["load", "fit"]
+
+
+def test_disabled_profiler_records_nothing():
+    """Test that a disabled profiler only runs the stage."""
+    profiler = StageProfiler(enabled=False)
+    with profiler.stage("load"):
+        busy(1000)
+
+    assert profiler.records == []
+    assert profiler.summary().empty
+
+
+def test_cprofile_dumps(tmp_path):
+    """Test that each stage gets a loadable cProfile dump."""
+    profiler = StageProfiler(cprofile_dir=str(tmp_path / "prof"))
+    with profiler.stage("build features"):
+        busy(10_000)
+
+    path = profiler.records[0]["cprofile"]
+    assert path.endswith("00_build_features.prof")
+    stats = pstats.Stats(path)
+    assert any(func[2] == "busy" for func in stats.stats)
+    assert "busy" in open(path.replace(".prof", ".txt")).read()
+
+
+def test_run_backtest_stages(registry):
+    """Test the pipeline stages recorded by a backtest."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    panel = pd.concat([
+        pd.DataFrame({"series_id": f"s{i}", "ds": dates, "y": rng.normal(size=60).cumsum()})
+        for i in range(3)
+    ], ignore_index=True)
+    cv = {"n_splits": 2, "horizon": 7, "min_train_points": 30}
+
+    profiler = StageProfiler()
+    run_backtest(
+        panel, {"last": {}, "lag": {}}, {"lags": [7]}, cv, "D", id_col="series_id",
+        registry=registry, profiler=profiler,
+    )
+
+    assert [r["stage"] for r in profiler.records] == ["split", "features", "fit_predict", "metrics"]
@@ -0,0 +1,46 @@
+"""Unit tests for cross-validation splits."""
+
+import numpy as np
+import pandas as pd
+
+from src.cv.splits import rolling_origin_folds, rolling_origin_split
+
+
+def test_rolling_origin_folds_panel():
+    """Test that folds index each series' own rolling origins."""
+    df = pd.concat([
+        pd.DataFrame({"series_id": sid, "ds": pd.date_range("2024-01-01", periods=n), "y": 1.0})
+        for sid, n in [("b", 20), ("a", 12)]
+    ], ignore_index=True).sample(frac=1, random_state=0)
+    
+    folds = list(rolling_origin_folds(
+        df, n_splits=2, horizon=3, min_train_points=8, ts_col="ds", id_col="series_id"
+    ))
+    
+    assert len(folds) == 2
+    
+    # Series "a" only has enough history for the last fold
+    first, last = folds
+    assert set(first.train["series_id"]) == {"b"}
+    assert last.train.groupby("series_id").size().to_dict() == {"a": 9, "b": 17}
+    assert last.test.groupby("series_id").size().to_dict() == {"a": 3, "b": 3}
+    
+    # Test rows follow each series' training rows
+    for sid, test in last.test.groupby("series_id"):
+        assert test["ds"].min() > last.train.loc[last.train["series_id"] == sid, "ds"].max()
+    
+    # Masks select the same rows as the indices
+    assert last.train_mask.sum() == len(last.train_idx)
+    assert not (last.train_mask & last.test_mask).any()
+    pd.testing.assert_frame_equal(df[last.test_mask].sort_index(), last.test.sort_index())
+
+
+def test_rolling_origin_split_matches_folds():
+    """Test that the frame splitter yields the folds' rows."""
+    df = pd.DataFrame({"ds": pd.date_range("2024-01-01", periods=30), "y": np.arange(30.0)})
+    
+    splits = list(rolling_origin_split(df, n_splits=3, horizon=5, min_train_points=10))
+    
+    assert [len(train) for train, _ in splits] == [15, 20, 25]
+    assert all(len(test) == 5 for _, test in splits)
+    assert splits[-1][1]["y"].tolist() == [25.0, 26.0, 27.0, 28.0, 29.0]
@@ -0,0 +1,64 @@
+"""Unit tests for the memory-mapped frame store."""
+
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.store import FrameStore
+
+
+@pytest.fixture
+def panel():
+    """Create a small shuffled panel."""
+    dates = pd.date_range("2024-01-01", periods=10, freq="D")
+    df = pd.concat([
+        pd.DataFrame({"series_id": "b", "ds": dates, "y": np.arange(10) + 100.0}),
+        pd.DataFrame({"series_id": "a", "ds": dates[:6], "y": np.arange(6, dtype=float)}),
+    ])
+    return df.sample(frac=1, random_state=0)
+
+
+def test_series_bounds(panel, tmp_path):
+    """Test that grouped rows are indexed by series."""
+    df = panel.sort_values(["series_id", "ds"])
+    store = FrameStore.build(df, str(tmp_path / "frame"), id_col="series_id")
+    
+    assert store.categories["series_id"] == ["a", "b"]
+    assert store.bounds(0) == (0, 6)
+    assert store.bounds(1) == (6, 16)
+    
+    start, end = store.bounds(1)
+    assert store.values("y")[start:end].tolist() == list(np.arange(10) + 100.0)
+
+
+def test_series_bounds_need_grouped_rows(panel, tmp_path):
+    """Test that an ungrouped frame cannot be indexed by series."""
+    with pytest.raises(ValueError, match="grouped"):
+        FrameStore.build(panel, str(tmp_path / "frame"), id_col="series_id")
+
+
+def test_frame_store_roundtrip(panel, tmp_path):
+    """Test that a frame store restores dtypes and survives pickling."""
+    df = panel.assign(series_id=panel["series_id"].astype("category"), flag=np.int8(1))
+    store = pickle.loads(pickle.dumps(FrameStore.build(df, str(tmp_path / "frame"))))
+    
+    pd.testing.assert_frame_equal(store.take(), df.reset_index(drop=True))
+    
+    subset = store.take(np.array([3, 0]), ["series_id", "y"])
+    assert subset["y"].tolist() == [df["y"].iloc[3], df["y"].iloc[0]]
+    assert isinstance(store.values("y"), np.memmap)
+
+
+def test_open_rejects_other_stores(panel, tmp_path):
+    """Test that a directory with foreign metadata fails with a clear error."""
+    path = tmp_path / "frame"
+    FrameStore.build(panel, str(path))
+    
+    with open(path / "meta.json", "w") as f:
+        json.dump({"id_col": "series_id", "series_ids": ["a", "b"]}, f)
+    
+    with pytest.raises(ValueError, match="not a frame store"):
+        FrameStore(str(path))
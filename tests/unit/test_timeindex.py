@@ -1,8 +1,15 @@
 """Unit tests for time index utilities."""
 
+import numpy as np
 import pandas as pd
 import pytest
-from src.utils.timeindex import infer_frequency, get_calendar_features, create_fourier_features
+from src.data.features import build_features, create_holiday_features
+from src.utils.timeindex import (
+    infer_frequency,
+    get_calendar_features,
+    create_fourier_features,
+    factorize_timestamps,
+)
 
 
 def test_infer_frequency_daily():
@@ -44,3 +51,43 @@ def test_create_fourier_features():
     assert "fourier_cos_7_2" in features.columns
     
     assert len(features) == 14
+
+
+def test_fourier_features_fixed_epoch():
+    """Test that Fourier values depend only on the timestamp, not the window."""
+    ds = pd.Series(pd.date_range("2024-01-01", periods=14, freq="D"))
+    full = create_fourier_features(ds, periods=[7, 365.25], k=2)
+    tail = create_fourier_features(ds.iloc[7:], periods=[7, 365.25], k=2)
+    
+    pd.testing.assert_frame_equal(full.iloc[7:], tail)
+    # Weekly terms repeat every 7 days
+    assert full["fourier_sin_7_1"].iloc[0] == pytest.approx(full["fourier_sin_7_1"].iloc[7])
+
+
+def test_calendar_features_repeated_timestamps():
+    """Test that features computed per distinct timestamp broadcast to every row."""
+    dates = pd.Series(pd.date_range("2024-01-01", periods=10, freq="D"))
+    panel = pd.concat([dates, dates.iloc[::-1], dates], ignore_index=True)
+    
+    features = get_calendar_features(panel)
+    expected = get_calendar_features(dates)
+    
+    assert len(features) == 30
+    pd.testing.assert_frame_equal(
+        features.iloc[10:20].reset_index(drop=True),
+        expected.iloc[::-1].reset_index(drop=True),
+    )
+
+
+def test_missing_timestamps_are_rejected():
+    """Test that NaT timestamps fail instead of borrowing another row's features."""
+    ds = pd.Series(pd.to_datetime(["2024-01-01", None, "2024-01-03"]))
+    
+    with pytest.raises(ValueError, match="1 timestamps are missing"):
+        factorize_timestamps(ds)
+    
+    df = pd.DataFrame({"ds": ds, "y": np.arange(3.0)})
+    with pytest.raises(ValueError, match="NaT"):
+        build_features(df, {"holidays": {"countries": ["US"]}})
+    with pytest.raises(ValueError, match="NaT"):
+        create_holiday_features(df, countries=["US"], distance=True)
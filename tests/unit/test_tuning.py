@@ -0,0 +1,106 @@
+"""Unit tests for successive halving tuning."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.cv.backtest as backtest
+from src.cv.backtest import GLOBAL
+from src.cv.tuning import halving_schedule, sample_params, tune_model
+
+
+def shrunk_lag(config, X_train, y_train, X_test, threads):
+    """Global test model blending the weekly lag with the training mean."""
+    alpha, mean = config["alpha"], y_train.mean()
+    return (alpha * X_test["lag_7"] + (1 - alpha) * mean).fillna(mean).to_numpy()
+
+
+SPACE = {"alpha": {"type": "float", "low": 0.0, "high": 1.0}}
+
+CV = {"n_splits": 4, "horizon": 7, "min_train_points": 20, "step_size": 7}
+
+
+@pytest.fixture
+def registry(registry):
+    """Add the tunable global model to the shared test registry."""
+    return {**registry, "shrunk": (GLOBAL, shrunk_lag, None)}
+
+
+@pytest.fixture
+def panel():
+    """Create a panel of weekly seasonal series."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=70, freq="D")
+    season = 10 * np.sin(2 * np.pi * np.arange(70) / 7)
+    return pd.concat([
+        pd.DataFrame({"series_id": f"s{i}", "ds": dates, "y": season + rng.normal(size=70)})
+        for i in range(4)
+    ], ignore_index=True)
+
+
+def test_halving_schedule():
+    """Test the trials and folds of each rung."""
+    assert halving_schedule(50, 4) == [(50, 1), (17, 3), (6, 4)]
+    assert halving_schedule(10, 1) == [(10, 1)]
+    assert halving_schedule(3, 10, eta=2) == [(3, 1), (2, 2), (1, 4), (1, 8), (1, 10)]
+
+
+def test_sample_params():
+    """Test that samples respect types and bounds."""
+    space = {
+        "leaves": {"type": "int", "low": 16, "high": 256, "log": True},
+        "rate": {"type": "float", "low": 0.01, "high": 0.2, "log": True},
+        "boosting": {"choices": ["gbdt", "dart"]},
+    }
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        params = sample_params(space, rng)
+        assert isinstance(params["leaves"], int) and 16 <= params["leaves"] <= 256
+        assert 0.01 <= params["rate"] <= 0.2
+        assert params["boosting"] in ("gbdt", "dart")
+
+
+def test_tune_model_prunes_by_fold(registry, panel, monkeypatch):
+    """Test that trials are pruned fold by fold over features built once."""
+    builds = []
+
+    class CountingFoldFeatures(backtest.FoldFeatures):
+        def __init__(self, *args, **kwargs):
+            builds.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(backtest, "FoldFeatures", CountingFoldFeatures)
+
+    trials, best = tune_model(
+        panel, "shrunk", {"alpha": 0.0}, {"lags": [7]}, CV, n_trials=12, search_space=SPACE,
+        metric="mae", id_col="series_id", registry=registry,
+    )
+
+    assert len(builds) == 1
+    assert len(trials) == 12
+    # 12 trials on fold 0, the best 4 on folds 1-2, the best 2 on fold 3
+    assert trials["n_folds"].sum() == 12 + 4 * 2 + 2
+    assert (trials["status"] == "complete").sum() == 2
+
+    # The seasonal lag is the signal, so the best blend leans on it
+    assert trials["status"].iloc[0] == "complete"
+    assert best["alpha"] == trials["alpha"].iloc[0] > 0.5
+    assert trials.loc[trials["trial"] == 0, "alpha"].item() == 0.0
+
+
+def test_tune_model_parallel_is_deterministic(registry, panel):
+    """Test that worker processes produce the serial trials."""
+    args = (panel, "shrunk", {"alpha": 0.5}, {"lags": [7]}, CV)
+    kwargs = dict(n_trials=8, search_space=SPACE, id_col="series_id", registry=registry)
+
+    serial = tune_model(*args, **kwargs)
+    parallel = tune_model(*args, **kwargs, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial[0], parallel[0])
+    assert serial[1] == parallel[1]
+
+
+def test_tune_model_rejects_local_models(registry, panel):
+    """Test that local models cannot be tuned."""
+    with pytest.raises(ValueError, match="Only global models"):
+        tune_model(panel, "last", {}, {}, CV, search_space=SPACE, registry=registry)